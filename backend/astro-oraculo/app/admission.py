@@ -0,0 +1,248 @@
+"""
+Admission control for the CPU-heavy chart routes.
+
+Every request is assigned a route class by its path (`ROUTE_CLASSES`) and
+each class has its own gate:
+
+* at most `concurrency` requests of the class run at the same time;
+* up to `queue` more wait, first come first served, for at most `wait`
+  seconds (or less when the client sends `X-Request-Timeout` in seconds);
+* anything beyond that is refused at once with `429 Too Many Requests`, and
+  a request still queued when its wait runs out gets `503 Service
+  Unavailable`. Both carry a `Retry-After` estimated from the recent service
+  time of the class.
+
+A queued request whose client disconnects is dropped without being run, so
+bursts do not leave the server computing charts nobody will read.
+
+Limits are configured per class with `ADMISSION_<CLASS>=concurrency,queue,wait`
+(e.g. `ADMISSION_HEAVY=2,8,10`). Routes mapped to `None` (the live streams)
+are not gated.
+"""
+
+import asyncio
+import collections
+import math
+import os
+import time
+
+from starlette.responses import JSONResponse
+
+_CORES = os.cpu_count() or 1
+
+# Default (concurrency, queue, wait seconds) per route class
+ADMISSION_DEFAULTS = {
+    "light": (32, 128, 2.0),
+    "chart": (2 * _CORES, 8 * _CORES, 5.0),
+    "heavy": (_CORES, 4 * _CORES, 10.0),
+}
+
+# Route path -> route class. Every route of the served app must be listed
+# (`check_route_classes` runs at startup); unknown paths, which can only
+# answer 404, are "light"
+ROUTE_CLASSES = {
+    "/": "light",
+    "/openapi.json": "light",
+    "/docs": "light",
+    "/docs/oauth2-redirect": "light",
+    "/redoc": "light",
+    "/transits/stream": None,
+    "/transits/ws": None,
+    "/transits/daily": "light",
+    "/geocode": "light",
+    "/bodies": "light",
+    "/data/version": "light",
+    "/daily-card": "chart",
+    "/infocards/search": "chart",
+    "/natal": "chart",
+    "/natal/stars": "chart",
+    "/harmonics": "chart",
+    "/progressed": "chart",
+    "/patterns": "chart",
+    "/wheel": "chart",
+    "/similar": "chart",
+    "/oraculo/lectura": "chart",
+    "/oraculo/narrativa": "chart",
+    "/audio/signature": "chart",
+    "/similar/charts": "heavy",
+    "/natal/batch": "heavy",
+    "/harmonics/bulk": "heavy",
+    "/patterns/bulk": "heavy",
+    "/compare/transit-against-natal": "heavy",
+    "/compare/synastry": "heavy",
+    "/compare/composite": "heavy",
+    "/compare/davison": "heavy",
+    "/compare/transit-vs-transit": "heavy",
+    "/returns/solar": "heavy",
+    "/returns/lunar": "heavy",
+    "/astrocartography": "heavy",
+}
+
+# Weight of the latest request in the service time average
+_SERVICE_SMOOTHING = 0.2
+
+
+def admission_limits(name: str):
+    """`(concurrency, queue, wait)` of a route class, from the environment."""
+    value = os.getenv(f"ADMISSION_{name.upper()}")
+    if not value:
+        return ADMISSION_DEFAULTS[name]
+    concurrency, queue, wait = value.split(",")
+    return max(1, int(concurrency)), max(0, int(queue)), float(wait)
+
+
+def route_class(path: str):
+    """Route class of `path`; paths without a route are "light"."""
+    return ROUTE_CLASSES.get(path, "light")
+
+
+def check_route_classes(routes):
+    """Raise if a registered route has no entry in `ROUTE_CLASSES`."""
+    missing = sorted({route.path for route in routes if route.path not in ROUTE_CLASSES})
+    if missing:
+        raise RuntimeError(f"Routes without an admission class: {', '.join(missing)}")
+
+
+class Shed(Exception):
+    """A request refused by a gate, with the status to answer."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Gate:
+    """Concurrency limit with a bounded FIFO wait queue."""
+
+    def __init__(self, name: str, concurrency: int, queue: int, wait: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.wait = wait
+        self.active = 0
+        self.waiters = collections.deque()
+        self.service_time = 0.1
+
+    def retry_after(self) -> int:
+        backlog = (len(self.waiters) + 1) / self.concurrency
+        return max(1, math.ceil(self.service_time * backlog))
+
+    def try_acquire(self) -> bool:
+        if self.active < self.concurrency and not self.waiters:
+            self.active += 1
+            return True
+        return False
+
+    async def acquire(self, wait: float):
+        if self.try_acquire():
+            return
+        if len(self.waiters) >= self.queue:
+            raise Shed(429, f"Too many {self.name} requests", self.retry_after())
+        slot = asyncio.get_running_loop().create_future()
+        self.waiters.append(slot)
+        try:
+            await asyncio.wait_for(slot, wait)
+        except BaseException as e:
+            if slot.done() and not slot.cancelled():
+                # the slot was handed over just as we gave up on it
+                self.release()
+            elif slot in self.waiters:
+                # `release` may already have popped and skipped the cancelled slot
+                self.waiters.remove(slot)
+            if isinstance(e, asyncio.TimeoutError):
+                raise Shed(503, f"Timed out waiting for a {self.name} slot",
+                           self.retry_after()) from None
+            raise
+
+    def release(self):
+        while self.waiters:
+            slot = self.waiters.popleft()
+            if not slot.done():
+                # hand the slot to the next waiter; `active` is unchanged
+                slot.set_result(None)
+                return
+        self.active -= 1
+
+    def record(self, seconds: float):
+        self.service_time += _SERVICE_SMOOTHING * (seconds - self.service_time)
+
+
+def _requested_wait(scope) -> float:
+    for key, value in scope.get("headers", ()):
+        if key == b"x-request-timeout":
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return None
+    return None
+
+
+class AdmissionControl:
+    """ASGI middleware gating HTTP requests by route class."""
+
+    def __init__(self, app):
+        self.app = app
+        self.gates = {
+            name: Gate(name, *admission_limits(name)) for name in ADMISSION_DEFAULTS
+        }
+
+    async def __call__(self, scope, receive, send):
+        name = route_class(scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        gate = self.gates[name]
+        if gate.try_acquire():
+            await self._run(gate, scope, receive, send)
+            return
+        wait = gate.wait
+        requested = _requested_wait(scope)
+        if requested is not None:
+            wait = min(wait, requested)
+
+        # watch for a disconnect while queued, keeping the messages for the app
+        received = []
+
+        async def watch():
+            while True:
+                message = await receive()
+                received.append(message)
+                if message["type"] == "http.disconnect":
+                    return
+
+        acquiring = asyncio.ensure_future(gate.acquire(wait))
+        watching = asyncio.ensure_future(watch())
+        try:
+            await asyncio.wait({acquiring, watching}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watching.cancel()
+        if not acquiring.done():
+            # the client is gone: give up the place in the queue
+            acquiring.cancel()
+            await asyncio.gather(acquiring, return_exceptions=True)
+            return
+        try:
+            acquiring.result()
+        except Shed as shed:
+            response = JSONResponse(
+                {"detail": str(shed)}, status_code=shed.status_code,
+                headers={"Retry-After": str(shed.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def replay():
+            if received:
+                return received.pop(0)
+            return await receive()
+
+        await self._run(gate, scope, replay, send)
+
+    async def _run(self, gate: Gate, scope, receive, send):
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.record(time.monotonic() - started)
+            gate.release()
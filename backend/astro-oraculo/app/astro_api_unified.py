@@ -4,14 +4,75 @@ comparison endpoints (transit vs natal, synastry, transit vs transit),
 and aspects using Swiss Ephemeris.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, Dict, List
+import asyncio
+import contextlib
 import datetime
+import functools
+import hashlib
+import json
 import pytz
 import os
 import swisseph as swe
 
-app = FastAPI()
+from .bodies import (
+    BODY_GROUPS,
+    FIXED_STAR_ORB,
+    epoch_for,
+    fixed_star_index,
+    resolve_bodies,
+)
+from .harmonics import (
+    GAME_HARMONICS,
+    HARMONIC_ORB,
+    harmonic_conjunctions,
+    harmonic_matrix,
+    harmonic_resonance,
+    longitude_table,
+)
+from .admission import AdmissionControl, check_route_classes
+from .astrocartography import astrocartography
+from .audio import audio_key, audio_signature
+from .batch import natal_batch
+from .correspondences import reading
+from .chart import ASPECT_TYPES, ChartSnapshot, aspects_within, compute_chart, cross_aspects
+from .daily_card import daily_cards, refresh_daily_cards
+from .databundle import data_bundle
+from .geocoder import place_index, place_to_dict
+from .infocards import search as search_infocards
+from .narrative import compose
+from .patterns import find_patterns, find_patterns_bulk
+from .similarity import add_similar_charts, index_lock, similarity_index
+from .sky_stream import SkyBroadcaster
+from .wheel import render_wheel, wheel_key
+from .relationships import composite_chart, davison_moment
+from .progressions import (
+    jd_to_utc,
+    next_lunar_return,
+    progressed_jd,
+    solar_return,
+)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Per-process startup: check the admission classes, keep the daily cards fresh."""
+    check_route_classes(app.routes)
+    refresh = asyncio.create_task(refresh_daily_cards())
+    try:
+        yield
+    finally:
+        refresh.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Bound concurrency per route class; added first so CORS wraps its refusals
+app.add_middleware(AdmissionControl)
 
 # Enable CORS for all origins
 app.add_middleware(
@@ -25,81 +86,18 @@ app.add_middleware(
 # Set Swiss ephemeris path
 swe.set_ephe_path(os.getenv("EPHE_PATH", "/app/ephe"))
 
-# Aspect definitions: exact angle and orb
-ASPECT_TYPES = {
-    "conjunction": (0, 8),
-    "sextile": (60, 6),
-    "square": (90, 6),
-    "trine": (120, 6),
-    "opposition": (180, 8),
-}
-
-# Planet IDs
-PLANET_IDS = {
-    "Sun": swe.SUN,
-    "Moon": swe.MOON,
-    "Mercury": swe.MERCURY,
-    "Venus": swe.VENUS,
-    "Mars": swe.MARS,
-    "Jupiter": swe.JUPITER,
-    "Saturn": swe.SATURN,
-    "Uranus": swe.URANUS,
-    "Neptune": swe.NEPTUNE,
-    "Pluto": swe.PLUTO,
-}
-
-SIGNS = [
-    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
-    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
-]
-
-
-def _angle_diff(a1: float, a2: float) -> float:
-    diff = abs(a1 - a2) % 360
-    return min(diff, 360 - diff)
+# Bodies included in every chart, configurable through ASTRO_BODIES (see bodies.py)
+PLANET_IDS = resolve_bodies(os.getenv("ASTRO_BODIES", "planets"))
 
 
 def _compute_positions_and_aspects(jd: float, lat: float, lon: float):
-    positions = {}
-    for name, pid in PLANET_IDS.items():
-        result, _ = swe.calc_ut(jd, pid)
-        lon_deg = result[0] % 360
-        positions[name] = {
-            "longitude": lon_deg,
-            "sign": SIGNS[int(lon_deg // 30)],
-            "degree": lon_deg % 30,
-        }
-    # Ascendant and Midheaven
-    cusps, ascmc = swe.houses(jd, lat, lon)
-    asc_lon = ascmc[0] % 360
-    mc_lon = ascmc[1] % 360
-    positions["Ascendant"] = {
-        "longitude": asc_lon,
-        "sign": SIGNS[int(asc_lon // 30)],
-        "degree": asc_lon % 30,
-    }
-    positions["Midheaven"] = {
-        "longitude": mc_lon,
-        "sign": SIGNS[int(mc_lon // 30)],
-        "degree": mc_lon % 30,
-    }
-    aspects = []
-    names = list(positions.keys())
-    for i in range(len(names)):
-        for j in range(i + 1, len(names)):
-            lon1 = positions[names[i]]["longitude"]
-            lon2 = positions[names[j]]["longitude"]
-            diff = _angle_diff(lon1, lon2)
-            for aspect, (angle, orb) in ASPECT_TYPES.items():
-                if abs(diff - angle) <= orb:
-                    aspects.append({
-                        "planet1": names[i],
-                        "planet2": names[j],
-                        "aspect": aspect,
-                        "orb": round(abs(diff - angle), 2),
-                    })
-                    break
-    return positions, aspects
+    """Public positions mapping and aspects, for endpoints serializing a chart."""
+    chart = _positions_for(jd, lat, lon)
+    return chart.to_positions(), _aspects_within(chart)
+
+
+def _aspects_within(chart: ChartSnapshot):
+    return aspects_within(chart, ASPECT_TYPES)
 
 
 @app.get("/")
@@ -137,10 +135,105 @@ def daily_transits(date: str = None, time: str = "12:00", zone: str = "UTC"):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _resolve_place(place: str):
+    """Coordinates and timezone of a birth place from the offline geocoder."""
+    found = place_index().resolve(place)
+    if found is None:
+        raise ValueError(f"Unknown place: {place}")
+    return found
+
+
+@app.get("/geocode")
+def geocode(q: str, limit: int = 10, country: str = None):
+    """Place autocomplete with coordinates and timezone, served offline."""
+    places = place_index().complete(q, max(1, min(limit, 50)), country and country.upper())
+    return {"query": q, "places": [place_to_dict(p) for p in places]}
+
+
+def _sky_now():
+    now = datetime.datetime.now(pytz.utc)
+    jd = swe.julday(
+        now.year, now.month, now.day,
+        now.hour + now.minute / 60.0 + now.second / 3600.0,
+    )
+    chart = _positions_for(jd, 0.0, 0.0)
+    return chart, _aspects_within(chart)
+
+
+# One transit loop shared by every streaming client
+sky = SkyBroadcaster(_sky_now)
+
+
+@app.get("/transits/stream")
+async def transits_stream(request: Request):
+    """Server-sent events: a transit snapshot, then deltas as the sky moves."""
+    queue = await sky.subscribe()
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            sky.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.websocket("/transits/ws")
+async def transits_websocket(websocket: WebSocket):
+    """WebSocket variant of `/transits/stream`."""
+    await websocket.accept()
+    queue = await sky.subscribe()
+    try:
+        while True:
+            await websocket.send_json(await queue.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sky.unsubscribe(queue)
+
+
+@app.get("/daily-card")
+def daily_card(zone: str = "UTC", date: str = None):
+    """Card of the day for `zone`, from the precomputed daily card table."""
+    try:
+        if date is None:
+            day = datetime.datetime.now(pytz.timezone(zone)).date()
+        else:
+            day = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+        return daily_cards().lookup(zone, day)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/natal")
-def natal(date: str, time: str, zone: str, lat: float, lon: float):
-    """Natal chart positions and aspects for given birth data."""
+def natal(
+    date: str, time: str, zone: str = None, lat: float = None, lon: float = None,
+    place: str = None
+):
+    """Natal chart positions and aspects for given birth data.
+
+    Instead of `zone`, `lat` and `lon` the birth `place` can be given by name
+    ("Buenos Aires" or "Mercedes, AR") and is resolved offline.
+    """
     try:
+        if place:
+            found = _resolve_place(place)
+            zone = zone or found.timezone
+            lat = found.lat if lat is None else lat
+            lon = found.lon if lon is None else lon
+            place = f"{found.name}, {found.country}"
+        if zone is None or lat is None or lon is None:
+            raise ValueError("Provide zone, lat and lon, or a place")
         dt = datetime.datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
         tz = pytz.timezone(zone)
         dt_local = tz.localize(dt)
@@ -152,7 +245,7 @@ def natal(date: str, time: str, zone: str, lat: float, lon: float):
             dt_utc.hour + dt_utc.minute / 60.0 + dt_utc.second / 3600.0,
         )
         positions, aspects = _compute_positions_and_aspects(jd, lat, lon)
-        return {
+        chart = {
             "date": date,
             "time": time,
             "zone": zone,
@@ -161,6 +254,78 @@ def natal(date: str, time: str, zone: str, lat: float, lon: float):
             "positions": positions,
             "aspects": aspects,
         }
+        if place:
+            chart["place"] = place
+        return chart
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class NatalBatchRequest(BaseModel):
+    records: List[Dict[str, Any]]
+
+
+@app.post("/natal/batch")
+def natal_batch_charts(request: NatalBatchRequest):
+    """Natal charts for many birth records, in order, with per-record errors."""
+    try:
+        return {"charts": natal_batch(request.records, _resolve_place)}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class LecturaRequest(BaseModel):
+    date: str = None
+    time: str = None
+    zone: str = None
+    lat: float = None
+    lon: float = None
+    place: str = None
+    positions: Dict[str, Dict[str, Any]] = None
+    cusps: List[float] = None
+
+
+def _lectura_chart(request: LecturaRequest):
+    """`(chart, cusps)` of a reading request."""
+    if request.positions:
+        chart = ChartSnapshot.from_positions(request.positions)
+        cusps = tuple(request.cusps or ())
+    else:
+        zone, lat, lon = request.zone, request.lat, request.lon
+        if request.place:
+            found = _resolve_place(request.place)
+            zone = zone or found.timezone
+            lat = found.lat if lat is None else lat
+            lon = found.lon if lon is None else lon
+        if zone is None or lat is None or lon is None:
+            raise ValueError("Provide zone, lat and lon, or a place")
+        chart = _natal_positions(request.date, request.time, zone, lat, lon)
+        cusps = swe.houses(_jd_from_local(request.date, request.time, zone), lat, lon)[0]
+    if cusps and len(cusps) != 12:
+        raise ValueError("cusps must hold the twelve house cusps")
+    return chart, cusps
+
+
+@app.post("/oraculo/lectura")
+def oraculo_lectura(request: LecturaRequest):
+    """Oracle reading: tarot cards of every body, house and aspect of a chart.
+
+    Takes birth data (as `/natal`) or stored `positions`, optionally with
+    their twelve house `cusps`.
+    """
+    try:
+        chart, cusps = _lectura_chart(request)
+        return reading(chart, cusps, _aspects_within(chart))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/oraculo/narrativa")
+def oraculo_narrativa(request: LecturaRequest):
+    """Narrative reading in the three levels of the oracle manual, same input as `/oraculo/lectura`."""
+    try:
+        chart, cusps = _lectura_chart(request)
+        return compose(chart, cusps, _aspects_within(chart))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -180,49 +345,19 @@ def _jd_from_local(date: str, time: str, zone: str) -> float:
     )
 
 
-def _positions_for(jd: float, lat: float, lon: float):
-    positions = {}
-    for name, pid in PLANET_IDS.items():
-        result, _ = swe.calc_ut(jd, pid)
-        lon_deg = result[0] % 360
-        positions[name] = {
-            "longitude": lon_deg,
-            "sign": SIGNS[int(lon_deg // 30)],
-            "degree": lon_deg % 30,
-        }
-    cusps, ascmc = swe.houses(jd, lat, lon)
-    asc_lon = ascmc[0] % 360
-    mc_lon = ascmc[1] % 360
-    positions["Ascendant"] = {
-        "longitude": asc_lon,
-        "sign": SIGNS[int(asc_lon // 30)],
-        "degree": asc_lon % 30,
-    }
-    positions["Midheaven"] = {
-        "longitude": mc_lon,
-        "sign": SIGNS[int(mc_lon // 30)],
-        "degree": mc_lon % 30,
-    }
-    return positions
-
-
-def _cross_aspects(posA: dict, posB: dict):
-    pairs = []
-    for a_name, a in posA.items():
-        for b_name, b in posB.items():
-            if a_name == b_name and posA is posB:
-                continue
-            diff = _angle_diff(a["longitude"], b["longitude"])
-            for aspect, (angle, orb) in ASPECT_TYPES.items():
-                if abs(diff - angle) <= orb:
-                    pairs.append({
-                        "from": a_name,
-                        "to": b_name,
-                        "aspect": aspect,
-                        "orb": round(abs(diff - angle), 2),
-                    })
-                    break
-    return pairs
+def _positions_for(jd: float, lat: float, lon: float) -> ChartSnapshot:
+    """Charted bodies plus Ascendant and Midheaven as a compact snapshot."""
+    return compute_chart(jd, lat, lon, PLANET_IDS)
+
+
+@functools.lru_cache(maxsize=2048)
+def _natal_positions(date: str, time: str, zone: str, lat: float, lon: float):
+    """Natal snapshot kept in memory so repeated comparisons reuse it."""
+    return _positions_for(_jd_from_local(date, time, zone), lat, lon)
+
+
+def _cross_aspects(chart_a: ChartSnapshot, chart_b: ChartSnapshot):
+    return cross_aspects(chart_a, chart_b, ASPECT_TYPES)
 
 
 @app.get("/compare/transit-against-natal")
@@ -236,14 +371,16 @@ def compare_transit_against_natal(
     pos_n = _positions_for(jd_n, n_lat, n_lon)
     aspects = _cross_aspects(pos_t, pos_n)
     return {
-        "transit": {"date": t_date, "time": t_time, "zone": t_zone, "positions": pos_t},
+        "transit": {
+            "date": t_date, "time": t_time, "zone": t_zone, "positions": pos_t.to_positions()
+        },
         "natal": {
             "date": n_date,
             "time": n_time,
             "zone": n_zone,
             "lat": n_lat,
             "lon": n_lon,
-            "positions": pos_n,
+            "positions": pos_n.to_positions(),
         },
         "aspects": aspects,
     }
@@ -254,10 +391,8 @@ def compare_synastry(
     a_date: str, a_time: str, a_zone: str, a_lat: float, a_lon: float,
     b_date: str, b_time: str, b_zone: str, b_lat: float, b_lon: float
 ):
-    jd_a = _jd_from_local(a_date, a_time, a_zone)
-    pos_a = _positions_for(jd_a, a_lat, a_lon)
-    jd_b = _jd_from_local(b_date, b_time, b_zone)
-    pos_b = _positions_for(jd_b, b_lat, b_lon)
+    pos_a = _natal_positions(a_date, a_time, a_zone, a_lat, a_lon)
+    pos_b = _natal_positions(b_date, b_time, b_zone, b_lat, b_lon)
     aspects = _cross_aspects(pos_a, pos_b)
     return {
         "chartA": {
@@ -266,7 +401,7 @@ def compare_synastry(
             "zone": a_zone,
             "lat": a_lat,
             "lon": a_lon,
-            "positions": pos_a,
+            "positions": pos_a.to_positions(),
         },
         "chartB": {
             "date": b_date,
@@ -274,12 +409,71 @@ def compare_synastry(
             "zone": b_zone,
             "lat": b_lat,
             "lon": b_lon,
-            "positions": pos_b,
+            "positions": pos_b.to_positions(),
         },
         "aspects": aspects,
     }
 
 
+def _composite_chart(chart_a: ChartSnapshot, chart_b: ChartSnapshot):
+    chart = composite_chart(chart_a, chart_b)
+    return {"positions": chart.to_positions(), "aspects": _aspects_within(chart)}
+
+
+@app.get("/compare/composite")
+def compare_composite(
+    a_date: str, a_time: str, a_zone: str, a_lat: float, a_lon: float,
+    b_date: str, b_time: str, b_zone: str, b_lat: float, b_lon: float
+):
+    """Composite chart: circular midpoints of both natal charts."""
+    try:
+        pos_a = _natal_positions(a_date, a_time, a_zone, a_lat, a_lon)
+        pos_b = _natal_positions(b_date, b_time, b_zone, b_lat, b_lon)
+        return _composite_chart(pos_a, pos_b)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class CompositeRequest(BaseModel):
+    chartA: Dict[str, Dict[str, Any]]
+    chartB: Dict[str, Dict[str, Any]]
+
+
+@app.post("/compare/composite")
+def compare_composite_stored(request: CompositeRequest):
+    """Composite chart from two stored `/natal` position mappings."""
+    try:
+        return _composite_chart(
+            ChartSnapshot.from_positions(request.chartA),
+            ChartSnapshot.from_positions(request.chartB),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/compare/davison")
+def compare_davison(
+    a_date: str, a_time: str, a_zone: str, a_lat: float, a_lon: float,
+    b_date: str, b_time: str, b_zone: str, b_lat: float, b_lon: float
+):
+    """Davison chart cast for the time and space midpoint of both births."""
+    try:
+        jd, lat, lon = davison_moment(
+            _jd_from_local(a_date, a_time, a_zone), a_lat, a_lon,
+            _jd_from_local(b_date, b_time, b_zone), b_lat, b_lon,
+        )
+        positions, aspects = _compute_positions_and_aspects(jd, lat, lon)
+        return {
+            "utc": jd_to_utc(jd),
+            "lat": lat,
+            "lon": lon,
+            "positions": positions,
+            "aspects": aspects,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/compare/transit-vs-transit")
 def compare_transit_vs_transit(
     a_date: str, a_time: str, a_zone: str,
@@ -291,12 +485,387 @@ def compare_transit_vs_transit(
     pos_b = _positions_for(jd_b, 0.0, 0.0)
     aspects = _cross_aspects(pos_a, pos_b)
     return {
-        "transitA": {"date": a_date, "time": a_time, "zone": a_zone, "positions": pos_a},
-        "transitB": {"date": b_date, "time": b_time, "zone": b_zone, "positions": pos_b},
+        "transitA": {
+            "date": a_date, "time": a_time, "zone": a_zone, "positions": pos_a.to_positions()
+        },
+        "transitB": {
+            "date": b_date, "time": b_time, "zone": b_zone, "positions": pos_b.to_positions()
+        },
         "aspects": aspects,
     }
 
 
+@app.get("/wheel")
+def chart_wheel(
+    date: str, time: str = "12:00", zone: str = "UTC", lat: float = None, lon: float = None
+):
+    """Chart wheel as SVG; without `lat` and `lon` a transit wheel without houses."""
+    try:
+        if lat is None or lon is None:
+            jd = _jd_from_local(date, time, zone)
+            chart = _positions_for(jd, 0.0, 0.0).select(PLANET_IDS)
+            cusps = ()
+        else:
+            jd = _jd_from_local(date, time, zone)
+            chart = _natal_positions(date, time, zone, lat, lon)
+            cusps = swe.houses(jd, lat, lon)[0]
+        svg = render_wheel(*wheel_key(chart, cusps, _aspects_within(chart)))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(svg, media_type="image/svg+xml",
+                    headers={"Cache-Control": "public, max-age=86400"})
+
+
+@app.get("/data/version")
+def data_version():
+    """Version of the data bundle in use, with its tables."""
+    bundle = data_bundle()
+    return {
+        "version": bundle.version,
+        "built": bundle.built,
+        "tables": sorted(bundle.tables),
+    }
+
+
+@app.get("/infocards/search")
+def infocard_search(q: str, limit: int = 10):
+    """Infocards matching every word of `q` (words match as prefixes), best first."""
+    try:
+        if not 1 <= limit <= 78:
+            raise ValueError("limit must be between 1 and 78")
+        return {"query": q, "results": search_infocards(q, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+AUDIO_MEDIA_TYPES = {"wav": "audio/wav", "ogg": "audio/ogg"}
+
+
+@app.get("/audio/signature")
+def chart_audio(
+    request: Request, date: str, time: str = "12:00", zone: str = "UTC",
+    lat: float = None, lon: float = None, format: str = "wav",
+):
+    """Audio signature of a chart; without `lat` and `lon` of the transiting planets."""
+    try:
+        if format not in AUDIO_MEDIA_TYPES:
+            raise ValueError(f"format must be one of {sorted(AUDIO_MEDIA_TYPES)}")
+        if lat is None or lon is None:
+            jd = _jd_from_local(date, time, zone)
+            chart = _positions_for(jd, 0.0, 0.0).select(PLANET_IDS)
+        else:
+            chart = _natal_positions(date, time, zone, lat, lon)
+        key = audio_key(chart, _aspects_within(chart))
+        etag = '"%s"' % hashlib.sha1(repr((key, format)).encode()).hexdigest()
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        audio = audio_signature(*key, format)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def chunks():
+        for start in range(0, len(audio), 64 * 1024):
+            yield audio[start:start + 64 * 1024]
+
+    return StreamingResponse(chunks(), media_type=AUDIO_MEDIA_TYPES[format], headers={
+        "Content-Length": str(len(audio)),
+        "Cache-Control": "public, max-age=86400",
+        "ETag": etag,
+    })
+
+
+@app.get("/bodies")
+def list_bodies():
+    """Body catalog, the bodies charted by this server and the fixed-star count."""
+    return {
+        "groups": {group: list(bodies) for group, bodies in BODY_GROUPS.items()},
+        "charted": list(PLANET_IDS),
+        "fixed_stars": len(fixed_star_index(datetime.date.today().year)),
+    }
+
+
+@app.get("/natal/stars")
+def natal_fixed_stars(
+    date: str, time: str, zone: str, lat: float, lon: float,
+    aspects: str = "conjunction,opposition", orb: float = FIXED_STAR_ORB
+):
+    """Fixed stars aspected by the natal positions, found through the star index.
+
+    Answers 503 when the server has no star catalog, rather than an empty
+    list of contacts.
+    """
+    try:
+        selected = {}
+        for name in (a.strip() for a in aspects.split(",")):
+            if name not in ASPECT_TYPES:
+                raise ValueError(f"Unknown aspect: {name}")
+            selected[name] = ASPECT_TYPES[name]
+        jd = _jd_from_local(date, time, zone)
+        chart = _positions_for(jd, lat, lon)
+        index = fixed_star_index(epoch_for(jd))
+        if not len(index):
+            raise HTTPException(status_code=503, detail="Fixed star catalog not available")
+        return {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "lat": lat,
+            "lon": lon,
+            "stars_indexed": len(index),
+            "contacts": index.contacts(chart.as_longitudes(), selected, orb),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _parse_harmonics(harmonics: str) -> List[int]:
+    values = [int(h) for h in harmonics.split(",") if h.strip()]
+    if not values or any(h < 1 for h in values):
+        raise ValueError("harmonics must be positive integers")
+    return values
+
+
+@app.get("/harmonics")
+def natal_harmonics(
+    date: str, time: str, zone: str, lat: float, lon: float,
+    harmonics: str = ",".join(str(h) for h in GAME_HARMONICS),
+    orb: float = HARMONIC_ORB
+):
+    """Harmonic chart matrix (harmonics x bodies) and harmonic conjunctions."""
+    try:
+        ns = _parse_harmonics(harmonics)
+        jd = _jd_from_local(date, time, zone)
+        chart = _positions_for(jd, lat, lon)
+        names = list(chart.names)
+        matrix = harmonic_matrix(chart.longitudes, ns)
+        return {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "lat": lat,
+            "lon": lon,
+            "bodies": names,
+            "harmonics": ns,
+            "matrix": matrix.round(4).tolist(),
+            "conjunctions": harmonic_conjunctions(names, ns, matrix, orb),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class HarmonicBulkRequest(BaseModel):
+    charts: List[Dict[str, Any]]
+    harmonics: List[int] = list(GAME_HARMONICS)
+    orb: float = HARMONIC_ORB
+
+
+@app.post("/harmonics/bulk")
+def bulk_harmonics(request: HarmonicBulkRequest):
+    """Harmonic resonance (conjunct pairs per harmonic) for many stored charts at once."""
+    try:
+        if any(h < 1 for h in request.harmonics):
+            raise ValueError("harmonics must be positive integers")
+        names = list(PLANET_IDS) + ["Ascendant", "Midheaven"]
+        table = longitude_table(request.charts, names)
+        resonance = harmonic_resonance(harmonic_matrix(table, request.harmonics), request.orb)
+        return {
+            "harmonics": request.harmonics,
+            "resonance": resonance.tolist(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/patterns")
+def natal_patterns(date: str, time: str, zone: str, lat: float, lon: float):
+    """Aspect patterns (Grand Trine, T-Square, Grand Cross, Yod, Stellium) of a natal chart."""
+    try:
+        chart = _positions_for(_jd_from_local(date, time, zone), lat, lon)
+        return {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "lat": lat,
+            "lon": lon,
+            "patterns": find_patterns(chart.longitudes, chart.names),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class PatternBulkRequest(BaseModel):
+    charts: List[Dict[str, Any]]
+
+
+@app.post("/patterns/bulk")
+def bulk_patterns(request: PatternBulkRequest):
+    """Aspect patterns for many stored `/natal` position mappings at once."""
+    try:
+        names = list(PLANET_IDS) + ["Ascendant", "Midheaven"]
+        table = longitude_table(request.charts, names)
+        return {"patterns": find_patterns_bulk(table, names)}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class SimilarChartsRequest(BaseModel):
+    charts: List[Dict[str, Any]]
+
+
+@app.post("/similar/charts")
+def index_similar_charts(request: SimilarChartsRequest):
+    """Add charts to the similarity index.
+
+    Each chart has an `id` and either stored `/natal` `positions` or birth
+    data (`date`, `time`, `zone`, `lat`, `lon`); indexing an id again replaces it.
+    """
+    try:
+        names = list(PLANET_IDS) + ["Ascendant", "Midheaven"]
+        rows = []
+        for chart in request.charts:
+            if "positions" in chart:
+                rows.append(chart["positions"])
+            else:
+                rows.append(_natal_positions(
+                    chart["date"], chart["time"], chart["zone"],
+                    float(chart["lat"]), float(chart["lon"]),
+                ).as_longitudes())
+        table = longitude_table(rows, names)
+        with index_lock:
+            index = add_similar_charts(names, [str(chart["id"]) for chart in request.charts], table)
+            return {"indexed": len(rows), "size": len(index)}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/similar")
+def similar_charts(
+    date: str, time: str, zone: str, lat: float, lon: float, k: int = 10, exclude: str = None
+):
+    """Indexed charts closest to a natal chart, nearest first."""
+    try:
+        chart = _natal_positions(date, time, zone, lat, lon)
+        names = list(PLANET_IDS) + ["Ascendant", "Midheaven"]
+        with index_lock:
+            index = similarity_index(names)
+            row = longitude_table([chart.as_longitudes()], index.names)[0]
+            found = index.nearest(row, max(1, min(k, 100)), exclude)
+        return {
+            "indexed": len(index),
+            "similar": [{"id": chart_id, "distance": distance} for chart_id, distance in found],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/progressed")
+def progressed_chart(
+    date: str, time: str, zone: str, lat: float, lon: float,
+    target_date: str = None, target_time: str = "12:00"
+):
+    """Secondary progressed chart for `target_date` and its aspects to the natal chart."""
+    try:
+        if not target_date:
+            target_date = datetime.datetime.now(pytz.timezone(zone)).strftime("%Y-%m-%d")
+        natal_jd = _jd_from_local(date, time, zone)
+        jd_p = progressed_jd(natal_jd, _jd_from_local(target_date, target_time, zone))
+        pos_p = _positions_for(jd_p, lat, lon)
+        pos_n = _positions_for(natal_jd, lat, lon)
+        return {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "lat": lat,
+            "lon": lon,
+            "target_date": target_date,
+            "progressed_utc": jd_to_utc(jd_p),
+            "positions": pos_p.to_positions(),
+            "aspects_to_natal": _cross_aspects(pos_p, pos_n),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _return_chart(jd: float, lat: float, lon: float):
+    positions, aspects = _compute_positions_and_aspects(jd, lat, lon)
+    return {"utc": jd_to_utc(jd), "jd": jd, "positions": positions, "aspects": aspects}
+
+
+@app.get("/returns/solar")
+def solar_return_chart(
+    date: str, time: str, zone: str, lat: float, lon: float,
+    year: int = None, r_lat: float = None, r_lon: float = None
+):
+    """Solar return chart for `year`, optionally relocated to `r_lat`/`r_lon`."""
+    try:
+        if year is None:
+            year = datetime.datetime.now(pytz.timezone(zone)).year
+        jd = solar_return(_jd_from_local(date, time, zone), year)
+        return {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "year": year,
+            "return": _return_chart(
+                jd,
+                lat if r_lat is None else r_lat,
+                lon if r_lon is None else r_lon,
+            ),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/returns/lunar")
+def lunar_return_chart(
+    date: str, time: str, zone: str, lat: float, lon: float,
+    after: str = None, r_lat: float = None, r_lon: float = None
+):
+    """First lunar return on or after `after`, optionally relocated."""
+    try:
+        if not after:
+            after = datetime.datetime.now(pytz.timezone(zone)).strftime("%Y-%m-%d")
+        jd = next_lunar_return(
+            _jd_from_local(date, time, zone), _jd_from_local(after, "00:00", zone)
+        )
+        return {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "after": after,
+            "return": _return_chart(
+                jd,
+                lat if r_lat is None else r_lat,
+                lon if r_lon is None else r_lon,
+            ),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/astrocartography")
+def astrocartography_lines(
+    date: str, time: str, zone: str, step: float = 1.0, lat_max: float = 75.0
+):
+    """Geographic ASC/DSC/MC/IC lines of every charted body for a birth moment."""
+    try:
+        if not 0 < step <= 10:
+            raise ValueError("step must be in (0, 10] degrees")
+        if not 0 < lat_max < 90:
+            raise ValueError("lat_max must be in (0, 90) degrees")
+        jd = _jd_from_local(date, time, zone)
+        return {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "lines": astrocartography(jd, PLANET_IDS, step, lat_max),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Expose api for uvicorn
 api = app
 
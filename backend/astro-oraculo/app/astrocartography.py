@@ -0,0 +1,109 @@
+"""
+Astrocartography lines: where on Earth each body was on an angle.
+
+For a moment in time a body is on the MC along the meridian where local
+sidereal time equals its right ascension, and on the IC along the opposite
+meridian. It rises (ASC) or sets (DSC) where its hour angle equals
+`∓acos(-tan φ · tan δ)`, which depends on the latitude φ.
+
+Instead of casting houses for every point of a map, everything is evaluated
+at once with NumPy: ecliptic positions are rotated to equatorial coordinates
+for all bodies together, and the rising/setting longitudes are solved for a
+whole latitude grid in one array expression. Lines are returned as compact
+polylines of `[lat, lon]` pairs split where they leave the map or wrap
+around the antimeridian.
+"""
+
+import numpy as np
+import swisseph as swe
+
+from .bodies import body_coordinates, ensure_ephe_path
+
+ANGLES = ("ASC", "DSC", "MC", "IC")
+
+
+def _wrap(lon):
+    """Fold geographic longitudes into [-180, 180)."""
+    return np.mod(lon + 180.0, 360.0) - 180.0
+
+
+def equatorial(lons, lats, obliquity: float):
+    """Right ascension and declination (degrees) for ecliptic coordinates."""
+    lam = np.radians(lons)
+    beta = np.radians(lats)
+    eps = np.radians(obliquity)
+    ra = np.arctan2(
+        np.sin(lam) * np.cos(eps) - np.tan(beta) * np.sin(eps), np.cos(lam)
+    )
+    dec = np.arcsin(
+        np.sin(beta) * np.cos(eps) + np.cos(beta) * np.sin(eps) * np.sin(lam)
+    )
+    return np.mod(np.degrees(ra), 360.0), np.degrees(dec)
+
+
+def angle_lines(ra, dec, gst_deg: float, latitudes):
+    """Geographic longitudes of every body on every angle.
+
+    Returns a dict `angle -> array (bodies, latitudes)`; entries where the
+    body never rises or sets at that latitude are NaN.
+    """
+    ra = np.asarray(ra, dtype=np.float64)[:, None]
+    dec = np.radians(np.asarray(dec, dtype=np.float64))[:, None]
+    phi = np.radians(np.asarray(latitudes, dtype=np.float64))[None, :]
+    mc = _wrap(ra - gst_deg) * np.ones_like(phi)
+    with np.errstate(invalid="ignore"):
+        h0 = np.degrees(np.arccos(-np.tan(phi) * np.tan(dec)))
+    return {
+        "ASC": _wrap(ra - h0 - gst_deg),
+        "DSC": _wrap(ra + h0 - gst_deg),
+        "MC": mc,
+        "IC": _wrap(mc + 180.0),
+    }
+
+
+def _polylines(latitudes, longitudes, precision: int):
+    """Split one line into polylines at gaps and antimeridian crossings."""
+    lines = []
+    current = []
+    previous = None
+    for lat, lon in zip(latitudes, longitudes):
+        if np.isnan(lon):
+            previous = None
+            if current:
+                lines.append(current)
+                current = []
+            continue
+        if previous is not None and abs(lon - previous) > 180.0:
+            lines.append(current)
+            current = []
+        current.append([round(float(lat), precision), round(float(lon), precision)])
+        previous = lon
+    if current:
+        lines.append(current)
+    return [line for line in lines if len(line) > 1]
+
+
+def astrocartography(jd: float, bodies: dict, step: float = 1.0,
+                     lat_max: float = 75.0, precision: int = 2):
+    """ASC/DSC/MC/IC polylines for every body at `jd`."""
+    ensure_ephe_path()
+    coords = body_coordinates(jd, bodies)
+    names = list(coords)
+    lons = np.array([coords[n][0] for n in names])
+    lats = np.array([coords[n][1] for n in names])
+    nutation, _ = swe.calc_ut(jd, swe.ECL_NUT)
+    ra, dec = equatorial(lons, lats, nutation[0])
+    gst = swe.sidtime(jd) * 15.0
+    latitudes = np.arange(-lat_max, lat_max + step / 2.0, step)
+    lines = angle_lines(ra, dec, gst, latitudes)
+    result = []
+    for i, name in enumerate(names):
+        for angle in ANGLES:
+            if angle in ("MC", "IC"):
+                # meridians are straight: their endpoints are enough
+                lon = round(float(lines[angle][i][0]), precision)
+                polylines = [[[-lat_max, lon], [lat_max, lon]]]
+            else:
+                polylines = _polylines(latitudes, lines[angle][i], precision)
+            result.append({"body": name, "angle": angle, "polylines": polylines})
+    return result
@@ -0,0 +1,188 @@
+"""
+Audio "signatures" of charts.
+
+`frecuencias_completo_con_asc_mc.csv` gives every planet, point and sign a
+musical note and a frequency level. A chart is played as one additive tone
+per body: the body's note (a body whose note is not usable sounds the note
+of its sign) in the octave of its level, with a few harmonics. Bodies enter
+one after another in zodiac order from the Ascendant and fade out together.
+Aspects weigh the bodies they join: the tighter the aspect the louder both
+bodies, and tense aspects (squares, oppositions) add a slightly detuned
+partial that beats against the tone.
+
+Synthesis works on whole (bodies x samples) arrays with NumPy, one pass per
+partial, never sample by sample. Encoded signatures are cached by chart content.
+"""
+
+import functools
+import io
+import os
+import wave
+
+import numpy as np
+
+from .correspondences import BODY_NAMES, SIGNOS
+from .databundle import data_bundle
+from .geocoder import fold
+
+SAMPLE_RATE = 22050
+AUDIO_SECONDS = 6.0
+
+# Number of encoded signatures kept in memory
+AUDIO_CACHE = int(os.getenv("AUDIO_CACHE", "256"))
+
+# Semitones above C of the note names used by the data file
+NOTES = {
+    "do": 0, "do#": 1, "re": 2, "re#": 3, "mi": 4, "fa": 5,
+    "fa#": 6, "sol": 7, "sol#": 8, "la": 9, "la#": 10, "si": 11,
+}
+
+# Octave of each frequency level, by the level's first word
+LEVEL_OCTAVES = {"baja": 3, "media": 4, "alta": 5, "portal": 4, "variable": 4}
+
+# Relative amplitude of the harmonics of every tone
+HARMONICS = np.array([1.0, 0.5, 0.25, 0.125])
+
+# Loudness added to both bodies of an exact aspect, by aspect
+ASPECT_GAINS = {
+    "conjunction": 0.6,
+    "sextile": 0.3,
+    "square": 0.4,
+    "trine": 0.5,
+    "opposition": 0.4,
+}
+
+# Aspects heard as beating, and the detuning of their extra partial
+TENSE_ASPECTS = ("square", "opposition")
+BEAT_DETUNE = 1.004
+
+_ATTACK = 0.08
+_DECAY = 0.35
+_RELEASE = 0.6
+
+
+def _frequency(semitone: int, octave: int) -> float:
+    return 440.0 * 2.0 ** ((semitone - 9) / 12 + octave - 4)
+
+
+def _tuning(tables: dict):
+    """`({body: (semitone, octave)}, [sign semitone])` from the frequency table."""
+    bodies = {}
+    signs = [0] * 12
+    folded_signs = [fold(s) for s in SIGNOS]
+    folded_bodies = {fold(k): v for k, v in BODY_NAMES.items()}
+    for row in tables["frecuencias_completo_con_asc_mc.csv"]:
+        semitone = NOTES.get(fold(row["NotaMusical"]))
+        name = fold(row["Entidad"])
+        level = (fold(row["NivelFrecuencia"]).split() or ["media"])[0].split("–")[0]
+        if row["Tipo"] == "Signo" and name in folded_signs and semitone is not None:
+            signs[folded_signs.index(name)] = semitone
+        elif name in folded_bodies:
+            bodies[folded_bodies[name]] = (semitone, LEVEL_OCTAVES.get(level, 4))
+    return bodies, signs
+
+
+@functools.lru_cache(maxsize=1)
+def _tuning_for(version: str):
+    return _tuning(data_bundle().tables)
+
+
+def synthesize(names, longitudes, aspects=(), seconds: float = AUDIO_SECONDS,
+               rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Float samples in [-1, 1] for a chart.
+
+    `aspects` holds `(body, body, aspect, orb)` tuples.
+    """
+    bodies, signs = _tuning_for(data_bundle().version)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    index = {name: k for k, name in enumerate(names)}
+
+    freqs = np.empty(len(names))
+    for k, (name, lon) in enumerate(zip(names, longitudes.tolist())):
+        semitone, octave = bodies.get(name, (None, 4))
+        if semitone is None:
+            semitone = signs[int(lon // 30) % 12]
+        freqs[k] = _frequency(semitone, octave)
+
+    gains = np.ones(len(names))
+    beats = np.zeros(len(names))
+    for first, second, aspect, orb in aspects:
+        if first not in index or second not in index:
+            continue
+        weight = ASPECT_GAINS.get(aspect, 0.0) / (1.0 + orb)
+        pair = [index[first], index[second]]
+        gains[pair] += weight
+        if aspect in TENSE_ASPECTS:
+            beats[pair] += weight
+
+    t = np.arange(int(seconds * rate)) / rate
+    # partials: harmonics of every body, then its detuned beating partial
+    partial_freqs = np.concatenate([
+        freqs[:, None] * np.arange(1, len(HARMONICS) + 1), (freqs * BEAT_DETUNE)[:, None]
+    ], axis=1)
+    partial_amps = np.concatenate([
+        np.broadcast_to(HARMONICS, (len(names), len(HARMONICS))), beats[:, None]
+    ], axis=1)
+    tones = np.zeros((len(names), len(t)))
+    for p in range(partial_freqs.shape[1]):
+        # one (bodies, samples) block per partial keeps memory bounded
+        tones += partial_amps[:, p, None] * np.sin(2 * np.pi * partial_freqs[:, p, None] * t)
+
+    # bodies enter in zodiac order starting from the first body (the Ascendant
+    # when present), over the first half of the signature
+    start = index.get("Ascendant", 0)
+    order = np.argsort(np.argsort((longitudes - longitudes[start]) % 360.0))
+    onsets = order / max(len(names), 1) * seconds / 2
+    since = np.maximum(t[None, :] - onsets[:, None], 0.0)
+    envelopes = np.where(
+        t[None, :] >= onsets[:, None],
+        np.minimum(since / _ATTACK, 1.0) * np.exp(-_DECAY * since),
+        0.0,
+    )
+    envelopes *= np.clip((seconds - t) / _RELEASE, 0.0, 1.0)
+
+    signal = (gains[:, None] * envelopes * tones).sum(axis=0)
+    peak = np.abs(signal).max()
+    return signal / peak * 0.9 if peak > 0 else signal
+
+
+def encode_wav(samples: np.ndarray, rate: int = SAMPLE_RATE) -> bytes:
+    """16-bit mono WAV file of `samples`."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes((np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def encode_ogg(samples: np.ndarray, rate: int = SAMPLE_RATE) -> bytes:
+    """Ogg Vorbis file of `samples`, encoded by `soundfile` (libsndfile)."""
+    # imported here so WAV-only workers never load libsndfile
+    import soundfile
+    buffer = io.BytesIO()
+    soundfile.write(buffer, samples.astype(np.float32), rate, format="OGG", subtype="VORBIS")
+    return buffer.getvalue()
+
+
+ENCODERS = {"wav": encode_wav, "ogg": encode_ogg}
+
+
+@functools.lru_cache(maxsize=AUDIO_CACHE)
+def audio_signature(version: str, names: tuple, longitudes: tuple, aspects: tuple,
+                    fmt: str = "wav") -> bytes:
+    """Encoded signature of a chart, cached by content (see `audio_key`)."""
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unknown audio format {fmt!r}, expected one of {sorted(ENCODERS)}")
+    return ENCODERS[fmt](synthesize(names, longitudes, aspects))
+
+
+def audio_key(chart, aspects) -> tuple:
+    """Hashable cache key for `audio_signature`, rounded so equal charts match."""
+    return (
+        data_bundle().version,
+        chart.names,
+        tuple(round(lon, 1) for lon in chart.longitudes.tolist()),
+        tuple((a["planet1"], a["planet2"], a["aspect"], round(a["orb"], 1)) for a in aspects),
+    )
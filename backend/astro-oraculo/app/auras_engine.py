@@ -1,39 +1,132 @@
+import collections
+
+import numpy as np
+
+from .chart import SIGNS
+from .correspondences import SIGNOS
+from .geocoder import fold
+
+# Elementos en el orden cíclico de los signos (Aries, Tauro, Géminis, Cáncer, ...)
+ELEMENTOS = ("Fuego", "Tierra", "Aire", "Agua")
+
+# Reglas de aura como datos: un planeta en alguno de `signs` (nombres de
+# signo, de elemento o "*" para todos) suma `value` al modificador `effect`.
+# Un `power_boost` sin `element` potencia el elemento del signo natal.
+AURA_RULES = [
+    # Sol: dicta la reducción de costos base (abarata cartas de acción)
+    {"planet": "Sun", "signs": ["Fuego"], "effect": "cost_reduction", "value": 1},
+    # Luna: dicta el robo de cartas
+    {"planet": "Moon", "signs": ["Aire"], "effect": "draw_bonus", "value": 1},
+    # Marte: potencia su propio elemento natal
+    {"planet": "Mars", "signs": ["*"], "effect": "power_boost", "value": 2,
+     "ability": "Aura de Marte: +{value} PB a cartas de {element}"},
+]
+
+# Columnas del vector de modificadores
+MODIFIERS = ("cost_reduction", "draw_bonus") + tuple(f"power_boost:{e}" for e in ELEMENTOS)
+
+AuraTables = collections.namedtuple("AuraTables", ["planets", "vectors", "abilities"])
+
+# Nombre de signo (inglés o español, sin acentos) -> índice zodiacal
+_SIGN_INDEX = {fold(name): k for names in (SIGNS, SIGNOS) for k, name in enumerate(names)}
+
+
+def _rule_signs(names) -> list:
+    signs = set()
+    for name in names:
+        if name == "*":
+            signs.update(range(12))
+        elif name in ELEMENTOS:
+            signs.update(range(ELEMENTOS.index(name), 12, 4))
+        else:
+            signs.add(_SIGN_INDEX[fold(name)])
+    return sorted(signs)
+
+
+def compile_rules(rules) -> AuraTables:
+    """
+    Compila las reglas en tablas planeta x signo: un vector de `MODIFIERS`
+    y las habilidades especiales de cada combinación.
+    """
+    planets = tuple(dict.fromkeys(rule["planet"] for rule in rules))
+    vectors = np.zeros((len(planets), 12, len(MODIFIERS)), dtype=np.int16)
+    abilities = [[[] for _ in range(12)] for _ in planets]
+    for rule in rules:
+        p = planets.index(rule["planet"])
+        for sign in _rule_signs(rule["signs"]):
+            effect = rule["effect"]
+            element = rule.get("element", ELEMENTOS[sign % 4])
+            if effect == "power_boost":
+                effect = f"power_boost:{element}"
+            vectors[p, sign, MODIFIERS.index(effect)] += rule["value"]
+            if "ability" in rule:
+                abilities[p][sign].append(rule["ability"].format(value=rule["value"], element=element))
+    return AuraTables(planets, vectors, tuple(tuple(map(tuple, row)) for row in abilities))
+
+
+AURA_TABLES = compile_rules(AURA_RULES)
+
+
+def _sign_of(info) -> int:
+    """Índice del signo de una posición (`sign` en inglés o español, o `longitude`); -1 si falta."""
+    if not info:
+        return -1
+    if info.get("sign") is not None:
+        return _SIGN_INDEX.get(fold(info["sign"]), -1)
+    if info.get("longitude") is not None:
+        return int(float(info["longitude"]) % 360 // 30)
+    return -1
+
+
+def sign_matrix(players_positions, tables: AuraTables = AURA_TABLES) -> np.ndarray:
+    """Signos (jugadores, planetas de las reglas) de varias cartas natales; -1 si falta."""
+    return np.array(
+        [[_sign_of(positions.get(planet)) for planet in tables.planets]
+         for positions in players_positions],
+        dtype=np.int64,
+    ).reshape(len(players_positions), len(tables.planets))
+
+
+def aura_vectors(signs: np.ndarray, tables: AuraTables = AURA_TABLES) -> np.ndarray:
+    """Vectores de `MODIFIERS` (jugadores, modificadores) para una matriz de signos."""
+    signs = np.asarray(signs)
+    planets = np.arange(len(tables.planets))
+    found = tables.vectors[planets, np.maximum(signs, 0)]
+    return np.where((signs >= 0)[..., None], found, 0).sum(axis=-2)
+
+
+def _as_modifiers(vector, signs, tables: AuraTables) -> dict:
+    boosts = {
+        name.split(":", 1)[1]: int(value)
+        for name, value in zip(MODIFIERS[2:], vector[2:].tolist()) if value
+    }
+    return {
+        "cost_reduction": int(vector[0]),
+        "draw_bonus": int(vector[1]),
+        "power_boosts": boosts,  # Por elemento
+        "special_abilities": [
+            ability
+            for p, sign in enumerate(signs.tolist()) if sign >= 0
+            for ability in tables.abilities[p][sign]
+        ],
+    }
+
+
+def calculate_match_auras(players_positions, tables: AuraTables = AURA_TABLES) -> list:
+    """
+    Modificadores de aura de todos los jugadores de una partida en una sola
+    evaluación vectorizada sobre las tablas compiladas.
+    """
+    signs = sign_matrix(players_positions, tables)
+    vectors = aura_vectors(signs, tables)
+    return [_as_modifiers(v, s, tables) for v, s in zip(vectors, signs)]
+
+
 def calculate_aura_modifiers(natal_positions):
     """
     Traduce las posiciones planetarias natales en modificadores de aura pasivos.
     """
-    modifiers = {
-        "cost_reduction": 0,
-        "draw_bonus": 0,
-        "power_boosts": {}, # Por elemento
-        "special_abilities": []
-    }
-    
-    # 1. Sol: Dicta la reducción de costos base
-    sol_sign = natal_positions.get("Sun", {}).get("sign")
-    if sol_sign in ["Aries", "Leo", "Sagitario"]: # Fuego
-        modifiers["cost_reduction"] = 1 # Abarata cartas de acción
-    
-    # 2. Luna: Dicta el robo de cartas
-    luna_sign = natal_positions.get("Moon", {}).get("sign")
-    if luna_sign in ["Géminis", "Libra", "Acuario"]: # Aire
-        modifiers["draw_bonus"] = 1
-        
-    # 3. Marte: Potencia el daño de elementos específicos
-    marte_sign = natal_positions.get("Mars", {}).get("sign")
-    if marte_sign:
-        # Simplificación: Marte potencia su propio elemento natal
-        # Usamos un mapeo rápido de signos a elementos
-        sign_to_elem = {
-            "Aries": "Fuego", "Leo": "Fuego", "Sagitario": "Fuego",
-            "Tauro": "Tierra", "Virgo": "Tierra", "Capricornio": "Tierra",
-            "Géminis": "Aire", "Libra": "Aire", "Acuario": "Aire",
-            "Cáncer": "Agua", "Escorpio": "Agua", "Piscis": "Agua"
-        }
-        elem = sign_to_elem.get(marte_sign)
-        modifiers["power_boosts"][elem] = modifiers.get("power_boosts", {}).get(elem, 0) + 2
-        
-    return modifiers
+    return calculate_match_auras([natal_positions])[0]
 
 # Ejemplo de estructura de salida
 # {
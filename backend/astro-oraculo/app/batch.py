@@ -0,0 +1,142 @@
+"""
+Batch natal chart computation for `POST /natal/batch`.
+
+A batch is handled in three steps:
+
+1. Records are normalized (places resolved through the offline geocoder) and
+   identical birth data is deduplicated, so a roster with repeated players
+   only computes each chart once.
+2. Local birth times are converted to Julian days in one NumPy expression;
+   only the UTC offset lookup runs per distinct (date, time, zone).
+3. The distinct charts are computed in the calling thread. A chart takes
+   well under a millisecond, so even a full batch (`BATCH_MAX`) costs less
+   than starting or feeding a process pool; the "heavy" admission class
+   already bounds how many batches run at once.
+
+Each record gets either its chart or an `error`, in input order.
+"""
+
+import datetime
+import os
+
+import numpy as np
+import pytz
+
+# Maximum number of records accepted in a single batch
+BATCH_MAX = int(os.getenv("BATCH_MAX", "500"))
+
+
+def julian_days(year, month, day, hour) -> np.ndarray:
+    """Julian days for arrays of Gregorian calendar dates and UT hours."""
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    a = (14 - month) // 12
+    y = year + 4800 - a
+    m = month + 12 * a - 3
+    jdn = (np.asarray(day, dtype=np.int64) + (153 * m + 2) // 5 + 365 * y
+           + y // 4 - y // 100 + y // 400 - 32045)
+    return jdn - 0.5 + np.asarray(hour, dtype=np.float64) / 24.0
+
+
+def _utc_offset_hours(naive: datetime.datetime, zone: str) -> float:
+    return pytz.timezone(zone).localize(naive).utcoffset().total_seconds() / 3600.0
+
+
+def local_julian_days(moments) -> list:
+    """Julian day (or the exception raised) for each `(date, time, zone)`."""
+    parsed = []
+    errors = {}
+    for k, (date, time, zone) in enumerate(moments):
+        try:
+            naive = datetime.datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+            parsed.append((k, naive, _utc_offset_hours(naive, zone)))
+        except Exception as e:
+            errors[k] = e
+    results = [errors.get(k) for k in range(len(moments))]
+    if parsed:
+        idx, naive, offsets = zip(*parsed)
+        jds = julian_days(
+            [n.year for n in naive],
+            [n.month for n in naive],
+            [n.day for n in naive],
+            np.array([n.hour + n.minute / 60.0 for n in naive]) - np.array(offsets),
+        )
+        for k, jd in zip(idx, jds.tolist()):
+            results[k] = jd
+    return results
+
+
+def compute_charts(tasks) -> list:
+    """`(snapshot, aspects)` for each `(jd, lat, lon)` task.
+
+    A task that fails (e.g. a latitude `swe.houses` rejects) gets
+    `{"error": message}` in its position instead of failing the batch.
+    """
+    # imported here because astro_api_unified imports this module
+    from .astro_api_unified import _aspects_within, _positions_for
+    results = []
+    for jd, lat, lon in tasks:
+        try:
+            chart = _positions_for(jd, lat, lon)
+            results.append((chart, _aspects_within(chart)))
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
+def natal_batch(records: list, resolve_place) -> list:
+    """Charts for `records` in order, with per-record errors."""
+    if len(records) > BATCH_MAX:
+        raise ValueError(f"A batch accepts at most {BATCH_MAX} records")
+
+    results = [None] * len(records)
+    keys = []
+    for k, record in enumerate(records):
+        try:
+            zone, lat, lon = record.get("zone"), record.get("lat"), record.get("lon")
+            if record.get("place"):
+                found = resolve_place(record["place"])
+                zone = zone or found.timezone
+                lat = found.lat if lat is None else lat
+                lon = found.lon if lon is None else lon
+            if zone is None or lat is None or lon is None:
+                raise ValueError("Provide zone, lat and lon, or a place")
+            keys.append((k, (record["date"], record["time"], zone, float(lat), float(lon))))
+        except Exception as e:
+            results[k] = {"error": str(e)}
+
+    distinct = list(dict.fromkeys(key for _, key in keys))
+    jds = local_julian_days([key[:3] for key in distinct])
+    tasks = []
+    chart_of = {}
+    for key, jd in zip(distinct, jds):
+        if isinstance(jd, Exception):
+            chart_of[key] = {"error": str(jd)}
+        else:
+            chart_of[key] = len(tasks)
+            tasks.append((jd, key[3], key[4]))
+    charts = compute_charts(tasks)
+
+    for k, key in keys:
+        slot = chart_of[key]
+        if isinstance(slot, dict):
+            results[k] = slot
+            continue
+        if isinstance(charts[slot], dict):
+            results[k] = charts[slot]
+            continue
+        chart, aspects = charts[slot]
+        date, time, zone, lat, lon = key
+        results[k] = {
+            "date": date,
+            "time": time,
+            "zone": zone,
+            "lat": lat,
+            "lon": lon,
+            "positions": chart.to_positions(),
+            "aspects": aspects,
+        }
+    for k, record in enumerate(records):
+        if "id" in record:
+            results[k] = {"id": record["id"], **results[k]}
+    return results
@@ -0,0 +1,224 @@
+"""
+Body catalog for the astro API.
+
+Besides the ten classical planets the catalog knows the lunar nodes, Black
+Moon Lilith, Chiron and the main asteroids. Which of them a chart includes is
+configured with the `ASTRO_BODIES` environment variable: a comma separated
+list of group names (`planets`, `nodes`, `lilith`, `chiron`, `asteroids`, or
+`all`) and/or individual body names, e.g. `planets,nodes,Lilith`.
+
+Chiron and the asteroids need the `seas_*.se1` files in `EPHE_PATH`.
+
+Fixed stars are not charted as bodies. Their names come from the Swiss
+Ephemeris star catalog (`sefstars.txt`, several hundred entries, looked up in
+`EPHE_PATH` or at `FIXED_STAR_CATALOG`). Positions are precomputed once per
+epoch (calendar year) into a `FixedStarIndex` sorted by longitude, so finding
+the stars aspected by a chart is a handful of binary searches per body
+instead of a comparison against every star.
+"""
+
+import bisect
+import functools
+import os
+import threading
+import swisseph as swe
+
+BODY_GROUPS = {
+    "planets": {
+        "Sun": swe.SUN,
+        "Moon": swe.MOON,
+        "Mercury": swe.MERCURY,
+        "Venus": swe.VENUS,
+        "Mars": swe.MARS,
+        "Jupiter": swe.JUPITER,
+        "Saturn": swe.SATURN,
+        "Uranus": swe.URANUS,
+        "Neptune": swe.NEPTUNE,
+        "Pluto": swe.PLUTO,
+    },
+    "nodes": {
+        "North Node": swe.MEAN_NODE,
+        "South Node": swe.MEAN_NODE,
+    },
+    "lilith": {
+        "Lilith": swe.MEAN_APOG,
+    },
+    "chiron": {
+        "Chiron": swe.CHIRON,
+    },
+    "asteroids": {
+        "Ceres": swe.CERES,
+        "Pallas": swe.PALLAS,
+        "Juno": swe.JUNO,
+        "Vesta": swe.VESTA,
+    },
+}
+
+# Every known body, in catalog order
+BODY_CATALOG = {
+    name: pid for group in BODY_GROUPS.values() for name, pid in group.items()
+}
+
+# Points that are not ephemeris bodies themselves but sit at a fixed offset
+# from one: name -> (source body, offset in degrees)
+DERIVED_BODIES = {
+    "South Node": ("North Node", 180.0),
+}
+
+# Orb in degrees used for contacts with fixed stars
+FIXED_STAR_ORB = float(os.getenv("FIXED_STAR_ORB", "1.0"))
+
+
+_thread_state = threading.local()
+
+
+def ensure_ephe_path():
+    """Apply `EPHE_PATH` to the calling thread.
+
+    The Swiss Ephemeris keeps its settings per thread, so a path set at import
+    time is not seen by the threadpool FastAPI runs sync endpoints in.
+    """
+    if not getattr(_thread_state, "ephe_path_set", False):
+        swe.set_ephe_path(os.getenv("EPHE_PATH", "/app/ephe"))
+        _thread_state.ephe_path_set = True
+
+
+def resolve_bodies(spec: str) -> dict:
+    """Return the `{name: swe id}` mapping selected by an `ASTRO_BODIES` spec."""
+    selected = {}
+    for token in (t.strip() for t in spec.split(",")):
+        if not token:
+            continue
+        if token.lower() == "all":
+            selected.update(BODY_CATALOG)
+        elif token.lower() in BODY_GROUPS:
+            selected.update(BODY_GROUPS[token.lower()])
+        elif token in BODY_CATALOG:
+            selected[token] = BODY_CATALOG[token]
+        else:
+            raise ValueError(f"Unknown body or group: {token}")
+    # keep catalog order regardless of the order in the spec
+    return {name: pid for name, pid in BODY_CATALOG.items() if name in selected}
+
+
+def body_coordinates(jd: float, bodies: dict) -> dict:
+    """Ecliptic `(longitude, latitude)` of each body at `jd`.
+
+    Bodies sharing an ephemeris source (e.g. both nodes) are computed once.
+    """
+    ensure_ephe_path()
+    computed = {}
+    coordinates = {}
+    for name, pid in bodies.items():
+        if pid not in computed:
+            result, _ = swe.calc_ut(jd, pid)
+            computed[pid] = (result[0] % 360, result[1])
+        lon, lat = computed[pid]
+        if name in DERIVED_BODIES:
+            # derived points are antipodes of their source (offset 180°),
+            # so the ecliptic latitude flips sign as well
+            lon, lat = (lon + DERIVED_BODIES[name][1]) % 360, -lat
+        coordinates[name] = (lon, lat)
+    return coordinates
+
+
+def body_longitudes(jd: float, bodies: dict) -> dict:
+    """Ecliptic longitude of each body at `jd`."""
+    return {name: lon for name, (lon, _) in body_coordinates(jd, bodies).items()}
+
+
+class FixedStarIndex:
+    """Fixed stars sorted by ecliptic longitude for angular range queries."""
+
+    def __init__(self, stars):
+        ordered = sorted(stars, key=lambda star: star[1])
+        self.names = [name for name, _ in ordered]
+        self.longitudes = [lon for _, lon in ordered]
+
+    def __len__(self):
+        return len(self.names)
+
+    def within(self, lon: float, orb: float):
+        """Yield `(name, longitude, distance)` for stars within `orb` of `lon`."""
+        if not self.longitudes:
+            return
+        lo = (lon - orb) % 360
+        hi = (lon + orb) % 360
+        if lo <= hi:
+            spans = [(lo, hi)]
+        else:
+            # the window wraps around 0° Aries
+            spans = [(lo, 360.0), (0.0, hi)]
+        for start, end in spans:
+            first = bisect.bisect_left(self.longitudes, start)
+            last = bisect.bisect_right(self.longitudes, end)
+            for i in range(first, last):
+                diff = abs(self.longitudes[i] - lon) % 360
+                yield self.names[i], self.longitudes[i], min(diff, 360 - diff)
+
+    def contacts(self, longitudes: dict, aspect_types: dict, orb: float = FIXED_STAR_ORB):
+        """Aspects between charted bodies and the indexed stars."""
+        found = []
+        for body, lon in longitudes.items():
+            for aspect, (angle, _) in aspect_types.items():
+                # a star can sit either side of the body for any aspect but
+                # the conjunction and the opposition
+                targets = {lon + angle, lon - angle} if 0 < angle < 180 else {lon + angle}
+                for target in targets:
+                    for star, star_lon, distance in self.within(target % 360, orb):
+                        found.append({
+                            "body": body,
+                            "star": star,
+                            "star_longitude": star_lon,
+                            "aspect": aspect,
+                            "orb": round(distance, 2),
+                        })
+        return found
+
+
+def _star_catalog_path() -> str:
+    path = os.getenv("FIXED_STAR_CATALOG")
+    if path:
+        return path
+    return os.path.join(os.getenv("EPHE_PATH", "/app/ephe"), "sefstars.txt")
+
+
+@functools.lru_cache(maxsize=1)
+def fixed_star_names() -> tuple:
+    """Star identifiers (`name,nomenclature`) listed in the star catalog."""
+    path = _star_catalog_path()
+    if not os.path.exists(path):
+        return ()
+    names = {}
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = [f.strip() for f in line.split(",")]
+            if len(fields) < 2 or not fields[1]:
+                continue
+            # the catalog repeats some stars under alternative names
+            names.setdefault(fields[1], f"{fields[0]},{fields[1]}")
+    return tuple(names.values())
+
+
+@functools.lru_cache(maxsize=16)
+def fixed_star_index(epoch: int) -> FixedStarIndex:
+    """Star positions for the middle of year `epoch`, sorted for lookups."""
+    ensure_ephe_path()
+    jd = swe.julday(epoch, 7, 2, 0.0)
+    stars = []
+    for star in fixed_star_names():
+        try:
+            result, name, _ = swe.fixstar2_ut(star, jd)
+        except swe.Error:
+            continue
+        label, _, nomenclature = name.partition(",")
+        stars.append((label or nomenclature, result[0] % 360))
+    return FixedStarIndex(stars)
+
+
+def epoch_for(jd: float) -> int:
+    """Calendar year containing `jd`, used as the fixed-star epoch."""
+    return swe.revjul(jd)[0]
@@ -0,0 +1,243 @@
+"""
+Bulk chart computation from the command line.
+
+Reads birth records from a CSV or JSONL file, computes their natal charts
+with the same logic as the `/natal` endpoint across a process pool and writes
+the results to JSONL or Parquet:
+
+    python -m app.bulk_charts players.csv charts.jsonl --workers 8
+
+Each record needs `date` and `time` plus either `zone`, `lat` and `lon` or a
+`place` the offline geocoder knows; an optional `id` is carried over. Rows
+that fail are written with an `error` field instead of stopping the run.
+
+Records are processed in chunks and every finished chunk is written to its
+own part file next to the output (`<output>.parts/`). A run that is
+interrupted resumes from the chunks already on disk; the parts are merged
+into the output, in input order, once every chunk is done. The parts
+directory holds a manifest of the input (path, size, SHA-256), the chunk
+size and the format, and a run whose manifest does not match refuses to
+resume until `--restart` discards the old parts. Parquet output needs
+`pyarrow`.
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+
+from .astro_api_unified import (
+    _compute_positions_and_aspects,
+    _jd_from_local,
+    _resolve_place,
+)
+
+
+def read_records(path: str):
+    """Yield birth records from a CSV or JSONL file."""
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as fh:
+            yield from csv.DictReader(fh)
+
+
+def compute_record(record: dict) -> dict:
+    """Natal chart for one record, or the record id with an error message."""
+    result = {"id": record.get("id")}
+    try:
+        zone, lat, lon = record.get("zone"), record.get("lat"), record.get("lon")
+        if record.get("place"):
+            found = _resolve_place(record["place"])
+            zone = zone or found.timezone
+            lat = found.lat if lat in (None, "") else lat
+            lon = found.lon if lon in (None, "") else lon
+        if not zone or lat in (None, "") or lon in (None, ""):
+            raise ValueError("Provide zone, lat and lon, or a place")
+        lat, lon = float(lat), float(lon)
+        jd = _jd_from_local(record["date"], record["time"], zone)
+        positions, aspects = _compute_positions_and_aspects(jd, lat, lon)
+        result.update({
+            "date": record["date"],
+            "time": record["time"],
+            "zone": zone,
+            "lat": lat,
+            "lon": lon,
+            "positions": positions,
+            "aspects": aspects,
+        })
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def compute_chunk(records) -> list:
+    """Worker entry point: charts for one chunk of records."""
+    return [compute_record(record) for record in records]
+
+
+def _flatten(result: dict) -> dict:
+    """Columnar row for Parquet: one longitude column per body."""
+    row = {
+        key: result.get(key)
+        for key in ("id", "date", "time", "zone", "lat", "lon", "error")
+    }
+    if row["id"] is not None:
+        row["id"] = str(row["id"])
+    for name, position in result.get("positions", {}).items():
+        row[f"{name.lower().replace(' ', '_')}_lon"] = position["longitude"]
+    row["aspects"] = json.dumps(result.get("aspects", []), ensure_ascii=False)
+    return row
+
+
+def _write_part(path: str, results: list, fmt: str):
+    tmp = f"{path}.tmp"
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pylist([_flatten(r) for r in results]), tmp)
+    else:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for result in results:
+                fh.write(json.dumps(result, ensure_ascii=False) + "\n")
+    # the rename is atomic: a part on disk is always complete
+    os.replace(tmp, path)
+
+
+def _merge_parts(parts: list, output: str, fmt: str):
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        tables = [pq.read_table(part) for part in parts]
+        table = pa.concat_tables(tables, promote_options="default") if tables else pa.table({})
+        pq.write_table(table, output)
+    else:
+        with open(output, "w", encoding="utf-8") as out:
+            for part in parts:
+                with open(part, encoding="utf-8") as fh:
+                    shutil.copyfileobj(fh, out)
+
+
+def manifest(input_path: str, fmt: str, chunk_size: int) -> dict:
+    """What the part files of a run depend on."""
+    digest = hashlib.sha256()
+    with open(input_path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return {
+        "input": os.path.abspath(input_path),
+        "size": os.path.getsize(input_path),
+        "sha256": digest.hexdigest(),
+        "chunk_size": chunk_size,
+        "format": fmt,
+    }
+
+
+def _prepare_parts(parts_dir: str, expected: dict, restart: bool):
+    """Create `parts_dir`, or check that its parts belong to this run."""
+    path = os.path.join(parts_dir, "manifest.json")
+    if restart and os.path.isdir(parts_dir):
+        shutil.rmtree(parts_dir)
+    if os.path.isdir(parts_dir) and os.listdir(parts_dir):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                found = json.load(fh)
+        except (OSError, ValueError):
+            found = None
+        if found != expected:
+            raise ValueError(
+                f"{parts_dir} holds parts of a different run (input, chunk size or "
+                "format changed); use --restart to discard them"
+            )
+        return
+    os.makedirs(parts_dir, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(expected, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def run(input_path: str, output: str, fmt: str, workers: int, chunk_size: int,
+        restart: bool = False) -> int:
+    """Compute every record of `input_path` into `output`; return the row count.
+
+    Rows of chunks resumed from a previous run are included in the count.
+    """
+    parts_dir = f"{output}.parts"
+    _prepare_parts(parts_dir, manifest(input_path, fmt, chunk_size), restart)
+
+    def part_path(index: int) -> str:
+        return os.path.join(parts_dir, f"chunk-{index:06d}.{fmt}")
+
+    records = read_records(input_path)
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    parts = []
+    rows = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for index, chunk in enumerate(chunks):
+            parts.append(part_path(index))
+            if os.path.exists(part_path(index)):
+                # a part holds one row per record of its chunk
+                rows += len(chunk)
+                continue
+            pending[pool.submit(compute_chunk, chunk)] = index
+            # keep a bounded number of chunks in flight to stream large inputs
+            if len(pending) >= workers * 2:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    results = future.result()
+                    _write_part(part_path(pending.pop(future)), results, fmt)
+                    rows += len(results)
+        for future in concurrent.futures.as_completed(pending):
+            results = future.result()
+            _write_part(part_path(pending[future]), results, fmt)
+            rows += len(results)
+
+    _merge_parts(parts, output, fmt)
+    shutil.rmtree(parts_dir)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("input", help="CSV or JSONL file with birth records")
+    parser.add_argument("output", help="output file (.jsonl or .parquet)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"],
+                        help="output format (default: from the output extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="records per checkpointed chunk (default: 1000)")
+    parser.add_argument("--restart", action="store_true",
+                        help="discard checkpoints from a previous run")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "jsonl")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("Parquet output needs pyarrow (pip install pyarrow)")
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be positive")
+
+    try:
+        rows = run(args.input, args.output, fmt, args.workers, args.chunk_size, args.restart)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{rows} charts computed into {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Compact internal chart representation.
+
+A `ChartSnapshot` is a tuple of body names plus a read-only float64 array of
+their longitudes. Charts computed with the same body catalog share the same
+names tuple, so a snapshot costs one small array instead of a dict of dicts
+per body. Sign and degree are derived on demand, and the public JSON shape
+(`{body: {"longitude", "sign", "degree"}}`) is only built by `to_positions`
+when a response is serialized.
+
+Aspect detection works on whole snapshots with NumPy: pairwise separations
+are computed once as a matrix and each aspect type is a vectorized mask.
+"""
+
+import functools
+
+import numpy as np
+import swisseph as swe
+
+from .bodies import body_longitudes
+
+SIGNS = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces",
+]
+
+ANGLES = ("Ascendant", "Midheaven")
+
+# Aspect definitions: exact angle and orb
+ASPECT_TYPES = {
+    "conjunction": (0, 8),
+    "sextile": (60, 6),
+    "square": (90, 6),
+    "trine": (120, 6),
+    "opposition": (180, 8),
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _name_index(names: tuple) -> dict:
+    return {name: k for k, name in enumerate(names)}
+
+
+class ChartSnapshot:
+    """Body longitudes of one chart, indexed by body name."""
+
+    __slots__ = ("names", "longitudes")
+
+    def __init__(self, names: tuple, longitudes):
+        self.names = tuple(names)
+        lons = np.mod(np.asarray(longitudes, dtype=np.float64), 360.0)
+        lons.flags.writeable = False
+        self.longitudes = lons
+
+    @classmethod
+    def from_positions(cls, positions: dict) -> "ChartSnapshot":
+        """Snapshot from a public `positions` mapping (e.g. a stored `/natal` result)."""
+        names = tuple(positions)
+        return cls(names, [
+            p["longitude"] if isinstance(p, dict) else p for p in positions.values()
+        ])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in _name_index(self.names)
+
+    def __getstate__(self):
+        return self.names, self.longitudes
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def longitude(self, name: str) -> float:
+        return float(self.longitudes[_name_index(self.names)[name]])
+
+    def sign(self, name: str) -> str:
+        return SIGNS[int(self.longitude(name) // 30)]
+
+    def degree(self, name: str) -> float:
+        return self.longitude(name) % 30
+
+    def select(self, names) -> "ChartSnapshot":
+        """Snapshot restricted to `names` (in that order) that this chart has."""
+        index = _name_index(self.names)
+        keep = [n for n in names if n in index]
+        return ChartSnapshot(keep, self.longitudes[[index[n] for n in keep]])
+
+    def as_longitudes(self) -> dict:
+        return dict(zip(self.names, self.longitudes.tolist()))
+
+    def to_positions(self) -> dict:
+        """Public `{body: {"longitude", "sign", "degree"}}` mapping."""
+        return {
+            name: {"longitude": lon, "sign": SIGNS[int(lon // 30)], "degree": lon % 30}
+            for name, lon in zip(self.names, self.longitudes.tolist())
+        }
+
+
+def compute_chart(jd: float, lat: float, lon: float, bodies: dict) -> ChartSnapshot:
+    """Bodies plus Ascendant and Midheaven for `jd` at `lat`/`lon`."""
+    longitudes = body_longitudes(jd, bodies)
+    cusps, ascmc = swe.houses(jd, lat, lon)
+    names = _chart_names(tuple(longitudes))
+    return ChartSnapshot(names, list(longitudes.values()) + [ascmc[0], ascmc[1]])
+
+
+@functools.lru_cache(maxsize=64)
+def _chart_names(bodies: tuple) -> tuple:
+    # one shared names tuple per body catalog
+    return bodies + ANGLES
+
+
+def _separations(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    diff = np.abs(a[:, None] - b[None, :]) % 360.0
+    return np.minimum(diff, 360.0 - diff)
+
+
+def _match_aspects(sep: np.ndarray, candidates: np.ndarray, aspect_types: dict):
+    """First matching aspect type per pair, as `(rows, cols, aspect_idx, orb)`."""
+    kind = np.full(sep.shape, -1)
+    orbs = np.zeros(sep.shape)
+    for k, (angle, orb) in enumerate(aspect_types.values()):
+        deviation = np.abs(sep - angle)
+        hit = candidates & (kind < 0) & (deviation <= orb)
+        kind[hit] = k
+        orbs[hit] = deviation[hit]
+    rows, cols = np.nonzero(kind >= 0)
+    return rows, cols, kind[rows, cols], orbs[rows, cols]
+
+
+def aspects_within(chart: ChartSnapshot, aspect_types: dict) -> list:
+    """Aspects between every pair of bodies of one chart."""
+    n = len(chart)
+    sep = _separations(chart.longitudes, chart.longitudes)
+    upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+    names = list(aspect_types)
+    rows, cols, kinds, orbs = _match_aspects(sep, upper, aspect_types)
+    return [
+        {
+            "planet1": chart.names[i],
+            "planet2": chart.names[j],
+            "aspect": names[k],
+            "orb": round(o, 2),
+        }
+        for i, j, k, o in zip(rows.tolist(), cols.tolist(), kinds.tolist(), orbs.tolist())
+    ]
+
+
+def cross_aspects(chart_a: ChartSnapshot, chart_b: ChartSnapshot, aspect_types: dict,
+                  same_chart: bool = False) -> list:
+    """Aspects from every body of `chart_a` to every body of `chart_b`.
+
+    Two charts with the same longitudes (e.g. two people born at the same
+    moment) still aspect body to body; pass `same_chart=True` only when
+    comparing one chart with itself, to skip each body's aspect to itself.
+    """
+    sep = _separations(chart_a.longitudes, chart_b.longitudes)
+    candidates = np.ones(sep.shape, dtype=bool)
+    if same_chart:
+        np.fill_diagonal(candidates, False)
+    names = list(aspect_types)
+    rows, cols, kinds, orbs = _match_aspects(sep, candidates, aspect_types)
+    return [
+        {
+            "from": chart_a.names[i],
+            "to": chart_b.names[j],
+            "aspect": names[k],
+            "orb": round(o, 2),
+        }
+        for i, j, k, o in zip(rows.tolist(), cols.tolist(), kinds.tolist(), orbs.tolist())
+    ]
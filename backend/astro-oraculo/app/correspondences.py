@@ -0,0 +1,155 @@
+"""
+Astrological to tarot correspondences for oracle readings.
+
+The correspondence tables of the data bundle are compiled into lookup
+structures indexed the way a chart is (again whenever the bundle changes),
+so a reading is a constant-time lookup per body:
+
+* `degree_cards`: 360 entries, the minor arcana card of the decan each
+  whole degree of longitude falls in (`zodiac_wheel.csv`);
+* `decan_cards`: 36 entries, the card of each decan (`decanatos_menores.csv`).
+  Both files describe the same wheel, and a bundle where they disagree is
+  rejected;
+* `sign_arcana` and `sign_courts`: 12 entries in zodiac order
+  (`signos_arcanos.csv`, `signos_corte.csv`);
+* `body_arcana`: major arcana by chart body name (`planetas_tarot.csv` and
+  `puntos_especiales.csv`, whose Spanish names are mapped to the English
+  names charts use);
+* `house_aces`: 12 entries, the ace of each house (`casas_ases.csv`).
+"""
+
+import bisect
+import collections
+
+from .chart import SIGNS
+from .databundle import data_bundle
+from .geocoder import fold
+
+# Spanish sign names used by the data files, in zodiac order
+SIGNOS = [
+    "Aries", "Tauro", "Géminis", "Cáncer", "Leo", "Virgo",
+    "Libra", "Escorpio", "Sagitario", "Capricornio", "Acuario", "Piscis",
+]
+
+# Body names of the data files -> chart body names
+BODY_NAMES = {
+    "Sol": "Sun", "Sun": "Sun", "Luna": "Moon", "Mercurio": "Mercury",
+    "Venus": "Venus", "Marte": "Mars", "Jupiter": "Jupiter", "Saturno": "Saturn",
+    "Urano": "Uranus", "Neptuno": "Neptune", "Pluton": "Pluto",
+    "Nodo Norte": "North Node", "Nodo Sur": "South Node",
+    "Ascendente": "Ascendant", "Medio Cielo": "Midheaven",
+}
+
+Correspondences = collections.namedtuple(
+    "Correspondences",
+    ["degree_cards", "decan_cards", "sign_arcana", "sign_courts", "body_arcana", "house_aces"],
+)
+
+# (bundle version, Correspondences) of the last compilation
+_compiled = (None, None)
+
+
+def _sign_index(name: str) -> int:
+    return [fold(s) for s in SIGNOS].index(fold(name))
+
+
+def _body_name(name: str) -> str:
+    return {fold(k): v for k, v in BODY_NAMES.items()}.get(fold(name), name)
+
+
+def correspondences() -> Correspondences:
+    """Correspondence tables of the current data bundle."""
+    global _compiled
+    bundle = data_bundle()
+    compiled = _compiled
+    if compiled[0] != bundle.version:
+        compiled = _compiled = (bundle.version, _compile(bundle.tables))
+    return compiled[1]
+
+
+def _compile(tables: dict) -> Correspondences:
+    degree_cards = [None] * 360
+    for row in tables["zodiac_wheel.csv"]:
+        for degree in range(int(row["grado_abs_inicio"]), int(row["grado_abs_fin"]) + 1):
+            degree_cards[degree] = row["carta"]
+    if None in degree_cards:
+        raise ValueError(f"zodiac_wheel.csv leaves degree {degree_cards.index(None)} without a card")
+
+    decan_cards = [None] * 36
+    for row in tables["decanatos_menores.csv"]:
+        first = int(row["Grados"].replace("–", "-").split("-")[0])
+        decan = 3 * _sign_index(row["Signo"]) + first // 10
+        decan_cards[decan] = row["Carta"]
+    if None in decan_cards:
+        raise ValueError(f"decanatos_menores.csv leaves decan {decan_cards.index(None)} without a card")
+    for degree, card in enumerate(degree_cards):
+        if card != decan_cards[degree // 10]:
+            raise ValueError(
+                f"zodiac_wheel.csv gives degree {degree} {card}, "
+                f"decanatos_menores.csv {decan_cards[degree // 10]}"
+            )
+
+    sign_arcana = [None] * 12
+    for row in tables["signos_arcanos.csv"]:
+        sign_arcana[_sign_index(row["Signo"])] = row["Arcano"]
+    sign_courts = [None] * 12
+    for row in tables["signos_corte.csv"]:
+        sign_courts[_sign_index(row["Signo"])] = row["Corte"]
+
+    body_arcana = {}
+    for row in tables["planetas_tarot.csv"]:
+        body_arcana[_body_name(row["Planeta"])] = row["Arcano"]
+    for row in tables["puntos_especiales.csv"]:
+        body_arcana[_body_name(row["Punto"])] = row["Arcano"]
+
+    house_aces = [None] * 12
+    for row in tables["casas_ases.csv"]:
+        house_aces[int(row["Casa"]) - 1] = row["As"]
+
+    return Correspondences(
+        tuple(degree_cards), tuple(decan_cards), tuple(sign_arcana), tuple(sign_courts),
+        body_arcana, tuple(house_aces),
+    )
+
+
+def house_of(longitude: float, cusps) -> int:
+    """House (1-12) holding `longitude`, given the twelve cusps."""
+    rising = cusps[0]
+    offsets = [(c - rising) % 360 for c in cusps]
+    return bisect.bisect_right(offsets, (longitude - rising) % 360)
+
+
+def reading(chart, cusps=(), aspects=()) -> dict:
+    """Tarot cards for every body of a `ChartSnapshot`.
+
+    With the twelve house `cusps` each body also gets its house and ace;
+    `aspects` (as returned with a chart) are given the decan cards of both
+    bodies.
+    """
+    tables = correspondences()
+    cards = {}
+    for name, lon in zip(chart.names, chart.longitudes.tolist()):
+        sign = int(lon // 30)
+        card = {
+            "sign": SIGNS[sign],
+            "degree": lon % 30,
+            "decan_card": tables.degree_cards[int(lon)],
+            "sign_arcana": tables.sign_arcana[sign],
+            "court_card": tables.sign_courts[sign],
+        }
+        if name in tables.body_arcana:
+            card["arcana"] = tables.body_arcana[name]
+        if cusps:
+            house = house_of(lon, cusps)
+            card["house"] = house
+            card["house_ace"] = tables.house_aces[house - 1]
+        cards[name] = card
+    return {
+        "cards": cards,
+        "aspects": [
+            {**aspect, "cards": [cards[aspect["planet1"]]["decan_card"],
+                                 cards[aspect["planet2"]]["decan_card"]]}
+            for aspect in aspects
+            if aspect["planet1"] in cards and aspect["planet2"] in cards
+        ],
+    }
@@ -0,0 +1,174 @@
+"""
+Precomputed "carta del día".
+
+The card of the day depends only on the sky at local noon, so it is the same
+for everyone in a time zone. For every date of a rolling window
+(`DAILY_CARD_PAST` days back to `DAILY_CARD_AHEAD` days ahead) and every
+zone of `DAILY_CARD_ZONES`, the transit snapshot is computed once and
+reduced to a few small integers:
+
+* the decan of the Moon, whose minor arcana card is the card of the day (the
+  Moon changes decan about once a day);
+* the planetary ruler of the weekday;
+* the tightest aspect between the planets.
+
+They are stored in arrays indexed by zone and day, and a request only looks
+its row up and names the cards through the correspondence tables. A zone
+that is not configured is served from a configured zone with the same UTC
+offset on that date, since their local noons are the same instant.
+
+`refresh_daily_cards` rebuilds the table shortly after each UTC midnight so
+the window keeps moving without a request paying for it.
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+import threading
+
+import numpy as np
+import pytz
+import swisseph as swe
+from starlette.concurrency import run_in_threadpool
+
+from .bodies import BODY_GROUPS, body_longitudes
+from .chart import ASPECT_TYPES, SIGNS, ChartSnapshot, aspects_within
+from .correspondences import correspondences
+
+# Time zones the table is computed for
+DAILY_CARD_ZONES = tuple(
+    zone.strip() for zone in os.getenv(
+        "DAILY_CARD_ZONES",
+        "UTC,Europe/Madrid,America/Mexico_City,America/Bogota,"
+        "America/Argentina/Buenos_Aires,America/New_York,America/Los_Angeles",
+    ).split(",") if zone.strip()
+)
+
+# Days kept before and after today
+DAILY_CARD_PAST = int(os.getenv("DAILY_CARD_PAST", "1"))
+DAILY_CARD_AHEAD = int(os.getenv("DAILY_CARD_AHEAD", "7"))
+
+# Planetary ruler of each weekday, Monday first
+DAY_RULERS = ("Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun")
+
+logger = logging.getLogger(__name__)
+
+
+def _local_noon_jd(day: datetime.date, zone: str) -> float:
+    noon = pytz.timezone(zone).localize(datetime.datetime(day.year, day.month, day.day, 12))
+    utc = noon.astimezone(pytz.utc)
+    return swe.julday(utc.year, utc.month, utc.day,
+                      utc.hour + utc.minute / 60.0 + utc.second / 3600.0)
+
+
+class DailyCardTable:
+    """Daily card components for `days` dates from `start`, per zone."""
+
+    bodies = tuple(BODY_GROUPS["planets"])
+    aspect_names = tuple(ASPECT_TYPES)
+
+    def __init__(self, start: datetime.date, days: int, zones=DAILY_CARD_ZONES):
+        self.start = start
+        self.days = days
+        self.zones = tuple(zones)
+        self._rows = {zone: k for k, zone in enumerate(self.zones)}
+        shape = (len(self.zones), days)
+        self.decans = np.zeros(shape, dtype=np.int8)
+        # tightest aspect as (body, body, aspect) indexes, -1 when there is none
+        self.aspects = np.full(shape + (3,), -1, dtype=np.int8)
+        self.orbs = np.zeros(shape, dtype=np.float32)
+        index = {name: k for k, name in enumerate(self.bodies)}
+        kinds = {name: k for k, name in enumerate(self.aspect_names)}
+        for z, zone in enumerate(self.zones):
+            for d in range(days):
+                jd = _local_noon_jd(start + datetime.timedelta(days=d), zone)
+                longitudes = body_longitudes(jd, BODY_GROUPS["planets"])
+                chart = ChartSnapshot(self.bodies, list(longitudes.values()))
+                self.decans[z, d] = int(chart.longitude("Moon") // 10)
+                found = aspects_within(chart, ASPECT_TYPES)
+                if found:
+                    tight = min(found, key=lambda a: a["orb"])
+                    self.aspects[z, d] = (index[tight["planet1"]], index[tight["planet2"]],
+                                          kinds[tight["aspect"]])
+                    self.orbs[z, d] = tight["orb"]
+
+    @property
+    def end(self) -> datetime.date:
+        return self.start + datetime.timedelta(days=self.days)
+
+    def bucket(self, zone: str, day: datetime.date) -> str:
+        """Configured zone whose local noon on `day` is the same instant as `zone`'s."""
+        if zone in self._rows:
+            return zone
+        noon = datetime.datetime(day.year, day.month, day.day, 12)
+        offset = pytz.timezone(zone).utcoffset(noon)
+        for candidate in self.zones:
+            if pytz.timezone(candidate).utcoffset(noon) == offset:
+                return candidate
+        raise ValueError(f"No daily card is computed for the UTC offset of {zone}")
+
+    def lookup(self, zone: str, day: datetime.date) -> dict:
+        """Card of the day for `zone` on `day`, named through the correspondences."""
+        if not self.start <= day < self.end:
+            raise ValueError(f"{day} is outside the daily card window "
+                             f"{self.start} to {self.end - datetime.timedelta(days=1)}")
+        bucket = self.bucket(zone, day)
+        z, d = self._rows[bucket], (day - self.start).days
+        tables = correspondences()
+        decan = int(self.decans[z, d])
+        ruler = DAY_RULERS[day.weekday()]
+        card = {
+            "date": day.isoformat(),
+            "zone": zone,
+            "bucket": bucket,
+            "card": tables.decan_cards[decan],
+            "moon_sign": SIGNS[decan // 3],
+            "sign_arcana": tables.sign_arcana[decan // 3],
+            "ruler": ruler,
+            "ruler_arcana": tables.body_arcana.get(ruler),
+            "aspect": None,
+        }
+        first, second, kind = self.aspects[z, d].tolist()
+        if kind >= 0:
+            card["aspect"] = {
+                "planet1": self.bodies[first],
+                "planet2": self.bodies[second],
+                "aspect": self.aspect_names[kind],
+                "orb": round(float(self.orbs[z, d]), 2),
+            }
+        return card
+
+
+_lock = threading.Lock()
+_table = None
+
+
+def _window_start() -> datetime.date:
+    return datetime.datetime.now(pytz.utc).date() - datetime.timedelta(days=DAILY_CARD_PAST)
+
+
+def daily_cards() -> DailyCardTable:
+    """Table of the current window, built when the window has moved."""
+    global _table
+    start = _window_start()
+    table = _table
+    if table is None or table.start != start:
+        with _lock:
+            if _table is None or _table.start != start:
+                _table = DailyCardTable(start, DAILY_CARD_PAST + 1 + DAILY_CARD_AHEAD)
+            table = _table
+    return table
+
+
+async def refresh_daily_cards():
+    """Rebuild the table just after every UTC midnight."""
+    while True:
+        try:
+            await run_in_threadpool(daily_cards)
+        except Exception:
+            logger.exception("Building the daily card table failed")
+        now = datetime.datetime.now(pytz.utc)
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1),
+                                             datetime.time(0, 0, 5), pytz.utc)
+        await asyncio.sleep((midnight - now).total_seconds())
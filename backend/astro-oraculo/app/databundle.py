@@ -0,0 +1,229 @@
+"""
+Compiled data bundle.
+
+The correspondence tables (`data/*.csv`), the JSON documents in `data/` and
+the game definitions in `core/*.json` are validated, normalized and compiled
+into one versioned binary file:
+
+    python -m app.databundle            # writes data/astro-data.bundle
+
+Normalization strips byte order marks and surrounding whitespace and puts
+text in NFC form. CSV files become lists of row dicts and must have as many
+fields per row as headers; JSON files must parse.
+
+The bundle file (`DATA_BUNDLE`) holds plain data only: a magic line, a JSON
+header with the version and the SHA-256 of the body, and the JSON body with
+the tables. Nothing in it is executed when it is read, and a
+file whose magic, checksum or structure does not match is rejected.
+
+Every `BUNDLE_CHECK_INTERVAL` seconds an access checks whether a new file
+was dropped in (written elsewhere and renamed over it) and swaps the loaded
+bundle atomically; a file that fails to load leaves the current one in
+place. Without a bundle file the sources are compiled in memory.
+"""
+
+import argparse
+import collections
+import csv
+import datetime
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(APP_DIR, "..", "data")
+CORE_DIR = os.getenv("DATA_CORE_DIR", os.path.join(APP_DIR, "..", "..", "..", "core"))
+
+# Compiled bundle read by the server
+DATA_BUNDLE = os.getenv("DATA_BUNDLE", os.path.join(DATA_DIR, "astro-data.bundle"))
+
+# Seconds between two checks for a new bundle file
+BUNDLE_CHECK_INTERVAL = float(os.getenv("BUNDLE_CHECK_INTERVAL", "5"))
+
+_MAGIC = b"ASTRODB2\n"
+
+_VERSION = re.compile(r"[0-9a-f]{16}")
+
+Bundle = collections.namedtuple("Bundle", ["version", "built", "tables"])
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return unicodedata.normalize("NFC", value.strip())
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {_normalize(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+def _decode(raw: bytes) -> str:
+    return raw.decode("utf-8-sig")
+
+
+def compile_csv(raw: bytes, name: str) -> list:
+    """Rows of a CSV file as normalized dicts; ragged rows are an error."""
+    reader = csv.reader(io.StringIO(_decode(raw), newline=""))
+    header = [_normalize(h) for h in next(reader, [])]
+    rows = []
+    for line, row in enumerate(reader, start=2):
+        if not any(field.strip() for field in row):
+            continue
+        if len(row) != len(header):
+            raise ValueError(f"{name}:{line}: {len(row)} fields for {len(header)} headers")
+        rows.append(dict(zip(header, _normalize(row))))
+    return rows
+
+
+def compile_json(raw: bytes, name: str):
+    """Normalized JSON document."""
+    try:
+        return _normalize(json.loads(_decode(raw)))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{name}: {e}") from None
+
+
+def sources() -> list:
+    """`(table name, path)` of every source file, in a stable order."""
+    found = []
+    for name in sorted(os.listdir(DATA_DIR)):
+        if name.lower().endswith((".csv", ".json")):
+            found.append((name, os.path.join(DATA_DIR, name)))
+    if os.path.isdir(CORE_DIR):
+        for name in sorted(os.listdir(CORE_DIR)):
+            if name.lower().endswith(".json"):
+                found.append((f"core/{name}", os.path.join(CORE_DIR, name)))
+    return found
+
+
+def compile_bundle() -> Bundle:
+    """Compile every source file; the version is a hash of their contents."""
+    digest = hashlib.sha256()
+    tables = {}
+    for name, path in sources():
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        digest.update(name.encode() + b"\0" + raw)
+        if name.lower().endswith(".csv"):
+            tables[name] = compile_csv(raw, name)
+        else:
+            tables[name] = compile_json(raw, name)
+    built = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0).isoformat()
+    return Bundle(digest.hexdigest()[:16], built, tables)
+
+
+def write_bundle(bundle: Bundle, path: str):
+    """Write `bundle` to `path` atomically."""
+    body = json.dumps(
+        {"tables": bundle.tables},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode()
+    header = json.dumps({
+        "version": bundle.version,
+        "built": bundle.built,
+        "sha256": hashlib.sha256(body).hexdigest(),
+    }).encode()
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_MAGIC + header + b"\n" + body)
+    os.replace(tmp, path)
+
+
+def read_bundle(path: str) -> Bundle:
+    """Load and validate a bundle file; raises ValueError if it is not one."""
+    with open(path, "rb") as fh:
+        data = fh.read()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a data bundle")
+    header, _, body = data[len(_MAGIC):].partition(b"\n")
+    try:
+        header = json.loads(header)
+        version, built, checksum = header["version"], header["built"], header["sha256"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError(f"{path}: malformed bundle header") from None
+    if not isinstance(version, str) or not _VERSION.fullmatch(version):
+        raise ValueError(f"{path}: bad bundle version {version!r}")
+    if hashlib.sha256(body).hexdigest() != checksum:
+        raise ValueError(f"{path}: bundle checksum mismatch")
+    body = json.loads(body)
+    tables = body.get("tables")
+    if not isinstance(tables, dict) or not all(
+        isinstance(v, (list, dict)) for v in tables.values()
+    ):
+        raise ValueError(f"{path}: bundle tables must be a mapping of documents")
+    return Bundle(version, str(built), tables)
+
+
+class _Loaded:
+    """The bundle in use and the identity of the file it came from."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bundle = None
+        self.stamp = None
+        self.checked = 0.0
+
+
+_loaded = _Loaded()
+
+
+def _file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def data_bundle() -> Bundle:
+    """The current bundle, swapped for a newer file when one was dropped in."""
+    now = time.monotonic()
+    if _loaded.bundle is not None and now - _loaded.checked < BUNDLE_CHECK_INTERVAL:
+        return _loaded.bundle
+    with _loaded.lock:
+        if _loaded.bundle is not None and now - _loaded.checked < BUNDLE_CHECK_INTERVAL:
+            return _loaded.bundle
+        _loaded.checked = now
+        stamp = _file_stamp(DATA_BUNDLE)
+        if stamp is not None and stamp != _loaded.stamp:
+            _loaded.stamp = stamp
+            try:
+                bundle = read_bundle(DATA_BUNDLE)
+            except Exception:
+                logger.exception("Could not load data bundle %s", DATA_BUNDLE)
+            else:
+                if _loaded.bundle is not None:
+                    logger.info("Data bundle %s replaces %s", bundle.version,
+                                _loaded.bundle.version)
+                _loaded.bundle = bundle
+        if _loaded.bundle is None:
+            logger.warning("No data bundle at %s, compiling the sources", DATA_BUNDLE)
+            _loaded.bundle = compile_bundle()
+        return _loaded.bundle
+
+
+def table(name: str):
+    """Compiled table or document `name` (e.g. `zodiac_wheel.csv`, `core/rules.json`)."""
+    return data_bundle().tables[name]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", default=DATA_BUNDLE,
+                        help=f"bundle file to write (default: {DATA_BUNDLE})")
+    args = parser.parse_args(argv)
+    bundle = compile_bundle()
+    write_bundle(bundle, args.output)
+    print(f"bundle {bundle.version}: {len(bundle.tables)} tables -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Offline geocoder for birth places.
+
+Places are loaded once from a local file: by default the bundled
+`data/places.csv` (name, country, lat, lon, population, timezone), or a
+GeoNames dump such as `cities15000.txt` when `PLACES_PATH` points to one
+(tab separated, detected by the `.txt` extension).
+
+Names are accent and case folded and kept in a sorted prefix index, so
+autocomplete is two binary searches plus a pick of the most populated
+matches, and every result carries the IANA timezone the chart endpoints need.
+"""
+
+import bisect
+import collections
+import csv
+import functools
+import heapq
+import os
+import unicodedata
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+Place = collections.namedtuple(
+    "Place", ["name", "country", "lat", "lon", "population", "timezone"]
+)
+
+
+def fold(text: str) -> str:
+    """Lowercase `text` and strip accents and repeated whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def _read_csv(path: str):
+    with open(path, encoding="utf-8-sig", newline="") as fh:
+        for row in csv.DictReader(fh):
+            place = Place(
+                row["name"], row["country"], float(row["lat"]), float(row["lon"]),
+                int(row["population"] or 0), row["timezone"],
+            )
+            yield place, (place.name,)
+
+
+def _read_geonames(path: str):
+    # https://download.geonames.org/export/dump/readme.txt, "geoname" table
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 18 or not cols[17]:
+                continue
+            place = Place(
+                cols[1], cols[8], float(cols[4]), float(cols[5]),
+                int(cols[14] or 0), cols[17],
+            )
+            yield place, (cols[1], cols[2])
+
+
+def load_places(path: str):
+    """`(place, names)` pairs from a bundled CSV or a GeoNames dump."""
+    if path.endswith(".txt"):
+        return list(_read_geonames(path))
+    return list(_read_csv(path))
+
+
+class PlaceIndex:
+    """Sorted prefix index over folded place names."""
+
+    def __init__(self, entries):
+        self.places = []
+        keyed = []
+        for place, names in entries:
+            for key in {fold(n) for n in names if n}:
+                keyed.append((key, len(self.places)))
+            self.places.append(place)
+        keyed.sort()
+        self._keys = [key for key, _ in keyed]
+        self._ids = [i for _, i in keyed]
+
+    def __len__(self):
+        return len(self.places)
+
+    def _range(self, prefix: str):
+        first = bisect.bisect_left(self._keys, prefix)
+        last = bisect.bisect_left(self._keys, prefix + "\uffff")
+        return first, last
+
+    def complete(self, prefix: str, limit: int = 10, country: str = None):
+        """Most populated places whose name starts with `prefix`."""
+        first, last = self._range(fold(prefix))
+        ids = {
+            i for i in self._ids[first:last]
+            if country is None or self.places[i].country == country
+        }
+        best = heapq.nlargest(limit, ids, key=lambda i: self.places[i].population)
+        return [self.places[i] for i in best]
+
+    def resolve(self, query: str):
+        """Best place for `query` ("Name" or "Name, CC"), or None.
+
+        Exact name matches win over prefix matches; ties go to the most
+        populated place.
+        """
+        name, _, country = query.partition(",")
+        country = country.strip().upper() or None
+        key = fold(name)
+        first, last = self._range(key)
+        exact = [
+            self.places[self._ids[k]] for k in range(first, last)
+            if self._keys[k] == key
+            and (country is None or self.places[self._ids[k]].country == country)
+        ]
+        if exact:
+            return max(exact, key=lambda p: p.population)
+        matches = self.complete(name, 1, country)
+        return matches[0] if matches else None
+
+
+@functools.lru_cache(maxsize=1)
+def place_index() -> PlaceIndex:
+    """Index over the configured place file, built on first use."""
+    path = os.getenv("PLACES_PATH", os.path.join(DATA_DIR, "places.csv"))
+    return PlaceIndex(load_places(path))
+
+
+def place_to_dict(place: Place) -> dict:
+    return {
+        "name": place.name,
+        "country": place.country,
+        "lat": place.lat,
+        "lon": place.lon,
+        "zone": place.timezone,
+        "population": place.population,
+    }
@@ -0,0 +1,80 @@
+"""
+Harmonic charts computed with NumPy.
+
+The harmonic `n` of a chart moves every body to `n * longitude mod 360`.
+Bodies that end up conjunct in the n-th harmonic chart are in an aspect of
+360/n degrees (or a multiple of it) in the natal chart, which is what the
+game uses for its harmonic bonuses (armónicos 6, 8 and 12).
+
+All functions work on arrays of longitudes with shape `(..., bodies)`, so a
+single chart and a stack of stored charts go through the same code.
+"""
+
+import numpy as np
+
+# Harmonics the game rules give special effects to
+GAME_HARMONICS = (6, 8, 12)
+
+# Default orb, in degrees of the harmonic chart, for harmonic conjunctions
+HARMONIC_ORB = 2.0
+
+
+def harmonic_matrix(longitudes, harmonics) -> np.ndarray:
+    """Harmonic longitudes with shape `(..., harmonics, bodies)`."""
+    lons = np.asarray(longitudes, dtype=np.float64)
+    ns = np.asarray(harmonics, dtype=np.float64)
+    return np.mod(ns[:, None] * lons[..., None, :], 360.0)
+
+
+def _pair_separation(matrix: np.ndarray) -> np.ndarray:
+    """Angular separation of every pair of bodies, shape `(..., H, N, N)`."""
+    diff = np.abs(matrix[..., :, None] - matrix[..., None, :]) % 360.0
+    return np.minimum(diff, 360.0 - diff)
+
+
+def harmonic_aspect_mask(matrix: np.ndarray, angle: float = 0.0, orb: float = HARMONIC_ORB) -> np.ndarray:
+    """Boolean `(..., H, N, N)` mask of body pairs in `angle` within `orb`.
+
+    Only the upper triangle is set, so each pair appears once. NaN longitudes
+    (bodies missing from a stored chart) never match.
+    """
+    sep = _pair_separation(matrix)
+    n = matrix.shape[-1]
+    upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+    return (np.abs(sep - angle) <= orb) & upper
+
+
+def harmonic_resonance(matrix: np.ndarray, orb: float = HARMONIC_ORB) -> np.ndarray:
+    """Number of conjunct pairs per harmonic, shape `(..., H)`."""
+    return harmonic_aspect_mask(matrix, 0.0, orb).sum(axis=(-2, -1))
+
+
+def harmonic_conjunctions(names, harmonics, matrix: np.ndarray, orb: float = HARMONIC_ORB):
+    """List the conjunctions of a single chart's harmonic matrix."""
+    sep = _pair_separation(matrix)
+    mask = harmonic_aspect_mask(matrix, 0.0, orb)
+    found = []
+    for h, i, j in zip(*np.nonzero(mask)):
+        found.append({
+            "harmonic": int(harmonics[h]),
+            "planet1": names[i],
+            "planet2": names[j],
+            "orb": round(float(sep[h, i, j]), 2),
+        })
+    return found
+
+
+def longitude_table(charts, names) -> np.ndarray:
+    """Stack stored charts into a `(charts, bodies)` array ordered by `names`.
+
+    Each chart is either a `positions` mapping as returned by `/natal`
+    (`{body: {"longitude": ...}}`) or a plain `{body: longitude}` mapping.
+    Bodies a chart does not have are left as NaN.
+    """
+    table = np.full((len(charts), len(names)), np.nan)
+    column = {name: k for k, name in enumerate(names)}
+    for row, chart in enumerate(charts):
+        for name, value in chart.items():
+            if name in column:
+                table[row, column[name]] = value["longitude"] if isinstance(value, dict) else value
+    return table
@@ -1,7 +1,10 @@
 from fastapi import FastAPI, HTTPException
-import os
-import json
-from .natal import natal_chart  # Reutilizamos la lógica que ya tienes
+from pydantic import BaseModel
+from typing import Any, Dict, List
+
+from .batch import BATCH_MAX, local_julian_days
+from .bodies import BODY_GROUPS
+from .chart import SIGNS, compute_chart
 
 app = FastAPI(title="Mazo de Identidad Astral")
 
@@ -16,50 +19,103 @@ HEPTAGRAM_EFFECTS = {
     "Saturn": {"type": "SATURNO", "name": "Límite", "desc": "Control, Restricción y Estructura."}
 }
 
+# Cuerpos calculados para un mazo: los siete del Heptagrama (más Ascendente y Medio Cielo)
+IDENTITY_BODIES = {name: BODY_GROUPS["planets"][name] for name in HEPTAGRAM_EFFECTS}
+
+
+def _card_template(planet: str, sign: str) -> dict:
+    effect = HEPTAGRAM_EFFECTS[planet]
+    return {
+        "card_id": f"NATAL_{planet.upper()}",
+        "name": f"Tu {planet} en {sign}",
+        "arquetipo": planet,
+        "signo_natal": sign,
+        "casa_natal": None,  # grado dentro del signo, propio de cada jugador
+        "efecto_heptagrama": effect["type"],
+        "descripcion": f"{effect['name']}: {effect['desc']} Potenciada en la Casa de {sign}.",
+        "power_base": 10 if planet == "Sun" else 5,  # Valores base ejemplo
+        "especial": True,
+    }
+
+
+# Las 7 x 12 cartas posibles y los 12 avatares, construidos una sola vez:
+# un mazo se arma indexando por el signo de cada planeta
+IDENTITY_CARDS = tuple(
+    tuple(_card_template(planet, sign) for sign in SIGNS) for planet in HEPTAGRAM_EFFECTS
+)
+AVATARS = tuple(
+    {
+        "tipo": "Ascendente",
+        "signo": sign,
+        "habilidad_pasiva": f"Inicia la partida con influencia de {sign}.",
+    }
+    for sign in SIGNS
+)
+
+
+def identity_deck(chart) -> dict:
+    """Mazo de identidad de una carta calculada con `IDENTITY_BODIES`."""
+    longitudes = chart.longitudes.tolist()
+    identity_deck = [
+        {**IDENTITY_CARDS[k][int(lon // 30)], "casa_natal": lon % 30}
+        for k, lon in enumerate(longitudes[:len(IDENTITY_CARDS)])
+    ]
+    # El "Avatar" se basa en el Ascendente
+    return {
+        "player_avatar": dict(AVATARS[int(chart.longitude("Ascendant") // 30)]),
+        "identity_deck": identity_deck,
+        "total_cards": len(identity_deck),
+    }
+
+
+def _chart(jd: float, lat: float, lon: float):
+    return compute_chart(jd, lat, lon, IDENTITY_BODIES)
+
+
 @app.get("/player/identity-deck")
 def get_identity_deck(date: str, time: str, zone: str, lat: float, lon: float):
     """
     Genera el mazo de identidad único basado en la Carta Natal del jugador.
     """
     try:
-        # 1. Obtener la carta natal usando tu lógica de Swiss Ephemeris
-        chart = natal_chart(date, time, zone, lat, lon)
-        positions = chart["positions"]
-        
-        identity_deck = []
-        
-        # 2. Mapear cada planeta natal a una carta especial del jugador
-        for planet, info in positions.items():
-            if planet in HEPTAGRAM_EFFECTS:
-                effect = HEPTAGRAM_EFFECTS[planet]
-                
-                # Creamos la "Carta Astral" del jugador
-                card = {
-                    "card_id": f"NATAL_{planet.upper()}",
-                    "name": f"Tu {planet} en {info['sign']}",
-                    "arquetipo": planet,
-                    "signo_natal": info["sign"],
-                    "casa_natal": info["degree"], # Simplificación
-                    "efecto_heptagrama": effect["type"],
-                    "descripcion": f"{effect['name']}: {effect['desc']} Potenciada en la Casa de {info['sign']}.",
-                    "power_base": 10 if planet == "Sun" else 5, # Valores base ejemplo
-                    "especial": True
-                }
-                identity_deck.append(card)
-                
-        # 3. Identificar el "Avatar" (Basado en el Ascendente)
-        asc = positions.get("Ascendant")
-        avatar = {
-            "tipo": "Ascendente",
-            "signo": asc["sign"],
-            "habilidad_pasiva": f"Inicia la partida con influencia de {asc['sign']}."
-        }
-
-        return {
-            "player_avatar": avatar,
-            "identity_deck": identity_deck,
-            "total_cards": len(identity_deck)
-        }
-        
+        jd = local_julian_days([(date, time, zone)])[0]
+        if isinstance(jd, Exception):
+            raise jd
+        return identity_deck(_chart(jd, lat, lon))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error generando mazo de identidad: {str(e)}")
+
+
+class IdentityBatchRequest(BaseModel):
+    players: List[Dict[str, Any]]
+
+
+@app.post("/player/identity-deck/batch")
+def get_identity_decks(request: IdentityBatchRequest):
+    """
+    Mazos de identidad de todos los participantes de una partida, en orden.
+
+    Cada jugador lleva `date`, `time`, `zone`, `lat`, `lon` y opcionalmente
+    `player` (su identificador); los datos natales repetidos se calculan una
+    sola vez y un jugador con datos inválidos recibe `error` en lugar de mazo.
+    """
+    players = request.players
+    if len(players) > BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX} players per batch")
+    moments = [(p.get("date"), p.get("time"), p.get("zone")) for p in players]
+    jds = local_julian_days(moments)
+    decks = []
+    charts = {}
+    for player, jd in zip(players, jds):
+        result = {"player": player.get("player")}
+        try:
+            if isinstance(jd, Exception):
+                raise jd
+            key = (jd, float(player["lat"]), float(player["lon"]))
+            if key not in charts:
+                charts[key] = identity_deck(_chart(*key))
+            result.update(charts[key])
+        except Exception as e:
+            result["error"] = f"Error generando mazo de identidad: {str(e)}"
+        decks.append(result)
+    return {"decks": decks}
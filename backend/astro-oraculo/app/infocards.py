@@ -0,0 +1,159 @@
+"""
+Full-text search over the infocard library.
+
+The major arcana (`AMAinfocard_final.json`) and the four suits
+(`Ame*infocard*.json`) of the data bundle are indexed once per bundle
+version into an inverted index: every accent- and case-folded word maps to
+the cards and fields it occurs in, scored by the field's weight. A query
+looks each of its words up as a prefix of the sorted vocabulary (whole-word
+hits score more than prefix hits), keeps the cards matching every word and
+ranks them by score, so a search costs a few dictionary lookups instead of
+a scan over every card's text.
+"""
+
+import bisect
+import collections
+import re
+
+from .databundle import data_bundle
+from .geocoder import fold
+
+# Infocard files of the data bundle and the suit their cards belong to
+INFOCARD_FILES = {
+    "AMAinfocard_final.json": "Arcanos Mayores",
+    "AmeBASTOinfocard.json": "Bastos",
+    "AmeCOPAinfocard.json": "Copas",
+    "AmeESPADAinfocard.json": "Espadas",
+    "AmeOROinfocard_final.json": "Oros",
+}
+
+# Searched fields and the weight of a word found in each
+FIELD_WEIGHTS = {
+    "nombre": 4.0,
+    "arquetipo": 3.0,
+    "personalidad": 2.0,
+    "efecto": 1.5,
+}
+
+# Score factor of a word matched only as a prefix
+PREFIX_FACTOR = 0.5
+
+# Characters of field text shown around the first match
+SNIPPET_LENGTH = 120
+
+_WORD = re.compile(r"\w+")
+
+Card = collections.namedtuple("Card", ["id", "nombre", "suit", "fields"])
+
+InfocardIndex = collections.namedtuple("InfocardIndex", ["cards", "postings", "terms"])
+
+# (bundle version, InfocardIndex) of the last build
+_built = (None, None)
+
+
+def _words(text: str):
+    """`(folded word, start, end)` of every word in `text`."""
+    for match in _WORD.finditer(text):
+        yield fold(match.group()), match.start(), match.end()
+
+
+def build_index(tables: dict) -> InfocardIndex:
+    """Inverted index over the infocards of the bundle `tables`."""
+    cards = []
+    # term -> {card: {field: weight}}
+    postings = collections.defaultdict(lambda: collections.defaultdict(dict))
+    for name, suit in INFOCARD_FILES.items():
+        for card_id, info in tables[name]["cartas"].items():
+            fields = {f: str(info[f]) for f in FIELD_WEIGHTS if info.get(f)}
+            card = len(cards)
+            cards.append(Card(card_id, info.get("nombre", card_id), suit, fields))
+            for field, text in fields.items():
+                for term, _, _ in _words(text):
+                    hits = postings[term][card]
+                    hits[field] = hits.get(field, 0.0) + FIELD_WEIGHTS[field]
+    postings = {term: dict(hits) for term, hits in postings.items()}
+    return InfocardIndex(cards, postings, sorted(postings))
+
+
+def infocard_index() -> InfocardIndex:
+    """Index of the current data bundle."""
+    global _built
+    bundle = data_bundle()
+    built = _built
+    if built[0] != bundle.version:
+        built = _built = (bundle.version, build_index(bundle.tables))
+    return built[1]
+
+
+def _matches(index: InfocardIndex, word: str) -> dict:
+    """`{card: {field: score}}` of the terms starting with `word`."""
+    found = collections.defaultdict(dict)
+    start = bisect.bisect_left(index.terms, word)
+    for term in index.terms[start:]:
+        if not term.startswith(word):
+            break
+        factor = 1.0 if term == word else PREFIX_FACTOR
+        for card, hits in index.postings[term].items():
+            for field, weight in hits.items():
+                # several prefix terms in one field count as its best one
+                found[card][field] = max(found[card].get(field, 0.0), factor * weight)
+    return found
+
+
+def _snippet(text: str, words: list) -> str:
+    spans = [(start, end) for term, start, end in _words(text)
+             if any(term.startswith(w) for w in words)]
+    if not spans:
+        return text[:SNIPPET_LENGTH]
+    first = spans[0][0]
+    start = max(0, min(first - SNIPPET_LENGTH // 3, len(text) - SNIPPET_LENGTH))
+    end = start + SNIPPET_LENGTH
+    parts = ["…" if start else ""]
+    position = start
+    for span_start, span_end in spans:
+        if span_start < start or span_end > end:
+            continue
+        parts.append(text[position:span_start] + "**" + text[span_start:span_end] + "**")
+        position = span_end
+    parts.append(text[position:end] + ("…" if end < len(text) else ""))
+    return "".join(parts)
+
+
+def search(query: str, limit: int = 10) -> list:
+    """Cards matching every word of `query`, best first, with a snippet.
+
+    Each word also matches longer words it is a prefix of, so partial input
+    already finds results.
+    """
+    index = infocard_index()
+    words = [term for term, _, _ in _words(query)]
+    if not words:
+        return []
+    scores = None
+    fields = collections.defaultdict(dict)
+    for word in words:
+        found = _matches(index, word)
+        hits = {card: sum(f.values()) for card, f in found.items()}
+        scores = hits if scores is None else {
+            card: score + hits[card] for card, score in scores.items() if card in hits
+        }
+        for card, f in found.items():
+            for field, score in f.items():
+                fields[card][field] = fields[card].get(field, 0.0) + score
+        if not scores:
+            return []
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    results = []
+    for card, score in ranked:
+        info = index.cards[card]
+        # the snippet comes from the field contributing most to the score
+        field = max(fields[card].items(), key=lambda item: item[1])[0]
+        results.append({
+            "id": info.id,
+            "nombre": info.nombre,
+            "suit": info.suit,
+            "score": round(score, 2),
+            "field": field,
+            "snippet": _snippet(info.fields[field], words),
+        })
+    return results
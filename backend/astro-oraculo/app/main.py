@@ -1,9 +1,15 @@
 from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
 import os
 import datetime
 import swisseph as swe
 import pytz
 
+from .bodies import BODY_GROUPS
+from .chart import ASPECT_TYPES, aspects_within, compute_chart
+from .correspondences import reading
+from .narrative import compose
+
 # Initialize FastAPI app
 app = FastAPI(title="Astro Oraculo API")
 api = app
@@ -87,15 +93,49 @@ def natal_chart():
     # TODO: implement natal chart computation using Swiss Ephemeris
     return {"message": "natal endpoint placeholder"}
 
+class LecturaRequest(BaseModel):
+    date: str
+    time: str
+    zone: str
+    lat: float
+    lon: float
+
+
+def _lectura_chart(request: LecturaRequest):
+    """Chart and house cusps for the birth data of a reading request."""
+    dt = datetime.datetime.strptime(f"{request.date} {request.time}", "%Y-%m-%d %H:%M")
+    dt_utc = pytz.timezone(request.zone).localize(dt).astimezone(pytz.utc)
+    jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day,
+                    dt_utc.hour + dt_utc.minute/60.0 + dt_utc.second/3600.0)
+    chart = compute_chart(jd, request.lat, request.lon, BODY_GROUPS["planets"])
+    cusps, _ = swe.houses(jd, request.lat, request.lon)
+    return chart, cusps
+
+
 @app.post("/oraculo/lectura")
-def oraculo_lectura():
+def oraculo_lectura(request: LecturaRequest):
     """
-    Placeholder endpoint for generating oracular readings based on astrological data.
-    It should map positions and aspects to tarot cards using CSV correspondences.
+    Oracular reading for given birth data: the tarot cards of every planet,
+    angle, house and aspect, from the CSV correspondences loaded once.
     """
-    # TODO: implement oracular reading logic
+    try:
+        chart, cusps = _lectura_chart(request)
+        return reading(chart, cusps, aspects_within(chart, ASPECT_TYPES))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
-    return {"message": "oráculo lectura endpoint placeholder"}
+@app.post("/oraculo/narrativa")
+def oraculo_narrativa(request: LecturaRequest):
+    """
+    Narrative reading for given birth data, composed from the oracle manual's
+    templates in its three levels instead of an LLM round trip.
+    """
+    try:
+        chart, cusps = _lectura_chart(request)
+        return compose(chart, cusps, aspects_within(chart, ASPECT_TYPES))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/transits/daily/full")
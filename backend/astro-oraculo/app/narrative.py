@@ -0,0 +1,212 @@
+"""
+Narrative oracle readings composed from precompiled templates.
+
+`manual_oraculo_tarot.csv` fixes the structure of a reading: twelve pillars
+(the bodies and angles of the chart, in the manual's order), each told on
+three levels with their own cards and tone, never repeating a card between
+the levels of one pillar:
+
+* Nivel 1 – Constelación: major arcana of the body and of its sign, court
+  card of the sign;
+* Nivel 2 – Cosmos: ace of its house and minor card of its decan, with the
+  decan's key phrase from `decanatos_bestia_tantrica.csv`;
+* Nivel 3 – Séptimo Sentido: the card of the aspect (the decan reached by
+  the aspect's offset from `aspectos_offsets.csv`) and the major arcana of
+  the aspecting body, closed by the decan's exercise.
+
+The tables are compiled into `string.Template` objects and per-decan lookups
+once per data bundle version. Rendered fragments are cached by the cards,
+position and aspect they depend on, so a reading is a handful of lookups and
+string joins.
+"""
+
+import collections
+import functools
+import os
+import string
+
+from .chart import ANGLES, SIGNS
+from .correspondences import BODY_NAMES, SIGNOS, correspondences, house_of
+from .databundle import data_bundle
+from .geocoder import fold
+
+# Number of rendered fragments kept in memory
+NARRATIVE_CACHE = int(os.getenv("NARRATIVE_CACHE", "8192"))
+
+# Body names as told in a reading
+CUERPOS = {
+    "Sun": "el Sol", "Moon": "la Luna", "Mercury": "Mercurio", "Venus": "Venus",
+    "Mars": "Marte", "Jupiter": "Júpiter", "Saturn": "Saturno", "Uranus": "Urano",
+    "Neptune": "Neptuno", "Pluto": "Plutón", "North Node": "el Nodo Norte",
+    "South Node": "el Nodo Sur", "Ascendant": "el Ascendente", "Midheaven": "el Medio Cielo",
+}
+
+# Chart aspect names -> `aspectos_offsets.csv` names, and how each is told
+ASPECTOS = {
+    "conjunction": "conjuncion",
+    "sextile": "sextil",
+    "square": "cuadratura",
+    "trine": "trigono",
+    "opposition": "oposicion",
+}
+ASPECT_VERBS = {
+    "conjunction": "se funde con",
+    "sextile": "dialoga con",
+    "square": "se tensa con",
+    "trine": "fluye con",
+    "opposition": "se mira en el espejo de",
+}
+
+TEMPLATES = {
+    1: "$Cuerpo en $signo aparece como $arcano, bajo el signo de $arcano_signo, "
+       "y actúa con el porte de $corte.",
+    2: "En la vida diaria, $cuerpo se vive en la casa $casa, donde $as abre la escena; "
+       "$carta pone la historia en marcha: «$frase»",
+    "2-sin-casa": "En la vida diaria, $carta pone en marcha lo que $cuerpo trae: «$frase»",
+    3: "En lo interno, $cuerpo $verbo $otro: $carta_aspecto señala el camino y "
+       "$arcano_otro enseña a integrarlo. Práctica: $ejercicio.",
+    "3-sin-aspecto": "En lo interno, $cuerpo trabaja en silencio. Práctica: $ejercicio.",
+}
+
+Narrative = collections.namedtuple(
+    "Narrative", ["pillars", "levels", "templates", "phrases", "exercises", "offsets"],
+)
+
+# (bundle version, Narrative) of the last compilation
+_compiled = (None, None)
+
+
+def _title(card: str) -> str:
+    """Card name without its number, e.g. `XIX El Sol` -> `El Sol`."""
+    number, _, rest = card.partition(" ")
+    if rest and (number.isdigit() or set(number) <= set("IVXL")):
+        return rest
+    return card
+
+
+def _compile(tables: dict) -> Narrative:
+    manual = tables["manual_oraculo_tarot.csv"]
+    bodies = {fold(k): v for k, v in BODY_NAMES.items()}
+    pillars = []
+    levels = {}
+    for row in manual:
+        if row["section"] == "ESTRUCTURA" and row["subsection"] == "12 Pilares":
+            names = row["text"].rstrip(".").split(",")
+            pillars = [bodies[fold(name)] for name in names if fold(name) in bodies]
+        elif row["section"] == "TONO":
+            level = int(row["subsection"].split()[1])
+            levels[level] = {"title": row["subsection"], "tone": row["text"]}
+
+    phrases = [None] * 36
+    exercises = [None] * 36
+    signos = [fold(s) for s in SIGNOS]
+    for row in tables["decanatos_bestia_tantrica.csv"]:
+        decan = 3 * signos.index(fold(row["Signo"])) + int(row["Decanato"]) - 1
+        phrases[decan] = row["Frase_Clave"]
+        exercises[decan] = row["Ejercicio_Bestial"]
+
+    offsets = {row["aspecto"]: int(row["offset_decanos"]) for row in tables["aspectos_offsets.csv"]}
+    templates = {key: string.Template(text) for key, text in TEMPLATES.items()}
+    return Narrative(tuple(pillars), levels, templates, tuple(phrases), tuple(exercises), offsets)
+
+
+def narrative_tables() -> Narrative:
+    """Narrative templates of the current data bundle."""
+    global _compiled
+    bundle = data_bundle()
+    compiled = _compiled
+    if compiled[0] != bundle.version:
+        compiled = _compiled = (bundle.version, _compile(bundle.tables))
+    return compiled[1]
+
+
+def _capitalized(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+@functools.lru_cache(maxsize=NARRATIVE_CACHE)
+def _constellation(version: str, body: str, sign: int):
+    cards = correspondences()
+    arcana = [cards.body_arcana[body], cards.sign_arcana[sign], cards.sign_courts[sign]]
+    text = narrative_tables().templates[1].substitute(
+        Cuerpo=_capitalized(CUERPOS.get(body, body)), signo=SIGNOS[sign],
+        arcano=_title(arcana[0]), arcano_signo=_title(arcana[1]), corte=arcana[2],
+    )
+    return tuple(arcana), text
+
+
+@functools.lru_cache(maxsize=NARRATIVE_CACHE)
+def _cosmos(version: str, body: str, decan: int, house: int):
+    cards = correspondences()
+    tables = narrative_tables()
+    card = cards.decan_cards[decan]
+    values = {"cuerpo": CUERPOS.get(body, body), "carta": card, "frase": tables.phrases[decan]}
+    if house:
+        ace = cards.house_aces[house - 1]
+        return (ace, card), tables.templates[2].substitute(values, casa=house, **{"as": ace})
+    return (card,), tables.templates["2-sin-casa"].substitute(values)
+
+
+@functools.lru_cache(maxsize=NARRATIVE_CACHE)
+def _inner(version: str, body: str, decan: int, aspect: str, other: str, target: int):
+    cards = correspondences()
+    tables = narrative_tables()
+    values = {"cuerpo": CUERPOS.get(body, body), "ejercicio": tables.exercises[decan]}
+    if aspect is None:
+        return (), tables.templates["3-sin-aspecto"].substitute(values)
+    pair = (cards.decan_cards[target], cards.body_arcana[other])
+    return pair, tables.templates[3].substitute(
+        values, verbo=ASPECT_VERBS[aspect], otro=CUERPOS.get(other, other),
+        carta_aspecto=pair[0], arcano_otro=_title(pair[1]),
+    )
+
+
+def compose(chart, cusps=(), aspects=()) -> dict:
+    """Narrative reading of a `ChartSnapshot`, pillar by pillar.
+
+    With the twelve house `cusps` the second level names the house;
+    `aspects` (as returned with a chart) feed the third level, tightest
+    first, skipping aspects whose cards the pillar already used.
+    """
+    version = data_bundle().version
+    tables = narrative_tables()
+    cards = correspondences()
+    positions = dict(zip(chart.names, chart.longitudes.tolist()))
+    by_body = collections.defaultdict(list)
+    for aspect in sorted(aspects, key=lambda a: a["orb"]):
+        by_body[aspect["planet1"]].append((aspect["aspect"], aspect["planet2"]))
+        by_body[aspect["planet2"]].append((aspect["aspect"], aspect["planet1"]))
+
+    pillars = []
+    for body in tables.pillars:
+        if body not in positions or body not in cards.body_arcana:
+            continue
+        lon = positions[body]
+        sign, decan = int(lon // 30), int(lon // 10)
+        house = house_of(lon, cusps) if cusps else 0
+        told = [_constellation(version, body, sign), _cosmos(version, body, decan, house)]
+        used = set(told[0][0]) | set(told[1][0])
+        inner = None
+        for aspect, other in by_body[body]:
+            if other not in cards.body_arcana or (other in ANGLES and body in ANGLES):
+                continue
+            # the aspect card is the decan the aspect's offset reaches from
+            # this body, counted towards the other one
+            offset = tables.offsets.get(ASPECTOS.get(aspect), 0)
+            if (positions[other] - lon) % 360 > 180:
+                offset = -offset
+            candidate = _inner(version, body, decan, aspect, other, (decan + offset) % 36)
+            if not used & set(candidate[0]):
+                inner = candidate
+                break
+        told.append(inner or _inner(version, body, decan, None, None, decan))
+        levels = []
+        for level, (level_cards, text) in enumerate(told, start=1):
+            levels.append({**tables.levels.get(level, {}), "level": level,
+                           "cards": list(level_cards), "text": text})
+        pillars.append({"body": body, "sign": SIGNS[sign], "levels": levels})
+
+    return {
+        "pillars": pillars,
+        "text": "\n\n".join(" ".join(level["text"] for level in p["levels"]) for p in pillars),
+    }
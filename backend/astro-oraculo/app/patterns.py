@@ -0,0 +1,171 @@
+"""
+Aspect pattern detection.
+
+A chart is turned into one aspect graph per aspect type: bodies are nodes
+and an edge joins two bodies within orb of that aspect. Each graph is stored
+as one integer bitmask of neighbours per body, so every configuration is
+found by intersecting neighbour sets instead of trying every combination of
+bodies:
+
+* Grand Trine: triangles of the trine graph.
+* T-Square: an opposition whose two ends are both squared by an apex.
+* Grand Cross: two oppositions squaring each other.
+* Yod: a sextile whose two ends are both quincunx an apex.
+* Stellium: `STELLIUM_MIN` or more bodies in one sign.
+
+Adjacency matrices for many charts are built in one NumPy pass, which keeps
+bulk detection cheap with the extended body catalog.
+"""
+
+import numpy as np
+
+from .bodies import DERIVED_BODIES
+from .chart import ANGLES, SIGNS
+
+# Exact angle and orb of the aspects patterns are made of
+PATTERN_ASPECTS = {
+    "conjunction": (0, 8),
+    "sextile": (60, 6),
+    "square": (90, 6),
+    "trine": (120, 6),
+    "quincunx": (150, 3),
+    "opposition": (180, 8),
+}
+
+# Bodies in one sign needed for a stellium
+STELLIUM_MIN = 3
+
+
+def aspect_graphs(longitudes, names, aspects: dict = PATTERN_ASPECTS):
+    """Adjacency and orb matrices per aspect type.
+
+    `longitudes` has shape (N,) or (charts, N), NaN for missing bodies; the
+    result maps each aspect to `(adjacent, orbs)` arrays of shape (..., N, N).
+    """
+    lons = np.asarray(longitudes, dtype=np.float64)
+    diff = np.abs(lons[..., :, None] - lons[..., None, :]) % 360.0
+    sep = np.minimum(diff, 360.0 - diff)
+    n = len(names)
+    # edges that hold by construction (North and South Node) are not aspects
+    linked = np.eye(n, dtype=bool)
+    index = {name: k for k, name in enumerate(names)}
+    for name, (source, _) in DERIVED_BODIES.items():
+        if name in index and source in index:
+            linked[index[name], index[source]] = linked[index[source], index[name]] = True
+    graphs = {}
+    for aspect, (angle, orb) in aspects.items():
+        orbs = np.abs(sep - angle)
+        graphs[aspect] = ((orbs <= orb) & ~linked, orbs)
+    return graphs
+
+
+def _bitmasks(adjacent: np.ndarray) -> list:
+    """Neighbour set of every body as an integer bitmask."""
+    return [
+        sum(1 << int(j) for j in np.flatnonzero(row)) for row in adjacent
+    ]
+
+
+def _members(mask: int):
+    k = 0
+    while mask:
+        if mask & 1:
+            yield k
+        mask >>= 1
+        k += 1
+
+
+def _pattern(kind: str, names, bodies, orbs, edges, apex=None) -> dict:
+    found = {
+        "pattern": kind,
+        "bodies": [names[b] for b in bodies],
+        "orb": round(max(float(orbs[a, b]) for a, b in edges), 2),
+    }
+    if apex is not None:
+        found["apex"] = names[apex]
+    return found
+
+
+def _stellia(longitudes, names) -> list:
+    found = []
+    bodies = [k for k, name in enumerate(names)
+              if name not in ANGLES and not np.isnan(longitudes[k])]
+    signs = (np.asarray(longitudes)[bodies] // 30).astype(int)
+    for sign in np.flatnonzero(np.bincount(signs, minlength=12) >= STELLIUM_MIN):
+        members = [b for b, s in zip(bodies, signs) if s == sign]
+        found.append({
+            "pattern": "Stellium",
+            "bodies": [names[b] for b in members],
+            "sign": SIGNS[sign],
+        })
+    return found
+
+
+def find_patterns(longitudes, names, graphs=None) -> list:
+    """Aspect patterns of one chart, given its longitudes in `names` order."""
+    if graphs is None:
+        graphs = aspect_graphs(longitudes, names)
+    trine_adj, trine_orb = graphs["trine"]
+    square_adj, square_orb = graphs["square"]
+    opp_adj, opp_orb = graphs["opposition"]
+    sextile_adj, sextile_orb = graphs["sextile"]
+    qx_adj, qx_orb = graphs["quincunx"]
+    trine, square, opp = _bitmasks(trine_adj), _bitmasks(square_adj), _bitmasks(opp_adj)
+    sextile, qx = _bitmasks(sextile_adj), _bitmasks(qx_adj)
+    found = []
+
+    # Grand Trines: i < j < k, each pair trine
+    for i in range(len(names)):
+        for j in _members(trine[i] >> (i + 1)):
+            j += i + 1
+            for k in _members((trine[i] & trine[j]) >> (j + 1)):
+                k += j + 1
+                found.append(_pattern("Grand Trine", names, (i, j, k), trine_orb,
+                                      ((i, j), (j, k), (i, k))))
+
+    # T-Squares and Grand Crosses share the oppositions squared from both ends
+    crosses = set()
+    tsquares = []
+    for a in range(len(names)):
+        for b in _members(opp[a] >> (a + 1)):
+            b += a + 1
+            apexes = square[a] & square[b]
+            for c in _members(apexes):
+                for d in _members(opp[c] & apexes):
+                    crosses.add(frozenset((a, b, c, d)))
+                tsquares.append((a, b, c))
+    hard_orb = np.where(opp_adj, opp_orb, square_orb)
+    for cross in sorted(sorted(cross) for cross in crosses):
+        # each body opposes one other and squares the remaining two
+        edges = [(x, y) for x in cross for y in cross if x < y]
+        found.append(_pattern("Grand Cross", names, cross, hard_orb, edges))
+    for a, b, c in tsquares:
+        # a T-Square inside a Grand Cross is reported as the cross
+        if any({a, b, c} <= cross for cross in crosses):
+            continue
+        found.append(_pattern("T-Square", names, (a, b, c), hard_orb,
+                              ((a, b), (a, c), (b, c)), apex=c))
+
+    # Yods: a sextile whose ends are both quincunx the apex
+    yod_orb = np.where(sextile_adj, sextile_orb, qx_orb)
+    for a in range(len(names)):
+        for b in _members(sextile[a] >> (a + 1)):
+            b += a + 1
+            for c in _members(qx[a] & qx[b]):
+                found.append(_pattern("Yod", names, (a, b, c), yod_orb,
+                                      ((a, b), (a, c), (b, c)), apex=c))
+
+    found.extend(_stellia(longitudes, names))
+    return found
+
+
+def find_patterns_bulk(table, names) -> list:
+    """Aspect patterns for every row of a (charts, bodies) longitude table."""
+    table = np.asarray(table, dtype=np.float64)
+    graphs = aspect_graphs(table, names)
+    return [
+        find_patterns(row, names, {
+            aspect: (adjacent[c], orbs[c]) for aspect, (adjacent, orbs) in graphs.items()
+        })
+        for c, row in enumerate(table)
+    ]
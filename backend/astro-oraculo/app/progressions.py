@@ -0,0 +1,107 @@
+"""
+Secondary progressions and solar/lunar return search.
+
+Secondary progressions use the day-for-a-year key: the progressed chart for
+a date is the sky `age in years` days after birth.
+
+Returns are located by Newton iteration on the Sun's or Moon's longitude
+(Swiss Ephemeris gives the daily speed with `FLG_SPEED`), which converges in
+a few ephemeris calls instead of stepping through the year. Return instants
+are cached per natal moment and year, so repeated requests for the same
+player only pay for the search once.
+"""
+
+import datetime
+import functools
+import swisseph as swe
+
+from .bodies import ensure_ephe_path
+
+# Length of the tropical year in days, used by the day-for-a-year key
+TROPICAL_YEAR = 365.242199
+
+# Mean sidereal month, used to seed and enumerate lunar returns
+SIDEREAL_MONTH = 27.321661
+
+# Convergence tolerance in degrees (about 0.1 s of solar motion)
+_TOLERANCE = 1e-6
+_MAX_ITERATIONS = 20
+
+
+def progressed_jd(natal_jd: float, target_jd: float) -> float:
+    """Julian day whose sky gives the secondary progressions for `target_jd`."""
+    return natal_jd + (target_jd - natal_jd) / TROPICAL_YEAR
+
+
+def _signed_diff(a: float, b: float) -> float:
+    """Signed difference `a - b` folded into [-180, 180)."""
+    return (a - b + 180.0) % 360.0 - 180.0
+
+
+def _longitude_and_speed(jd: float, body: int):
+    result, _ = swe.calc_ut(jd, body, swe.FLG_SPEED)
+    return result[0] % 360, result[3]
+
+
+def find_return(body: int, target_lon: float, guess_jd: float) -> float:
+    """Julian day near `guess_jd` at which `body` is at `target_lon`."""
+    ensure_ephe_path()
+    jd = guess_jd
+    for _ in range(_MAX_ITERATIONS):
+        lon, speed = _longitude_and_speed(jd, body)
+        delta = _signed_diff(target_lon, lon)
+        if abs(delta) < _TOLERANCE:
+            return jd
+        jd += delta / speed
+    raise ValueError("Return search did not converge")
+
+
+def natal_longitude(natal_jd: float, body: int) -> float:
+    """Longitude of `body` at the natal moment."""
+    ensure_ephe_path()
+    return _longitude_and_speed(natal_jd, body)[0]
+
+
+@functools.lru_cache(maxsize=4096)
+def solar_return(natal_jd: float, year: int) -> float:
+    """Julian day of the solar return in calendar year `year`."""
+    birth_year = swe.revjul(natal_jd)[0]
+    guess = natal_jd + (year - birth_year) * TROPICAL_YEAR
+    return find_return(swe.SUN, natal_longitude(natal_jd, swe.SUN), guess)
+
+
+@functools.lru_cache(maxsize=4096)
+def lunar_returns(natal_jd: float, year: int) -> tuple:
+    """Julian days of every lunar return in calendar year `year`."""
+    target = natal_longitude(natal_jd, swe.MOON)
+    start = swe.julday(year, 1, 1, 0.0)
+    end = swe.julday(year + 1, 1, 1, 0.0)
+    ensure_ephe_path()
+    moon, speed = _longitude_and_speed(start, swe.MOON)
+    jd = start + ((target - moon) % 360.0) / speed
+    found = []
+    while True:
+        jd = find_return(swe.MOON, target, jd)
+        if jd >= end:
+            break
+        if jd >= start:
+            found.append(jd)
+        jd += SIDEREAL_MONTH
+    return tuple(found)
+
+
+def next_lunar_return(natal_jd: float, after_jd: float) -> float:
+    """First lunar return at or after `after_jd`."""
+    year = swe.revjul(after_jd)[0]
+    for jd in lunar_returns(natal_jd, year) + lunar_returns(natal_jd, year + 1):
+        if jd >= after_jd:
+            return jd
+    raise ValueError("No lunar return found")
+
+
+def jd_to_utc(jd: float) -> str:
+    """ISO 8601 UTC timestamp for a Julian day."""
+    year, month, day, hours = swe.revjul(jd)
+    moment = datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
+    moment += datetime.timedelta(hours=hours)
+    return moment.replace(microsecond=0).isoformat()
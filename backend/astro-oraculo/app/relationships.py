@@ -0,0 +1,55 @@
+"""
+Relationship charts built from two natal charts.
+
+* Composite: every body sits at the circular midpoint (shorter arc) of its
+  longitudes in both charts.
+* Davison: a real chart cast for the midpoint in time and the geographic
+  midpoint in space of both births.
+
+Midpoints are computed with NumPy over whole longitude arrays, so both charts
+are combined in one operation whatever the size of the body catalog.
+"""
+
+import numpy as np
+
+from .chart import ChartSnapshot
+
+
+def circular_midpoints(lons_a, lons_b) -> np.ndarray:
+    """Midpoint on the shorter arc between paired longitudes, in [0, 360)."""
+    a = np.asarray(lons_a, dtype=np.float64)
+    b = np.asarray(lons_b, dtype=np.float64)
+    arc = np.mod(b - a + 180.0, 360.0) - 180.0
+    return np.mod(a + arc / 2.0, 360.0)
+
+
+def composite_chart(chart_a: ChartSnapshot, chart_b: ChartSnapshot) -> ChartSnapshot:
+    """Composite snapshot for every body present in both charts."""
+    if chart_a.names != chart_b.names:
+        chart_b = chart_b.select(chart_a.names)
+        chart_a = chart_a.select(chart_b.names)
+    return ChartSnapshot(
+        chart_a.names, circular_midpoints(chart_a.longitudes, chart_b.longitudes)
+    )
+
+
+def geographic_midpoint(lat_a: float, lon_a: float, lat_b: float, lon_b: float):
+    """Great-circle midpoint of two places, as `(lat, lon)` in degrees."""
+    lats = np.radians([lat_a, lat_b])
+    lons = np.radians([lon_a, lon_b])
+    vectors = np.stack([
+        np.cos(lats) * np.cos(lons),
+        np.cos(lats) * np.sin(lons),
+        np.sin(lats),
+    ])
+    x, y, z = vectors.sum(axis=1)
+    lat = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    lon = np.degrees(np.arctan2(y, x))
+    return float(lat), float(lon)
+
+
+def davison_moment(jd_a: float, lat_a: float, lon_a: float,
+                   jd_b: float, lat_b: float, lon_b: float):
+    """Julian day and place `(jd, lat, lon)` of the Davison chart."""
+    lat, lon = geographic_midpoint(lat_a, lon_a, lat_b, lon_b)
+    return (jd_a + jd_b) / 2.0, lat, lon
@@ -0,0 +1,298 @@
+"""
+Preload-and-fork production server.
+
+    python -m app.serve app.astro_api_unified:app --workers 4 --port 10000
+
+The master process imports the application and warms what it uses (place
+index, fixed star catalog, ephemeris pages) once, freezes the heap with
+`gc.freeze()` and binds the listening socket. It then forks the workers,
+which share those pages copy-on-write and accept from the same socket.
+
+* Readiness: a worker computes a warm-up chart before it starts accepting
+  connections and reports to the master once uvicorn is serving, i.e. after
+  the application's lifespan startup has run, so a cold worker never takes
+  traffic.
+* Recycling: a worker exits gracefully after `--max-requests` requests (plus
+  a random jitter so workers do not restart together); SIGHUP replaces every
+  worker one at a time, each only after its replacement is ready.
+* Supervision: workers that die are replaced; SIGTERM or SIGINT stops the
+  workers gracefully, killing those still busy after `--graceful-timeout`.
+
+The worker count defaults to `WEB_CONCURRENCY` or the number of cores.
+"""
+
+import argparse
+import gc
+import importlib
+import logging
+import os
+import random
+import selectors
+import signal
+import socket
+import time
+
+import swisseph as swe
+import uvicorn
+
+logger = logging.getLogger("app.serve")
+
+# Shared caches warmed in the master before forking
+PRELOAD = (
+    ("app.databundle", "data_bundle", ()),
+    ("app.correspondences", "correspondences", ()),
+    ("app.wheel", "static_wheel", ()),
+    ("app.infocards", "infocard_index", ()),
+    ("app.daily_card", "daily_cards", ()),
+    ("app.geocoder", "place_index", ()),
+    ("app.bodies", "fixed_star_names", ()),
+    ("app.bodies", "fixed_star_index", (time.gmtime().tm_year,)),
+)
+
+# Seconds a worker has to report ready before it is replaced
+READY_TIMEOUT = 60.0
+
+
+def load_app(target: str):
+    """Import `module:attribute` and return the ASGI application."""
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute or "app")
+
+
+def _ephe_path() -> str:
+    return os.getenv("EPHE_PATH", "/app/ephe")
+
+
+def warm_chart():
+    """Compute one chart so the ephemeris files are opened and paged in."""
+    swe.set_ephe_path(_ephe_path())
+    jd = swe.julday(2000, 1, 1, 12.0)
+    for body in range(swe.PLUTO + 1):
+        swe.calc_ut(jd, body)
+    swe.houses(jd, 0.0, 0.0)
+
+
+def preload():
+    """Import the modules in `PRELOAD` and warm their shared caches."""
+    for module_name, function, args in PRELOAD:
+        try:
+            getattr(importlib.import_module(module_name), function)(*args)
+        except Exception:
+            logger.exception("Preloading %s.%s failed", module_name, function)
+    warm_chart()
+    # Swiss Ephemeris file handles must not be shared: each worker reopens
+    # them, reading the same pages from the OS cache
+    swe.close()
+
+
+class _WorkerServer(uvicorn.Server):
+    """uvicorn server that reports to the master once it accepts connections."""
+
+    def __init__(self, config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets)
+        if self.started:
+            os.write(self.ready_fd, f"{os.getpid()}\n".encode())
+
+
+class Master:
+    """Forks, supervises and recycles the worker processes."""
+
+    def __init__(self, app, sock: socket.socket, workers: int, max_requests: int,
+                 max_requests_jitter: int, graceful_timeout: float, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.size = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.workers = {}  # pid -> fork time
+        self.ready = set()
+        self.retiring = []  # workers waiting to be replaced after SIGHUP
+        self.terminating = set()  # workers told to stop, still finishing requests
+        self.replacement = None
+        self.stopping = False
+        self.ready_r, self.ready_w = os.pipe()
+        self.wake_r, self.wake_w = os.pipe()
+        self._ready_buffer = b""
+
+    # -- workers -------------------------------------------------------------
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+        # worker
+        try:
+            code = self._serve()
+        except BaseException:
+            logger.exception("Worker %s crashed", os.getpid())
+            code = 1
+        os._exit(code)
+
+    def _serve(self) -> int:
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        signal.set_wakeup_fd(-1)
+        os.close(self.ready_r)
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+        random.seed()
+        # readiness gate: warm this process before accepting anything
+        warm_chart()
+        limit = None
+        if self.max_requests:
+            limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+        config = uvicorn.Config(
+            self.app, log_level=self.log_level, limit_max_requests=limit,
+            timeout_graceful_shutdown=self.graceful_timeout,
+        )
+        _WorkerServer(config, self.ready_w).run(sockets=[self.sock])
+        return 0
+
+    def _terminate(self, pid: int, signum=signal.SIGTERM):
+        self.terminating.add(pid)
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            was_ready = pid in self.ready
+            self.ready.discard(pid)
+            self.terminating.discard(pid)
+            if pid in self.retiring:
+                self.retiring.remove(pid)
+            if pid == self.replacement:
+                self.replacement = None
+            if started is None or self.stopping:
+                continue
+            logger.info("Worker %s exited (status %s)", pid, status)
+            if not was_ready and time.monotonic() - started < 1.0:
+                # failing at startup: do not fork in a tight loop
+                time.sleep(1.0)
+
+    def _read_ready(self):
+        self._ready_buffer += os.read(self.ready_r, 4096)
+        *lines, self._ready_buffer = self._ready_buffer.split(b"\n")
+        for line in lines:
+            pid = int(line)
+            if pid in self.workers:
+                self.ready.add(pid)
+                logger.info("Worker %s ready", pid)
+
+    def _maintain(self):
+        if self.stopping:
+            return
+        now = time.monotonic()
+        for pid, started in list(self.workers.items()):
+            if pid not in self.ready and now - started > READY_TIMEOUT:
+                logger.warning("Worker %s not ready after %ss, replacing it", pid, READY_TIMEOUT)
+                self._terminate(pid, signal.SIGKILL)
+        # rolling replacement: retire an old worker once its replacement is ready
+        if not self.retiring:
+            # the old workers are gone: the replacement is a regular worker
+            self.replacement = None
+        elif self.replacement is None:
+            self.replacement = self.spawn()
+        elif self.replacement in self.ready:
+            self._terminate(self.retiring.pop(0))
+            self.replacement = None
+        # the replacement runs on top of the pool until it takes an old worker's place
+        serving = len(self.workers) - len(self.terminating) - (self.replacement is not None)
+        for _ in range(self.size - serving):
+            self.spawn()
+
+    # -- master loop ---------------------------------------------------------
+
+    def _signal(self, signum, frame):
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self.stopping = True
+        elif signum == signal.SIGHUP:
+            self.retiring = [pid for pid in self.workers if pid != self.replacement]
+            logger.info("Recycling %d workers", len(self.retiring))
+
+    def run(self):
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(signum, self._signal)
+        os.set_blocking(self.wake_w, False)
+        signal.set_wakeup_fd(self.wake_w)
+        selector = selectors.DefaultSelector()
+        selector.register(self.ready_r, selectors.EVENT_READ, self._read_ready)
+        selector.register(self.wake_r, selectors.EVENT_READ,
+                          lambda: os.read(self.wake_r, 4096))
+        logger.info("Master %s serving with %d workers", os.getpid(), self.size)
+        while not self.stopping:
+            self._maintain()
+            for key, _ in selector.select(timeout=1.0):
+                key.data()
+            self._reap()
+        self.stop()
+
+    def stop(self):
+        for pid in self.workers:
+            self._terminate(pid)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in self.workers:
+            self._terminate(pid, signal.SIGKILL)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("app", nargs="?", default="app.astro_api_unified:app",
+                        help="ASGI application as module:attribute")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "10000")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1,
+                        help="worker processes (default: WEB_CONCURRENCY or all cores)")
+    parser.add_argument("--max-requests", type=int, default=0,
+                        help="recycle a worker after this many requests (default: never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=0,
+                        help="random extra requests per worker before recycling")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="seconds a stopping worker has to finish its requests")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be positive")
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s: %(message)s")
+    app = load_app(args.app)
+    preload()
+
+    sock = socket.socket(socket.AF_INET6 if ":" in args.host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # keep the preloaded objects out of the collector so workers do not
+    # dirty the shared pages by scanning them
+    gc.collect()
+    gc.freeze()
+
+    Master(
+        app, sock, args.workers, args.max_requests, args.max_requests_jitter,
+        args.graceful_timeout, args.log_level,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Nearest-neighbour index over stored charts ("players with a sky like yours").
+
+Each chart is embedded as the cosine and sine of its body longitudes, scaled
+by a per-body weight, so the Euclidean distance between two embeddings grows
+with the angular distance of each body around the circle and 0° and 359°
+are neighbours.
+
+Embeddings are kept in a KD-tree (median splits on the widest dimension,
+bounding-box pruning, NumPy distance scans in the leaves). Inserts go to a small unindexed buffer
+that is scanned alongside the tree and merged into a rebuilt tree once it
+grows past a fraction of the index, so inserting stays cheap and queries
+stay logarithmic in practice.
+
+Weights are configured with `SIMILARITY_WEIGHTS`, e.g. `Sun=2,Moon=2,Ascendant=1.5`
+(other bodies weigh 1).
+
+With `SIMILARITY_PATH` set the index is persisted as an append-only JSON
+lines log: a header with the body names, then one `{"id", "lon"}` record per
+insert. Writers append under an exclusive `flock`, so server worker
+processes never overwrite each other, and every process reads only the
+records appended since its last look. Once replaced ids make up most of the
+log it is compacted to one record per id and renamed over the old file;
+readers notice the new file and reload it. A log written for other bodies
+(a changed `ASTRO_BODIES`) is rejected.
+"""
+
+import fcntl
+import heapq
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+# Points per KD-tree leaf
+LEAF_SIZE = 256
+
+# Buffered inserts that trigger a rebuild, as a fraction of the tree size
+_REBUILD_FRACTION = 0.125
+_REBUILD_MIN = 256
+
+# Log records per live chart that trigger a compaction
+_COMPACT_RATIO = 2
+_COMPACT_MIN = 1024
+
+
+def parse_weights(spec: str) -> dict:
+    """`{body: weight}` from a `Body=weight,...` specification."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def embed(longitudes, weights) -> np.ndarray:
+    """Circular features `(..., 2 * bodies)` for longitudes `(..., bodies)`.
+
+    Missing bodies (NaN) embed as the origin for that body.
+    """
+    rad = np.radians(np.asarray(longitudes, dtype=np.float64))
+    w = np.asarray(weights, dtype=np.float64)
+    features = np.concatenate([w * np.cos(rad), w * np.sin(rad)], axis=-1)
+    return np.nan_to_num(features, nan=0.0)
+
+
+class KDTree:
+    """Static KD-tree over the rows of `points`.
+
+    Every node keeps the bounding box of its points; queries visit nodes
+    nearest box first and skip boxes farther than the k-th best distance.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.order = np.arange(len(self.points))
+        self.leaf_size = leaf_size
+        # per node: (left, right) children, or (-1, -1) for a leaf
+        self.children = []
+        self.spans = []
+        self.lo = []
+        self.hi = []
+        if len(self.points):
+            self._build(0, len(self.points))
+        self.lo = np.array(self.lo)
+        self.hi = np.array(self.hi)
+
+    def __len__(self):
+        return len(self.order)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self.children)
+        block = self.points[self.order[start:end]]
+        low, high = block.min(axis=0), block.max(axis=0)
+        self.children.append((-1, -1))
+        self.spans.append((start, end))
+        self.lo.append(low)
+        self.hi.append(high)
+        if end - start > self.leaf_size:
+            dim = int(np.argmax(high - low))
+            middle = (end - start) // 2
+            part = np.argpartition(block[:, dim], middle)
+            self.order[start:end] = self.order[start:end][part]
+            left = self._build(start, start + middle)
+            right = self._build(start + middle, end)
+            self.children[node] = (left, right)
+        return node
+
+    def _box_distance(self, nodes, point: np.ndarray) -> np.ndarray:
+        below = np.maximum(self.lo[nodes] - point, 0.0)
+        above = np.maximum(point - self.hi[nodes], 0.0)
+        return ((below + above) ** 2).sum(axis=-1)
+
+    def query(self, point: np.ndarray, k: int, best: list):
+        """Merge the `k` nearest rows into `best`, a heap of `(-dist2, row)`."""
+        if not self.children:
+            return
+        frontier = [(0.0, 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound >= -best[0][0]:
+                break
+            left, right = self.children[node]
+            if left < 0:
+                start, end = self.spans[node]
+                rows = self.order[start:end]
+                dist = ((self.points[rows] - point) ** 2).sum(axis=1)
+                if len(best) == k:
+                    keep = dist < -best[0][0]
+                    dist, rows = dist[keep], rows[keep]
+                for d, row in zip(dist.tolist(), rows.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, row))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, row))
+                continue
+            bounds = self._box_distance([left, right], point)
+            heapq.heappush(frontier, (float(bounds[0]), left))
+            heapq.heappush(frontier, (float(bounds[1]), right))
+
+
+class SimilarityIndex:
+    """Incremental k-nearest-neighbour index of chart embeddings by id."""
+
+    def __init__(self, names, weights: dict = None):
+        self.names = tuple(names)
+        self.weight_map = dict(weights or {})
+        weights = self.weight_map
+        self.weights = np.array([weights.get(n, 1.0) for n in self.names])
+        self.ids = []
+        self._rows = {}
+        # embeddings grow by doubling; the first len(ids) rows are in use
+        self._data = np.empty((64, 2 * len(self.names)))
+        self.tree = KDTree(self._data[:0])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self._data[:len(self.ids)]
+
+    def add(self, ids, longitudes):
+        """Insert or replace charts given as a `(charts, bodies)` longitude table."""
+        stale = False
+        for chart_id, vector in zip(ids, embed(longitudes, self.weights)):
+            row = self._rows.get(chart_id)
+            if row is None:
+                row = self._rows[chart_id] = len(self.ids)
+                if row == len(self._data):
+                    self._data = np.concatenate([self._data, np.empty_like(self._data)])
+                self.ids.append(chart_id)
+            elif row < len(self.tree):
+                # a moved point invalidates the tree
+                stale = True
+            self._data[row] = vector
+        pending = len(self.ids) - len(self.tree)
+        if stale or pending > max(_REBUILD_MIN, _REBUILD_FRACTION * len(self.tree)):
+            self.tree = KDTree(self.embeddings.copy())
+
+    def nearest(self, longitudes, k: int = 10, exclude=None) -> list:
+        """`(id, distance)` of the `k` charts closest to `longitudes`."""
+        point = embed(longitudes, self.weights)
+        wanted = k + (1 if exclude in self._rows else 0)
+        best = []
+        self.tree.query(point, wanted, best)
+        buffered = self.embeddings[len(self.tree):]
+        if len(buffered):
+            dist = ((buffered - point) ** 2).sum(axis=1)
+            for d, row in zip(dist.tolist(), range(len(self.tree), len(self.ids))):
+                if len(best) < wanted:
+                    heapq.heappush(best, (-d, row))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, row))
+        return [
+            (self.ids[row], round(float(np.sqrt(d)), 4))
+            for d, row in sorted((-d, row) for d, row in best)
+            if self.ids[row] != exclude
+        ][:k]
+
+
+class SimilarityLog:
+    """Append-only JSON lines log replayed into a `SimilarityIndex`."""
+
+    def __init__(self, path: str, index: SimilarityIndex):
+        self.path = path
+        self.index = index
+        self.inode = None
+        self.offset = 0
+        self.records = 0
+        # latest logged longitudes of every id, written back by a compaction
+        self.latest = {}
+
+    def _header(self) -> bytes:
+        return (json.dumps({"names": list(self.index.names)}) + "\n").encode()
+
+    def _replay(self, fh):
+        """Apply the complete records past `offset` in the open log `fh`."""
+        st = os.fstat(fh.fileno())
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            # a new or compacted file: start over from its header
+            self.index = SimilarityIndex(self.index.names, self.index.weight_map)
+            self.inode, self.offset, self.records = st.st_ino, 0, 0
+            self.latest = {}
+        fh.seek(self.offset)
+        data = fh.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        ids, rows = [], []
+        for line in complete.splitlines():
+            entry = json.loads(line)
+            if "names" in entry:
+                if tuple(entry["names"]) != self.index.names:
+                    raise ValueError(
+                        f"{self.path} indexes {', '.join(entry['names'])}, "
+                        f"not {', '.join(self.index.names)}"
+                    )
+                continue
+            ids.append(entry["id"])
+            self.latest[entry["id"]] = entry["lon"]
+            rows.append([math.nan if v is None else v for v in entry["lon"]])
+        if ids:
+            self.index.add(ids, np.array(rows, dtype=np.float64))
+            self.records += len(ids)
+        self.offset += len(complete)
+
+    def _open(self):
+        """The log opened for appending and locked, creating it if needed."""
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            fh = os.fdopen(fd, "r+b")
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(fd).st_ino:
+                if os.fstat(fd).st_size == 0:
+                    fh.write(self._header())
+                    fh.flush()
+                return fh
+            # compacted while we waited for the lock: use the new file
+            fh.close()
+
+    def sync(self) -> SimilarityIndex:
+        """Catch up with records appended by other processes."""
+        if not os.path.exists(self.path):
+            return self.index
+        with open(self.path, "rb") as fh:
+            fcntl.flock(fh, fcntl.LOCK_SH)
+            self._replay(fh)
+        return self.index
+
+    def append(self, ids, longitudes) -> SimilarityIndex:
+        """Record and index charts; the log grows by their records only."""
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        lines = b"".join(
+            (json.dumps({
+                "id": chart_id,
+                "lon": [None if math.isnan(v) else v for v in row],
+            }) + "\n").encode()
+            for chart_id, row in zip(ids, longitudes.tolist())
+        )
+        with self._open() as fh:
+            self._replay(fh)
+            fh.write(lines)
+            fh.flush()
+            self._replay(fh)
+            if self.records > max(_COMPACT_MIN, _COMPACT_RATIO * len(self.index)):
+                self._compact()
+        return self.index
+
+    def _compact(self):
+        """Rewrite the log with one record per id. Call with the log locked."""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(self._header())
+            for chart_id, row in self.latest.items():
+                fh.write((json.dumps({"id": chart_id, "lon": row}) + "\n").encode())
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self.inode, self.offset, self.records = st.st_ino, st.st_size, len(self.latest)
+
+
+# Process-wide index shared by the endpoints; `index_lock` guards it
+index_lock = threading.Lock()
+_shared = {"log": None}
+
+
+def _shared_log(names) -> SimilarityLog:
+    path = os.getenv("SIMILARITY_PATH")
+    log = _shared["log"]
+    if log is None or log.path != path:
+        index = SimilarityIndex(names, parse_weights(os.getenv("SIMILARITY_WEIGHTS", "")))
+        log = _shared["log"] = SimilarityLog(path, index)
+    if log.index.names != tuple(names):
+        raise ValueError(f"The similarity index holds {', '.join(log.index.names)}, "
+                         f"not {', '.join(names)}")
+    return log
+
+
+def similarity_index(names) -> SimilarityIndex:
+    """The shared index, caught up with `SIMILARITY_PATH` when it is set.
+
+    Call with `index_lock` held.
+    """
+    log = _shared_log(names)
+    return log.sync() if log.path else log.index
+
+
+def add_similar_charts(names, ids, longitudes) -> SimilarityIndex:
+    """Insert charts into the shared index and its log. Call with `index_lock` held."""
+    log = _shared_log(names)
+    if log.path:
+        return log.append(ids, longitudes)
+    log.index.add(ids, longitudes)
+    return log.index
@@ -0,0 +1,134 @@
+"""
+Live "sky now" broadcasting for the streaming transit endpoints.
+
+A single `SkyBroadcaster` runs one computation loop for the whole process,
+however many clients are connected. Every `SKY_STREAM_INTERVAL` seconds it
+computes the current transits and publishes a delta only when something
+changed for the clients:
+
+* bodies whose longitude moved at least `SKY_STREAM_THRESHOLD` degrees since
+  the value last published, and
+* aspects that started or ended.
+
+A client receives the published state as a `snapshot` when it subscribes and
+the `delta` messages after that. A client too slow to keep up has its queue
+replaced by a fresh snapshot instead of silently losing deltas. The loop
+stops when the last client leaves.
+"""
+
+import asyncio
+import datetime
+import logging
+import os
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+# Seconds between two computations of the sky
+SKY_STREAM_INTERVAL = float(os.getenv("SKY_STREAM_INTERVAL", "5"))
+
+# Minimum movement in degrees before a body is published again
+SKY_STREAM_THRESHOLD = float(os.getenv("SKY_STREAM_THRESHOLD", "0.05"))
+
+# Messages buffered per client before it is resynchronized with a snapshot
+_QUEUE_SIZE = 32
+
+logger = logging.getLogger(__name__)
+
+
+def _aspect_key(aspect: dict):
+    return aspect["planet1"], aspect["planet2"], aspect["aspect"]
+
+
+class SkyBroadcaster:
+    """Shared transit loop fanning snapshots and deltas out to subscribers.
+
+    `compute` returns the sky now as a `(ChartSnapshot, aspects)` pair.
+    """
+
+    def __init__(self, compute, interval: float = SKY_STREAM_INTERVAL,
+                 threshold: float = SKY_STREAM_THRESHOLD):
+        self.compute = compute
+        self.interval = interval
+        self.threshold = threshold
+        self.subscribers = set()
+        self.utc = None
+        self.positions = {}
+        self.aspects = {}
+        # names and longitudes last published, for the movement threshold
+        self._names = None
+        self._published = None
+        self._task = None
+
+    def snapshot(self) -> dict:
+        return {
+            "type": "snapshot",
+            "utc": self.utc,
+            "positions": dict(self.positions),
+            "aspects": list(self.aspects.values()),
+        }
+
+    async def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        if self._task is None or self._task.done():
+            # first subscriber: publish the current sky before starting the loop
+            await self._update()
+            # another subscriber may have started it while we computed
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._run())
+        queue.put_nowait(self.snapshot())
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, message: dict):
+        for queue in self.subscribers:
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot())
+            else:
+                queue.put_nowait(message)
+
+    async def _update(self):
+        """Compute the sky now and return the delta against the published state."""
+        chart, aspects = await run_in_threadpool(self.compute)
+        self.utc = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0).isoformat()
+        if self._names != chart.names:
+            moving = np.ones(len(chart), dtype=bool)
+            self._names = chart.names
+            self._published = chart.longitudes.copy()
+        else:
+            diff = np.abs(chart.longitudes - self._published) % 360
+            moving = np.minimum(diff, 360 - diff) >= self.threshold
+            self._published[moving] = chart.longitudes[moving]
+        moved = chart.select([chart.names[k] for k in np.flatnonzero(moving)]).to_positions()
+        self.positions.update(moved)
+        current = {_aspect_key(a): a for a in aspects}
+        started = [a for key, a in current.items() if key not in self.aspects]
+        ended = [a for key, a in self.aspects.items() if key not in current]
+        self.aspects = current
+        return {
+            "type": "delta",
+            "utc": self.utc,
+            "positions": moved,
+            "aspects_started": started,
+            "aspects_ended": ended,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                delta = await self._update()
+            except Exception:
+                # keep the stream alive; the next tick retries
+                logger.exception("Sky stream update failed")
+                continue
+            if delta["positions"] or delta["aspects_started"] or delta["aspects_ended"]:
+                self._publish(delta)
@@ -0,0 +1,209 @@
+"""
+Chart wheel rendering as SVG.
+
+The zodiac ring (sign sectors and glyphs) and the decan ring (one sector per
+`zodiac_wheel.csv` row, titled with its tarot card) never change, so they
+are built once per data bundle version into a template fragment drawn with
+Aries 0° to the right.
+A chart only rotates that fragment so its Ascendant sits on the left and
+adds its own house cusps, bodies and aspect lines.
+
+Rendered wheels are cached by their content (longitudes rounded to 0.01°),
+so identical charts are served from memory.
+"""
+
+import functools
+import math
+import os
+from xml.sax.saxutils import escape
+
+from .chart import SIGNS
+from .databundle import data_bundle
+
+# Number of distinct wheels kept in memory
+WHEEL_CACHE = int(os.getenv("WHEEL_CACHE", "1024"))
+
+SIZE = 600
+R_OUTER = 290
+R_SIGN = 250
+R_DECAN = 228
+R_HOUSE = 200
+R_BODY = 176
+R_ASPECT = 150
+
+SIGN_GLYPHS = "♈♉♊♋♌♍♎♏♐♑♒♓"
+
+ELEMENT_COLORS = ("#f4c7b8", "#d9e4c0", "#f6efc4", "#c4d9ee")  # fire, earth, air, water
+
+BODY_GLYPHS = {
+    "Sun": "☉", "Moon": "☽", "Mercury": "☿", "Venus": "♀", "Mars": "♂",
+    "Jupiter": "♃", "Saturn": "♄", "Uranus": "♅", "Neptune": "♆", "Pluto": "♇",
+    "North Node": "☊", "South Node": "☋", "Lilith": "⚸", "Chiron": "⚷",
+    "Ceres": "⚳", "Pallas": "⚴", "Juno": "⚵", "Vesta": "⚶",
+    "Ascendant": "AC", "Midheaven": "MC",
+}
+
+ASPECT_COLORS = {
+    "conjunction": "#7a4fa0",
+    "sextile": "#2f7fc1",
+    "square": "#c8372d",
+    "trine": "#2e9b4f",
+    "opposition": "#c8372d",
+}
+
+# Minimum angular distance between two body glyphs
+_GLYPH_GAP = 7.0
+
+
+def _point(angle: float, radius: float):
+    """Screen coordinates of `angle` (degrees, counter-clockwise from the right)."""
+    rad = math.radians(angle)
+    return round(radius * math.cos(rad), 2), round(-radius * math.sin(rad), 2)
+
+
+def _sector(start: float, end: float, outer: float, inner: float) -> str:
+    x0, y0 = _point(start, outer)
+    x1, y1 = _point(end, outer)
+    x2, y2 = _point(end, inner)
+    x3, y3 = _point(start, inner)
+    return (f"M{x0},{y0} A{outer},{outer} 0 0 0 {x1},{y1} "
+            f"L{x2},{y2} A{inner},{inner} 0 0 1 {x3},{y3} Z")
+
+
+def static_wheel() -> str:
+    """Zodiac and decan rings, Aries 0° to the right, for the current data bundle."""
+    return _static_wheel(data_bundle().version)
+
+
+@functools.lru_cache(maxsize=1)
+def _static_wheel(version: str) -> str:
+    decans = [
+        (int(row["grado_abs_inicio"]), int(row["numero"]), row["palo"], row["carta"])
+        for row in data_bundle().tables["zodiac_wheel.csv"]
+    ]
+    parts = ['<g class="zodiac" font-family="sans-serif" text-anchor="middle" '
+             'dominant-baseline="central">']
+    for k, sign in enumerate(SIGNS):
+        start = 30 * k
+        parts.append(
+            f'<path d="{_sector(start, start + 30, R_OUTER, R_SIGN)}" '
+            f'fill="{ELEMENT_COLORS[k % 4]}" stroke="#555" stroke-width="1">'
+            f'<title>{sign}</title></path>'
+        )
+        x, y = _point(start + 15, (R_OUTER + R_SIGN) / 2)
+        parts.append(f'<text x="{x}" y="{y}" font-size="22">{SIGN_GLYPHS[k]}</text>')
+    for start, number, suit, card in decans:
+        parts.append(
+            f'<path d="{_sector(start, start + 10, R_SIGN, R_DECAN)}" fill="#fff" '
+            f'stroke="#999" stroke-width="0.5"><title>{escape(card)}</title></path>'
+        )
+        x, y = _point(start + 5, (R_SIGN + R_DECAN) / 2)
+        parts.append(f'<text x="{x}" y="{y}" font-size="9">{number}{escape(suit[0])}</text>')
+    for radius in (R_HOUSE, R_ASPECT):
+        parts.append(f'<circle r="{radius}" fill="none" stroke="#555" stroke-width="1"/>')
+    parts.append("</g>")
+    return "".join(parts)
+
+
+def _spread(angles: list) -> list:
+    """Glyph angles pushed apart so neighbouring bodies do not overlap.
+
+    Bodies closer than `_GLYPH_GAP` are merged into clusters laid out
+    `_GLYPH_GAP` apart around the mean of their angles; clusters that then
+    overlap are merged in turn.
+    """
+    order = sorted(range(len(angles)), key=lambda k: angles[k])
+    clusters = []  # [sum of angles, count]
+    for k in order:
+        clusters.append([angles[k], 1])
+        while len(clusters) > 1:
+            (sum_a, n_a), (sum_b, n_b) = clusters[-2], clusters[-1]
+            end_a = sum_a / n_a + (n_a - 1) * _GLYPH_GAP / 2
+            start_b = sum_b / n_b - (n_b - 1) * _GLYPH_GAP / 2
+            if start_b - end_a >= _GLYPH_GAP:
+                break
+            clusters[-2:] = [[sum_a + sum_b, n_a + n_b]]
+    placed = []
+    for total, count in clusters:
+        first = total / count - (count - 1) * _GLYPH_GAP / 2
+        placed.extend(first + i * _GLYPH_GAP for i in range(count))
+    result = [0.0] * len(angles)
+    for k, angle in zip(order, placed):
+        result[k] = angle
+    return result
+
+
+@functools.lru_cache(maxsize=WHEEL_CACHE)
+def render_wheel(version: str, names: tuple, longitudes: tuple, cusps: tuple,
+                 aspects: tuple) -> str:
+    """SVG wheel for a chart, over the static rings of data bundle `version`.
+
+    `cusps` holds the twelve house cusps (empty for a chart without houses,
+    drawn with Aries on the left) and `aspects` `(body, body, aspect)` triples.
+    """
+    rising = cusps[0] if cusps else 0.0
+
+    def screen(lon: float) -> float:
+        return (lon + 180.0 - rising) % 360
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{-SIZE // 2} {-SIZE // 2} {SIZE} {SIZE}" '
+        f'width="{SIZE}" height="{SIZE}">',
+        f'<g transform="rotate({round(rising - 180.0, 4)})">{_static_wheel(version)}</g>',
+    ]
+
+    if cusps:
+        parts.append('<g class="houses" stroke="#555" font-family="sans-serif" font-size="11" '
+                     'text-anchor="middle" dominant-baseline="central">')
+        for k, cusp in enumerate(cusps):
+            x0, y0 = _point(screen(cusp), R_ASPECT)
+            x1, y1 = _point(screen(cusp), R_DECAN)
+            width = 2 if k % 3 == 0 else 0.75
+            parts.append(f'<line x1="{x0}" y1="{y0}" x2="{x1}" y2="{y1}" stroke-width="{width}"/>')
+            following = cusps[(k + 1) % 12]
+            middle = cusp + ((following - cusp) % 360) / 2
+            x, y = _point(screen(middle), R_ASPECT + 10)
+            parts.append(f'<text x="{x}" y="{y}" stroke="none" fill="#777">{k + 1}</text>')
+        parts.append("</g>")
+
+    index = {name: k for k, name in enumerate(names)}
+    parts.append('<g class="aspects" stroke-width="1.2">')
+    for first, second, aspect in aspects:
+        if first not in index or second not in index:
+            continue
+        x0, y0 = _point(screen(longitudes[index[first]]), R_ASPECT)
+        x1, y1 = _point(screen(longitudes[index[second]]), R_ASPECT)
+        parts.append(
+            f'<line x1="{x0}" y1="{y0}" x2="{x1}" y2="{y1}" '
+            f'stroke="{ASPECT_COLORS.get(aspect, "#888")}">'
+            f'<title>{escape(first)} {aspect} {escape(second)}</title></line>'
+        )
+    parts.append("</g>")
+
+    parts.append('<g class="bodies" font-family="sans-serif" text-anchor="middle" '
+                 'dominant-baseline="central">')
+    angles = [screen(lon) for lon in longitudes]
+    for name, lon, angle, glyph_angle in zip(names, longitudes, angles, _spread(angles)):
+        x0, y0 = _point(angle, R_HOUSE)
+        x1, y1 = _point(angle, R_HOUSE - 6)
+        x, y = _point(glyph_angle, R_BODY)
+        degree, minute = divmod(round(lon * 60) % (360 * 60), 60)
+        label = f"{name} {degree % 30}°{minute:02d}' {SIGNS[degree // 30]}"
+        parts.append(
+            f'<line x1="{x0}" y1="{y0}" x2="{x1}" y2="{y1}" stroke="#222"/>'
+            f'<text x="{x}" y="{y}" font-size="16"><title>{escape(label)}</title>'
+            f'{escape(BODY_GLYPHS.get(name, name[:2]))}</text>'
+        )
+    parts.append("</g></svg>")
+    return "".join(parts)
+
+
+def wheel_key(chart, cusps, aspects) -> tuple:
+    """Hashable cache key for `render_wheel`, rounded so equal charts match."""
+    return (
+        data_bundle().version,
+        chart.names,
+        tuple(round(lon, 2) for lon in chart.longitudes.tolist()),
+        tuple(round(c % 360, 2) for c in cusps),
+        tuple((a["planet1"], a["planet2"], a["aspect"]) for a in aspects),
+    )
@@ -0,0 +1,7 @@
+import os
+
+# The star catalog ships in ephe/; without the .se1 files the Swiss Ephemeris
+# falls back to its built-in Moshier ephemeris for the planets.
+os.environ.setdefault(
+    "EPHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ephe")
+)
@@ -0,0 +1,160 @@
+import asyncio
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import admission, astro_api_unified
+from app.admission import (
+    AdmissionControl,
+    Gate,
+    Shed,
+    admission_limits,
+    check_route_classes,
+    route_class,
+)
+from app.astro_api_unified import app
+
+
+def test_every_served_route_has_a_class():
+    check_route_classes(app.routes)
+    assert route_class("/natal/batch") == "heavy"
+    assert route_class("/transits/stream") is None
+    assert route_class("/no/such/route") == "light"
+
+
+def test_unclassified_routes_fail_the_startup_check():
+    routes = [types.SimpleNamespace(path="/natal"), types.SimpleNamespace(path="/new")]
+    with pytest.raises(RuntimeError, match="/new"):
+        check_route_classes(routes)
+
+
+def test_lifespan_checks_routes_and_runs_the_daily_card_refresh(monkeypatch):
+    events = []
+
+    async def refresh():
+        events.append("started")
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    monkeypatch.setattr(astro_api_unified, "refresh_daily_cards", refresh)
+    with TestClient(app) as client:
+        assert client.get("/bodies").status_code == 200
+    assert events == ["started", "cancelled"]
+
+    monkeypatch.delitem(admission.ROUTE_CLASSES, "/natal")
+    with pytest.raises(RuntimeError, match="/natal"):
+        with TestClient(app):
+            pass
+
+
+def test_limits_from_the_environment(monkeypatch):
+    monkeypatch.setenv("ADMISSION_HEAVY", "0,-3,1.5")
+    assert admission_limits("heavy") == (1, 0, 1.5)
+
+
+def test_gate_queues_in_order_and_sheds():
+    async def scenario():
+        gate = Gate("heavy", concurrency=1, queue=2, wait=1.0)
+        await gate.acquire(1.0)
+        order = []
+
+        async def worker(k):
+            await gate.acquire(1.0)
+            order.append(k)
+
+        waiting = [asyncio.ensure_future(worker(k)) for k in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as refused:
+            await gate.acquire(1.0)
+        gate.release()
+        await asyncio.sleep(0)
+        gate.release()
+        await asyncio.gather(*waiting)
+        return gate, order, refused.value
+
+    gate, order, refused = asyncio.run(scenario())
+    assert order == [0, 1]
+    assert gate.active == 1 and not gate.waiters
+    assert refused.status_code == 429 and refused.retry_after >= 1
+
+
+def test_gate_times_out_queued_requests():
+    async def scenario():
+        gate = Gate("chart", concurrency=1, queue=4, wait=1.0)
+        await gate.acquire(1.0)
+        with pytest.raises(Shed) as timed_out:
+            await gate.acquire(0.01)
+        return gate, timed_out.value
+
+    gate, timed_out = asyncio.run(scenario())
+    assert timed_out.status_code == 503
+    assert gate.active == 1 and not gate.waiters
+
+
+def test_gate_times_out_while_a_release_skips_the_slot(monkeypatch):
+    gate = Gate("chart", concurrency=1, queue=4, wait=1.0)
+
+    async def released_at_the_timeout(slot, wait):
+        # the slot is cancelled by the timeout and `release` runs before the
+        # waiter gets to clean it up
+        slot.cancel()
+        gate.release()
+        raise asyncio.TimeoutError
+
+    async def scenario():
+        await gate.acquire(1.0)
+        monkeypatch.setattr(asyncio, "wait_for", released_at_the_timeout)
+        with pytest.raises(Shed) as timed_out:
+            await gate.acquire(1.0)
+        return timed_out.value
+
+    assert asyncio.run(scenario()).status_code == 503
+    assert gate.active == 0 and not gate.waiters
+
+
+def _call(middleware, path, headers=()):
+    """Run one HTTP request through the middleware; return the status sent."""
+    sent = []
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "method": "GET", "headers": list(headers)}
+    return middleware(scope, receive, send), sent
+
+
+def test_middleware_refuses_beyond_the_queue(monkeypatch):
+    monkeypatch.setenv("ADMISSION_HEAVY", "1,0,1")
+
+    async def scenario():
+        done = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            await done.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        middleware = AdmissionControl(slow_app)
+        first, first_sent = _call(middleware, "/natal/batch")
+        running = asyncio.ensure_future(first)
+        await asyncio.sleep(0)
+        second, second_sent = _call(middleware, "/natal/batch")
+        await second
+        # other classes are not affected
+        third, third_sent = _call(middleware, "/geocode")
+        done.set()
+        await asyncio.gather(running, third)
+        return first_sent, second_sent, third_sent
+
+    first, second, third = asyncio.run(scenario())
+    assert first[0]["status"] == 200
+    assert second[0]["status"] == 429
+    assert (b"retry-after", b"1") in second[0]["headers"]
+    assert third[0]["status"] == 200
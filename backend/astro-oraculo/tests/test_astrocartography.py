@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+import swisseph as swe
+
+from app.astrocartography import ANGLES, _polylines, angle_lines, astrocartography, equatorial
+
+OBLIQUITY = 23.44
+
+
+def _altitude(ra, dec, gst, lat, lon):
+    """Altitude (degrees) of a body at a place, from its hour angle."""
+    h = np.radians(gst + lon - ra)
+    dec, lat = np.radians(dec), np.radians(lat)
+    return np.degrees(np.arcsin(
+        np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(h)
+    ))
+
+
+def test_equatorial_on_the_ecliptic():
+    ra, dec = equatorial([0, 90, 180, 270], [0, 0, 0, 0], OBLIQUITY)
+    assert ra.tolist() == pytest.approx([0, 90, 180, 270])
+    assert dec.tolist() == pytest.approx([0, OBLIQUITY, 0, -OBLIQUITY], abs=1e-9)
+
+
+def test_equatorial_matches_swisseph():
+    rng = np.random.default_rng(5)
+    lons, lats = rng.uniform(0, 360, 50), rng.uniform(-8, 8, 50)
+    ra, dec = equatorial(lons, lats, OBLIQUITY)
+    for k in range(50):
+        expected = swe.cotrans((lons[k], lats[k], 1.0), -OBLIQUITY)
+        assert ra[k] == pytest.approx(expected[0])
+        assert dec[k] == pytest.approx(expected[1])
+
+
+def test_meridians_follow_sidereal_time():
+    lines = angle_lines([100.0, 350.0], [10.0, -5.0], 40.0, [0.0, 45.0])
+    assert lines["MC"][:, 0].tolist() == pytest.approx([60, -50])
+    assert lines["IC"][:, 0].tolist() == pytest.approx([-120, 130])
+    # a meridian does not depend on latitude
+    assert np.allclose(lines["MC"][:, 0], lines["MC"][:, 1])
+
+
+def test_rising_and_setting_lines_are_on_the_horizon():
+    rng = np.random.default_rng(6)
+    ra, dec = rng.uniform(0, 360, 20), rng.uniform(-25, 25, 20)
+    gst = 123.4
+    latitudes = np.arange(-60.0, 61.0, 5.0)
+    lines = angle_lines(ra, dec, gst, latitudes)
+    for angle in ("ASC", "DSC"):
+        alt = _altitude(ra[:, None], dec[:, None], gst, latitudes[None, :], lines[angle])
+        assert np.abs(alt).max() < 1e-9
+    # rising east of the meridian: negative hour angle on the ASC line
+    hour_angle = np.mod(gst + lines["ASC"] - ra[:, None], 360.0)
+    assert (hour_angle > 180).all()
+
+
+def test_circumpolar_bodies_never_rise():
+    lines = angle_lines([0.0], [23.0], 0.0, [0.0, 70.0, -70.0])
+    assert not np.isnan(lines["ASC"][0, 0])
+    assert np.isnan(lines["ASC"][0, 1:]).all()
+    assert np.isnan(lines["DSC"][0, 1:]).all()
+
+
+def test_polylines_split_at_gaps_and_the_antimeridian():
+    lats = [0, 1, 2, 3, 4, 5, 6]
+    lons = [170, 175, 179, -178, np.nan, 10, 11]
+    assert _polylines(lats, lons, 1) == [
+        [[0, 170], [1, 175], [2, 179]],
+        [[5, 10], [6, 11]],
+    ]
+
+
+def test_astrocartography_returns_every_body_and_angle():
+    jd = swe.julday(2000, 1, 1, 12.0)
+    bodies = {"Sun": swe.SUN, "Moon": swe.MOON}
+    lines = astrocartography(jd, bodies, step=5.0, lat_max=60.0)
+    assert [(e["body"], e["angle"]) for e in lines] == [
+        (body, angle) for body in bodies for angle in ANGLES
+    ]
+    for entry in lines:
+        for polyline in entry["polylines"]:
+            assert all(-60 <= lat <= 60 and -180 <= lon < 180 for lat, lon in polyline)
+    mc = lines[2]["polylines"]
+    assert len(mc) == 1 and mc[0][0][1] == mc[0][1][1]
@@ -0,0 +1,148 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import audio
+from app.astro_api_unified import app
+from app.audio import (
+    BEAT_DETUNE,
+    HARMONICS,
+    _frequency,
+    _tuning_for,
+    audio_key,
+    encode_wav,
+    synthesize,
+)
+from app.chart import ChartSnapshot
+from app.databundle import data_bundle
+
+
+def _spectrum_peaks(samples, rate, count):
+    spectrum = np.abs(np.fft.rfft(samples))
+    freqs = np.fft.rfftfreq(len(samples), 1 / rate)
+    return sorted(freqs[np.argsort(spectrum)[-count:]].tolist())
+
+
+def test_frequencies():
+    assert _frequency(9, 4) == pytest.approx(440.0)
+    assert _frequency(0, 4) == pytest.approx(261.6256, abs=1e-4)
+    assert _frequency(9, 3) == pytest.approx(220.0)
+
+
+def test_tuning_from_the_frequency_table():
+    bodies, signs = _tuning_for(data_bundle().version)
+    assert bodies["Sun"] == (1, 5)  # Do#, Alta
+    assert bodies["Moon"] == (5, 4)  # Fa, Media
+    assert signs[3] == 5  # Cáncer: Fa
+
+
+def test_single_body_plays_its_note_and_harmonics():
+    rate = 8000
+    samples = synthesize(("Moon",), [100.0], seconds=2.0, rate=rate)
+    assert len(samples) == 2 * rate
+    assert np.abs(samples).max() == pytest.approx(0.9)
+    moon = _frequency(5, 4)
+    peaks = _spectrum_peaks(samples, rate, 4 * 3)
+    for harmonic in range(1, len(HARMONICS) + 1):
+        assert min(abs(p - moon * harmonic) for p in peaks) < 1.0
+
+
+def _reference(names, longitudes, aspects, seconds, rate):
+    """Sample-by-sample synthesis, as the docstring describes it."""
+    bodies, signs = _tuning_for(data_bundle().version)
+    n = len(names)
+    freqs, gains, beats = [], [1.0] * n, [0.0] * n
+    for name, lon in zip(names, longitudes):
+        semitone, octave = bodies.get(name, (None, 4))
+        if semitone is None:
+            semitone = signs[int(lon // 30) % 12]
+        freqs.append(_frequency(semitone, octave))
+    for first, second, aspect, orb in aspects:
+        weight = audio.ASPECT_GAINS[aspect] / (1.0 + orb)
+        for k in (names.index(first), names.index(second)):
+            gains[k] += weight
+            if aspect in audio.TENSE_ASPECTS:
+                beats[k] += weight
+    start = names.index("Ascendant") if "Ascendant" in names else 0
+    rank = sorted(range(n), key=lambda k: (longitudes[k] - longitudes[start]) % 360)
+    onsets = {k: rank.index(k) / n * seconds / 2 for k in range(n)}
+    out = []
+    for s in range(int(seconds * rate)):
+        t = s / rate
+        value = 0.0
+        for k in range(n):
+            if t < onsets[k]:
+                continue
+            since = t - onsets[k]
+            env = min(since / audio._ATTACK, 1.0) * np.exp(-audio._DECAY * since)
+            env *= min(max((seconds - t) / audio._RELEASE, 0.0), 1.0)
+            tone = sum(a * np.sin(2 * np.pi * freqs[k] * (h + 1) * t)
+                       for h, a in enumerate(HARMONICS))
+            tone += beats[k] * np.sin(2 * np.pi * freqs[k] * BEAT_DETUNE * t)
+            value += gains[k] * env * tone
+        out.append(value)
+    out = np.array(out)
+    return out / np.abs(out).max() * 0.9
+
+
+def test_synthesis_matches_a_sample_loop():
+    names = ("Sun", "Moon", "Mars", "Ascendant")
+    longitudes = [10.0, 100.0, 190.0, 50.0]
+    aspects = (("Sun", "Moon", "square", 0.0), ("Sun", "Mars", "opposition", 2.0),
+               ("Moon", "Pluto", "trine", 1.0))
+    fast = synthesize(names, longitudes, aspects, seconds=0.5, rate=1000)
+    slow = _reference(names, longitudes, aspects[:2], seconds=0.5, rate=1000)
+    assert np.allclose(fast, slow, atol=1e-9)
+
+
+def test_bodies_enter_in_zodiac_order_from_the_ascendant():
+    rate, seconds = 4000, 4.0
+    samples = synthesize(("Sun", "Ascendant"), [10.0, 200.0], seconds=seconds, rate=rate)
+    # the Ascendant sounds first; the Sun enters a quarter of the way in
+    assert np.abs(samples[: rate // 2]).max() > 0
+    half = int(seconds / 4 * rate)
+    before = _spectrum_peaks(samples[:half], rate, 1)[0]
+    assert abs(before - _frequency(*_tuning_for(data_bundle().version)[0]["Ascendant"])) < 2
+
+
+def test_wav_encoding():
+    samples = np.array([0.0, 0.5, -1.0, 2.0])
+    with wave.open(io.BytesIO(encode_wav(samples, rate=8000))) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 8000)
+        frames = np.frombuffer(wav.readframes(4), dtype="<i2")
+    assert frames.tolist() == [0, 16383, -32767, 32767]
+
+
+def test_audio_key_rounds_equal_charts_together():
+    aspects = [{"planet1": "Sun", "planet2": "Moon", "aspect": "trine", "orb": 1.04}]
+    a = ChartSnapshot(("Sun", "Moon"), [10.02, 130.0])
+    b = ChartSnapshot(("Sun", "Moon"), [9.98, 130.01])
+    assert audio_key(a, aspects) == audio_key(b, aspects)
+
+
+def test_signature_endpoint():
+    client = TestClient(app)
+    params = {"date": "2024-03-01", "time": "12:00", "zone": "UTC"}
+    response = client.get("/audio/signature", params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    with wave.open(io.BytesIO(response.content)) as wav:
+        assert wav.getnframes() == int(audio.AUDIO_SECONDS * audio.SAMPLE_RATE)
+    cached = client.get("/audio/signature", params=params,
+                        headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert client.get("/audio/signature", params={**params, "format": "mp3"}).status_code == 400
+
+
+def test_ogg_signature():
+    soundfile = pytest.importorskip("soundfile")
+    response = TestClient(app).get("/audio/signature", params={
+        "date": "2024-03-01", "time": "12:00", "zone": "UTC", "format": "ogg",
+    })
+    assert response.headers["content-type"] == "audio/ogg"
+    samples, rate = soundfile.read(io.BytesIO(response.content))
+    assert rate == audio.SAMPLE_RATE
+    assert len(samples) == int(audio.AUDIO_SECONDS * audio.SAMPLE_RATE)
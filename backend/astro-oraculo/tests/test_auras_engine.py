@@ -0,0 +1,87 @@
+import itertools
+
+import numpy as np
+
+from app.auras_engine import (
+    AURA_TABLES,
+    MODIFIERS,
+    aura_vectors,
+    calculate_aura_modifiers,
+    calculate_match_auras,
+    compile_rules,
+    sign_matrix,
+)
+from app.chart import SIGNS
+from app.correspondences import SIGNOS
+
+
+def _old_rules(natal_positions):
+    """The inline rules the tables replaced (Spanish sign names)."""
+    modifiers = {"cost_reduction": 0, "draw_bonus": 0, "power_boosts": {}}
+    if natal_positions.get("Sun", {}).get("sign") in ["Aries", "Leo", "Sagitario"]:
+        modifiers["cost_reduction"] = 1
+    if natal_positions.get("Moon", {}).get("sign") in ["Géminis", "Libra", "Acuario"]:
+        modifiers["draw_bonus"] = 1
+    marte_sign = natal_positions.get("Mars", {}).get("sign")
+    if marte_sign:
+        sign_to_elem = {
+            "Aries": "Fuego", "Leo": "Fuego", "Sagitario": "Fuego",
+            "Tauro": "Tierra", "Virgo": "Tierra", "Capricornio": "Tierra",
+            "Géminis": "Aire", "Libra": "Aire", "Acuario": "Aire",
+            "Cáncer": "Agua", "Escorpio": "Agua", "Piscis": "Agua",
+        }
+        elem = sign_to_elem.get(marte_sign)
+        modifiers["power_boosts"][elem] = modifiers["power_boosts"].get(elem, 0) + 2
+    return modifiers
+
+
+def test_tables_match_the_old_rules_for_every_sign():
+    for sun, moon, mars in itertools.product(range(12), repeat=3):
+        spanish = {"Sun": {"sign": SIGNOS[sun]}, "Moon": {"sign": SIGNOS[moon]},
+                   "Mars": {"sign": SIGNOS[mars]}}
+        english = {body: {"sign": SIGNS[s]} for body, s in zip(("Sun", "Moon", "Mars"),
+                                                                (sun, moon, mars))}
+        expected = _old_rules(spanish)
+        for positions in (spanish, english):
+            found = calculate_aura_modifiers(positions)
+            assert {k: found[k] for k in expected} == expected
+            element = next(iter(expected["power_boosts"]))
+            assert found["special_abilities"] == [f"Aura de Marte: +2 PB a cartas de {element}"]
+
+
+def test_missing_planets_and_longitudes():
+    assert calculate_aura_modifiers({}) == {
+        "cost_reduction": 0, "draw_bonus": 0, "power_boosts": {}, "special_abilities": [],
+    }
+    # a chart's positions mapping gives the sign from the longitude as well
+    found = calculate_aura_modifiers({"Sun": {"longitude": 250.0}, "Mars": {"sign": "cancer"}})
+    assert found["cost_reduction"] == 1 and found["power_boosts"] == {"Agua": 2}
+
+
+def test_match_auras_equal_single_players():
+    rng = np.random.default_rng(41)
+    players = [
+        {body: {"sign": SIGNS[s]} for body, s in zip(("Sun", "Moon", "Mars"), row)
+         if s < 12}
+        for row in rng.integers(0, 13, (200, 3))
+    ]
+    assert calculate_match_auras(players) == [calculate_aura_modifiers(p) for p in players]
+    signs = sign_matrix(players)
+    assert signs.shape == (200, 3) and signs.min() == -1
+    assert aura_vectors(signs).shape == (200, len(MODIFIERS))
+
+
+def test_compiled_rules_sum_per_planet_and_sign():
+    tables = compile_rules([
+        {"planet": "Venus", "signs": ["Tauro", "libra"], "effect": "draw_bonus", "value": 1},
+        {"planet": "Venus", "signs": ["Tierra"], "effect": "draw_bonus", "value": 2},
+        {"planet": "Venus", "signs": ["Piscis"], "effect": "power_boost", "value": 3,
+         "element": "Fuego", "ability": "+{value} {element}"},
+    ])
+    assert tables.planets == ("Venus",)
+    draw = tables.vectors[0, :, MODIFIERS.index("draw_bonus")]
+    assert draw.tolist() == [0, 3, 0, 0, 0, 2, 1, 0, 0, 2, 0, 0]
+    found = calculate_match_auras([{"Venus": {"sign": "Piscis"}}], tables)[0]
+    assert found["power_boosts"] == {"Fuego": 3}
+    assert found["special_abilities"] == ["+3 Fuego"]
+    assert AURA_TABLES.planets == ("Sun", "Moon", "Mars")
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import swisseph as swe
+
+import app.astro_api_unified as api
+from app import batch
+from app.batch import compute_charts, julian_days, local_julian_days, natal_batch
+
+
+def test_julian_days_match_swisseph():
+    rng = np.random.default_rng(4)
+    years = rng.integers(1600, 2400, 200)
+    months = rng.integers(1, 13, 200)
+    days = rng.integers(1, 29, 200)
+    hours = rng.uniform(-12, 36, 200)
+    expected = [swe.julday(int(y), int(m), int(d), float(h))
+                for y, m, d, h in zip(years, months, days, hours)]
+    assert julian_days(years, months, days, hours) == pytest.approx(expected, abs=1e-9)
+
+
+def test_local_julian_days_apply_the_zone_offset():
+    jds = local_julian_days([
+        ("2024-07-01", "12:00", "Europe/Madrid"),
+        ("2024-01-01", "12:00", "Europe/Madrid"),
+        ("2024-13-01", "12:00", "UTC"),
+        ("2024-01-01", "12:00", "Nowhere/City"),
+    ])
+    assert jds[0] == pytest.approx(swe.julday(2024, 7, 1, 10.0))
+    assert jds[1] == pytest.approx(swe.julday(2024, 1, 1, 11.0))
+    assert isinstance(jds[2], ValueError)
+    assert isinstance(jds[3], Exception)
+
+
+def test_compute_charts_reports_failing_tasks(monkeypatch):
+    positions_for = api._positions_for
+
+    def failing(jd, lat, lon):
+        if lat > 90:
+            raise ValueError("latitude out of range")
+        return positions_for(jd, lat, lon)
+
+    monkeypatch.setattr(api, "_positions_for", failing)
+    jd = swe.julday(2000, 1, 1, 12.0)
+    results = compute_charts([(jd, 40.0, -3.0), (jd, 95.0, 0.0), (jd, -30.0, 20.0)])
+    assert results[1] == {"error": "latitude out of range"}
+    for (chart, aspects), (lat, lon) in zip([results[0], results[2]], [(40.0, -3.0), (-30.0, 20.0)]):
+        assert chart.longitudes.tolist() == positions_for(jd, lat, lon).longitudes.tolist()
+        assert aspects == api._aspects_within(chart)
+
+
+def test_natal_batch_deduplicates_and_keeps_order(monkeypatch):
+    computed = []
+    positions_for = api._positions_for
+
+    def counting(jd, lat, lon):
+        computed.append((jd, lat, lon))
+        return positions_for(jd, lat, lon)
+
+    monkeypatch.setattr(api, "_positions_for", counting)
+    madrid = {"date": "1990-05-17", "time": "08:30", "zone": "Europe/Madrid",
+              "lat": 40.4, "lon": -3.7}
+    records = [
+        {"id": 1, **madrid},
+        {"id": 2, "date": "1990-05-17", "time": "08:30", "place": "Buenos Aires"},
+        {"id": 3, **madrid},
+        {"id": 4, "date": "1990-05-17", "time": "08:30"},
+        {"id": 5, **madrid, "date": "1990-02-30"},
+    ]
+    results = natal_batch(records, api._resolve_place)
+
+    assert len(computed) == 2
+    assert [r["id"] for r in results] == [1, 2, 3, 4, 5]
+    assert results[0]["positions"] == results[2]["positions"]
+    assert results[1]["zone"] == "America/Argentina/Buenos_Aires"
+    assert results[3] == {"id": 4, "error": "Provide zone, lat and lon, or a place"}
+    assert set(results[4]) == {"id", "error"}
+    jd = api._jd_from_local("1990-05-17", "08:30", "Europe/Madrid")
+    positions, aspects = api._compute_positions_and_aspects(jd, 40.4, -3.7)
+    assert results[0]["positions"] == positions
+    assert results[0]["aspects"] == aspects
+
+
+def test_natal_batch_limit(monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_MAX", 2)
+    with pytest.raises(ValueError, match="at most 2"):
+        natal_batch([{}] * 3, api._resolve_place)
+
+
+def test_large_batches_are_computed_in_process(monkeypatch):
+    computed = []
+    positions_for = api._positions_for
+
+    def counting(jd, lat, lon):
+        computed.append(lat)
+        return positions_for(jd, lat, lon)
+
+    monkeypatch.setattr(api, "_positions_for", counting)
+    records = [{"date": "1990-05-17", "time": "08:30", "zone": "UTC", "lat": float(k), "lon": 0.0}
+               for k in range(24)]
+    results = natal_batch(records, api._resolve_place)
+    assert sorted(computed) == [float(k) for k in range(24)]
+    assert [r["lat"] for r in results] == [float(k) for k in range(24)]
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+import swisseph as swe
+from fastapi.testclient import TestClient
+
+from app import bodies
+from app.astro_api_unified import app
+from app.bodies import (
+    BODY_CATALOG,
+    FixedStarIndex,
+    body_coordinates,
+    fixed_star_index,
+    fixed_star_names,
+    resolve_bodies,
+)
+
+ASPECTS = {"conjunction": (0, 8), "sextile": (60, 6), "opposition": (180, 8)}
+
+
+def test_resolve_bodies_keeps_catalog_order():
+    bodies = resolve_bodies("Lilith, nodes,planets")
+    assert list(bodies)[:10] == list(resolve_bodies("planets"))
+    assert list(bodies)[10:] == ["North Node", "South Node", "Lilith"]
+    assert resolve_bodies("all") == BODY_CATALOG
+
+
+def test_resolve_bodies_rejects_unknown_names():
+    with pytest.raises(ValueError, match="Pluton"):
+        resolve_bodies("planets,Pluton")
+
+
+def test_south_node_is_opposite_the_north_node():
+    coords = body_coordinates(2451545.0, resolve_bodies("nodes"))
+    north, south = coords["North Node"], coords["South Node"]
+    assert (south[0] - north[0]) % 360 == pytest.approx(180)
+    assert south[1] == pytest.approx(-north[1])
+
+
+def test_window_wraps_around_aries():
+    index = FixedStarIndex([("A", 359.5), ("B", 0.4), ("C", 10.0)])
+    found = {name: distance for name, _, distance in index.within(0.0, 1.0)}
+    assert found == pytest.approx({"A": 0.5, "B": 0.4})
+
+
+def test_contacts_match_brute_force():
+    rng = random.Random(7)
+    stars = [(f"S{k}", rng.uniform(0, 360)) for k in range(500)]
+    index = FixedStarIndex(stars)
+    longitudes = {"Sun": 12.3, "Moon": 359.7, "Mars": 181.0}
+    found = {(c["body"], c["star"], c["aspect"]) for c in index.contacts(longitudes, ASPECTS, 1.0)}
+    expected = set()
+    for body, lon in longitudes.items():
+        for star, star_lon in stars:
+            diff = abs(star_lon - lon) % 360
+            separation = min(diff, 360 - diff)
+            for aspect, (angle, _) in ASPECTS.items():
+                if abs(separation - angle) <= 1.0:
+                    expected.add((body, star, aspect))
+    assert found == expected
+
+
+CATALOG = """\
+# two stars in sefstars.txt format
+Aldebaran,alTau,ICRS,04,35,55.23907,+16,30,33.4885,63.45,-188.94,54.398,48.94,0.86,  0,    0
+Regulus,alLeo,ICRS,10,08,22.31099,+11,58,01.9516,-248.73,5.59,5.9,41.13,1.40,  0,    0
+Rex,alLeo,ICRS,10,08,22.31099,+11,58,01.9516,-248.73,5.59,5.9,41.13,1.40,  0,    0
+"""
+
+
+@pytest.fixture
+def star_catalog(tmp_path, monkeypatch):
+    (tmp_path / "sefstars.txt").write_text(CATALOG)
+    monkeypatch.setenv("EPHE_PATH", str(tmp_path))
+    monkeypatch.delenv("FIXED_STAR_CATALOG", raising=False)
+    bodies._thread_state.ephe_path_set = False
+    fixed_star_names.cache_clear()
+    fixed_star_index.cache_clear()
+    yield
+    bodies._thread_state.ephe_path_set = False
+    fixed_star_names.cache_clear()
+    fixed_star_index.cache_clear()
+
+
+def test_star_catalog_and_index(star_catalog):
+    # repeated stars are listed once, under their first name
+    assert fixed_star_names() == ("Aldebaran,alTau", "Regulus,alLeo")
+    index = fixed_star_index(2000)
+    assert index.names == ["Aldebaran", "Regulus"]
+    assert index.longitudes == pytest.approx([69.8, 149.8], abs=0.1)
+    regulus = swe.fixstar2_ut("Regulus", swe.julday(2000, 7, 2, 0.0))[0][0]
+    assert [name for name, _, _ in index.within(regulus, 0.01)] == ["Regulus"]
+
+
+BIRTH = {"date": "1990-05-17", "time": "08:30", "zone": "Europe/Madrid", "lat": 40.4, "lon": -3.7}
+
+
+def test_natal_stars_needs_the_catalog(tmp_path, monkeypatch):
+    monkeypatch.setenv("FIXED_STAR_CATALOG", str(tmp_path / "missing.txt"))
+    fixed_star_names.cache_clear()
+    fixed_star_index.cache_clear()
+    client = TestClient(app)
+    try:
+        response = client.get("/natal/stars", params=BIRTH)
+        assert response.status_code == 503
+        assert client.get("/bodies").json()["fixed_stars"] == 0
+    finally:
+        fixed_star_names.cache_clear()
+        fixed_star_index.cache_clear()
+
+
+def test_natal_stars_from_the_catalog(star_catalog):
+    response = TestClient(app).get("/natal/stars", params=BIRTH)
+    assert response.status_code == 200
+    assert response.json()["stars_indexed"] == 2
@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from app.bulk_charts import _prepare_parts, compute_record, manifest, read_records, run
+
+RECORDS = [
+    {"id": "a", "date": "1990-05-17", "time": "08:30", "zone": "UTC", "lat": "40.4", "lon": "-3.7"},
+    {"id": "b", "date": "1985-12-01", "time": "23:10", "zone": "UTC", "lat": "-34.6", "lon": "-58.4"},
+    {"id": "c", "date": "not a date", "time": "10:00", "zone": "UTC", "lat": "0", "lon": "0"},
+    {"id": "d", "date": "2001-01-01", "time": "00:00"},
+    {"id": "e", "date": "1970-07-20", "time": "12:00", "zone": "UTC", "lat": "51.5", "lon": "0"},
+]
+
+
+@pytest.fixture
+def records_file(tmp_path):
+    path = tmp_path / "players.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in RECORDS), encoding="utf-8")
+    return str(path)
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+def test_read_records_from_csv(tmp_path):
+    path = tmp_path / "players.csv"
+    path.write_text("\ufeffid,date,time\n1,2000-01-01,12:00\n", encoding="utf-8")
+    assert list(read_records(str(path))) == [{"id": "1", "date": "2000-01-01", "time": "12:00"}]
+
+
+def test_compute_record_reports_errors():
+    chart = compute_record(RECORDS[0])
+    assert chart["id"] == "a" and "Sun" in chart["positions"] and "error" not in chart
+    assert compute_record(RECORDS[3]) == {
+        "id": "d", "error": "Provide zone, lat and lon, or a place",
+    }
+    assert "error" in compute_record(RECORDS[2])
+
+
+def test_run_keeps_input_order(records_file, tmp_path):
+    output = str(tmp_path / "charts.jsonl")
+    assert run(records_file, output, "jsonl", workers=2, chunk_size=2) == len(RECORDS)
+    rows = _read_jsonl(output)
+    assert [row["id"] for row in rows] == ["a", "b", "c", "d", "e"]
+    assert ["error" in row for row in rows] == [False, False, True, True, False]
+    assert not os.path.exists(f"{output}.parts")
+
+
+def test_run_resumes_finished_chunks(records_file, tmp_path):
+    output = str(tmp_path / "charts.jsonl")
+    parts = f"{output}.parts"
+    _prepare_parts(parts, manifest(records_file, "jsonl", 2), restart=False)
+    # a chunk finished by an interrupted run is reused as is
+    resumed = [{"id": "a", "resumed": True}, {"id": "b", "resumed": True}]
+    with open(os.path.join(parts, "chunk-000000.jsonl"), "w", encoding="utf-8") as fh:
+        fh.write("".join(json.dumps(r) + "\n" for r in resumed))
+
+    assert run(records_file, output, "jsonl", workers=1, chunk_size=2) == len(RECORDS)
+    rows = _read_jsonl(output)
+    assert rows[:2] == resumed
+    assert [row["id"] for row in rows[2:]] == ["c", "d", "e"]
+
+
+def test_mismatched_parts_need_restart(records_file, tmp_path):
+    output = str(tmp_path / "charts.jsonl")
+    parts = f"{output}.parts"
+    _prepare_parts(parts, manifest(records_file, "jsonl", 3), restart=False)
+    open(os.path.join(parts, "chunk-000000.jsonl"), "w").close()
+
+    with pytest.raises(ValueError, match="--restart"):
+        run(records_file, output, "jsonl", workers=1, chunk_size=2)
+    assert run(records_file, output, "jsonl", workers=1, chunk_size=2, restart=True) == 5
+    assert len(_read_jsonl(output)) == len(RECORDS)
+
+
+def test_manifest_tracks_the_input_content(records_file):
+    before = manifest(records_file, "jsonl", 2)
+    with open(records_file, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(RECORDS[0]) + "\n")
+    after = manifest(records_file, "jsonl", 2)
+    assert before["input"] == after["input"]
+    assert before["sha256"] != after["sha256"]
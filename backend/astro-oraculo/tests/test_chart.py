@@ -0,0 +1,111 @@
+import pickle
+
+import numpy as np
+import pytest
+import swisseph as swe
+
+from app.bodies import BODY_CATALOG
+from app.chart import ASPECT_TYPES, ChartSnapshot, aspects_within, compute_chart, cross_aspects
+
+
+def _angle_diff(a1, a2):
+    diff = abs(a1 - a2) % 360
+    return min(diff, 360 - diff)
+
+
+def _aspects_loop(positions: dict):
+    """Pairwise aspect loop the endpoints used before snapshots."""
+    aspects = []
+    names = list(positions)
+    for i in range(len(names)):
+        for j in range(i + 1, len(names)):
+            diff = _angle_diff(positions[names[i]], positions[names[j]])
+            for aspect, (angle, orb) in ASPECT_TYPES.items():
+                if abs(diff - angle) <= orb:
+                    aspects.append({
+                        "planet1": names[i],
+                        "planet2": names[j],
+                        "aspect": aspect,
+                        "orb": round(abs(diff - angle), 2),
+                    })
+                    break
+    return aspects
+
+
+def _cross_loop(pos_a: dict, pos_b: dict, same: bool):
+    pairs = []
+    for a_name, a in pos_a.items():
+        for b_name, b in pos_b.items():
+            if a_name == b_name and same:
+                continue
+            diff = _angle_diff(a, b)
+            for aspect, (angle, orb) in ASPECT_TYPES.items():
+                if abs(diff - angle) <= orb:
+                    pairs.append({"from": a_name, "to": b_name, "aspect": aspect,
+                                  "orb": round(abs(diff - angle), 2)})
+                    break
+    return pairs
+
+
+def _random_chart(rng, n=14):
+    names = tuple(f"P{k}" for k in range(n))
+    return ChartSnapshot(names, rng.uniform(0, 360, n))
+
+
+def test_aspects_within_matches_the_loop():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        chart = _random_chart(rng)
+        assert aspects_within(chart, ASPECT_TYPES) == _aspects_loop(chart.as_longitudes())
+
+
+def test_cross_aspects_match_the_loop():
+    rng = np.random.default_rng(8)
+    for _ in range(100):
+        a, b = _random_chart(rng, 12), _random_chart(rng, 9)
+        assert cross_aspects(a, b, ASPECT_TYPES) == _cross_loop(
+            a.as_longitudes(), b.as_longitudes(), same=False
+        )
+        assert cross_aspects(a, a, ASPECT_TYPES, same_chart=True) == _cross_loop(
+            a.as_longitudes(), a.as_longitudes(), same=True
+        )
+        # the same snapshot passed twice is still two charts
+        assert cross_aspects(a, a, ASPECT_TYPES) == _cross_loop(
+            a.as_longitudes(), a.as_longitudes(), same=False
+        )
+
+
+def test_aspect_orbs_across_zero_aries():
+    chart = ChartSnapshot(("A", "B", "C"), [358.0, 3.0, 181.0])
+    assert aspects_within(chart, ASPECT_TYPES) == [
+        {"planet1": "A", "planet2": "B", "aspect": "conjunction", "orb": 5.0},
+        {"planet1": "A", "planet2": "C", "aspect": "opposition", "orb": 3.0},
+        {"planet1": "B", "planet2": "C", "aspect": "opposition", "orb": 2.0},
+    ]
+
+
+def test_snapshot_accessors():
+    chart = ChartSnapshot(("Sun", "Moon"), [365.5, -30.0])
+    assert chart.longitudes.tolist() == [5.5, 330.0]
+    assert not chart.longitudes.flags.writeable
+    assert chart.sign("Moon") == "Pisces"
+    assert chart.degree("Sun") == pytest.approx(5.5)
+    assert "Moon" in chart and "Mars" not in chart
+    assert chart.to_positions()["Moon"] == {"longitude": 330.0, "sign": "Pisces", "degree": 0.0}
+    assert chart.select(["Moon", "Mars"]).as_longitudes() == {"Moon": 330.0}
+    restored = ChartSnapshot.from_positions(chart.to_positions())
+    assert restored.as_longitudes() == chart.as_longitudes()
+    copy = pickle.loads(pickle.dumps(chart))
+    assert copy.names == chart.names and copy.longitudes.tolist() == [5.5, 330.0]
+
+
+def test_compute_chart_matches_swisseph():
+    jd = swe.julday(1990, 5, 17, 6.5)
+    bodies = {name: BODY_CATALOG[name] for name in ("Sun", "Moon", "Mars")}
+    chart = compute_chart(jd, 40.4, -3.7, bodies)
+    assert chart.names == ("Sun", "Moon", "Mars", "Ascendant", "Midheaven")
+    assert chart.longitude("Moon") == pytest.approx(swe.calc_ut(jd, swe.MOON)[0][0])
+    _, ascmc = swe.houses(jd, 40.4, -3.7)
+    assert chart.longitude("Ascendant") == pytest.approx(ascmc[0])
+    # charts of one body catalog share the names tuple
+    assert compute_chart(jd + 1, 0.0, 0.0, bodies).names is chart.names
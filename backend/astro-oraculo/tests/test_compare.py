@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+
+from app.astro_api_unified import _natal_positions, app
+
+BIRTH = {"date": "1990-05-17", "time": "08:30", "zone": "Europe/Madrid", "lat": 40.4, "lon": -3.7}
+
+
+def test_synastry_of_identical_births_keeps_same_body_aspects():
+    params = {f"{side}_{key}": value for side in "ab" for key, value in BIRTH.items()}
+    aspects = TestClient(app).get("/compare/synastry", params=params).json()["aspects"]
+    # both sides come from one cached snapshot, yet each is a chart of its own
+    assert _natal_positions(*BIRTH.values()) is _natal_positions(*BIRTH.values())
+    same_body = [a for a in aspects if a["from"] == a["to"]]
+    names = _natal_positions(*BIRTH.values()).names
+    assert sorted(a["from"] for a in same_body) == sorted(names)
+    assert all(a["aspect"] == "conjunction" and a["orb"] == 0.0 for a in same_body)
@@ -0,0 +1,78 @@
+import copy
+
+import pytest
+
+from app.chart import ChartSnapshot
+from app.correspondences import _compile, correspondences, house_of, reading
+from app.databundle import data_bundle
+
+CUSPS = [(95.0 + 30 * k) % 360 for k in range(12)]
+
+
+@pytest.fixture
+def tables():
+    return copy.deepcopy(data_bundle().tables)
+
+
+def test_tables_from_the_bundle():
+    tables = correspondences()
+    assert len(tables.degree_cards) == 360 and len(tables.decan_cards) == 36
+    assert tables.decan_cards[0] == "2 de Bastos"
+    assert tables.degree_cards[9] == tables.degree_cards[0] != tables.degree_cards[10]
+    assert all(card == tables.decan_cards[d // 10] for d, card in enumerate(tables.degree_cards))
+    assert None not in tables.sign_arcana + tables.sign_courts + tables.house_aces
+    assert {"Sun", "Moon", "North Node", "Ascendant"} <= set(tables.body_arcana)
+    # compiled once per bundle version
+    assert correspondences() is tables
+
+
+def test_decan_cards_follow_their_sign_and_degrees(tables):
+    rows = tables["decanatos_menores.csv"]
+    # file order does not matter
+    rows.reverse()
+    assert _compile(tables).decan_cards == correspondences().decan_cards
+
+
+def test_disagreeing_wheels_are_rejected(tables):
+    tables["decanatos_menores.csv"][4]["Carta"] = "Rey de Copas"
+    with pytest.raises(ValueError, match="decanatos_menores.csv"):
+        _compile(tables)
+
+
+def test_missing_decans_are_rejected(tables):
+    del tables["decanatos_menores.csv"][35]
+    with pytest.raises(ValueError, match="decan 35"):
+        _compile(tables)
+
+
+def test_house_of_wraps_past_aries():
+    assert house_of(95.0, CUSPS) == 1
+    assert house_of(124.9, CUSPS) == 1
+    assert house_of(125.0, CUSPS) == 2
+    assert house_of(94.9, CUSPS) == 12
+    assert house_of(10.0, CUSPS) == 10
+
+
+def test_reading_cards():
+    tables = correspondences()
+    chart = ChartSnapshot(("Sun", "Moon", "Vesta"), [15.5, 200.0, 359.9])
+    aspects = [{"planet1": "Sun", "planet2": "Moon", "aspect": "opposition", "orb": 4.5},
+               {"planet1": "Sun", "planet2": "Pluto", "aspect": "trine", "orb": 1.0}]
+    result = reading(chart, CUSPS, aspects)
+    sun = result["cards"]["Sun"]
+    assert sun["sign"] == "Aries" and sun["degree"] == pytest.approx(15.5)
+    assert sun["decan_card"] == tables.decan_cards[1]
+    assert sun["arcana"] == tables.body_arcana["Sun"]
+    assert sun["house"] == 10 and sun["house_ace"] == tables.house_aces[9]
+    assert "arcana" not in result["cards"]["Vesta"]
+    assert result["cards"]["Vesta"]["court_card"] == tables.sign_courts[11]
+    assert result["aspects"] == [
+        {**aspects[0], "cards": [tables.decan_cards[1], tables.decan_cards[20]]},
+    ]
+    assert "house" not in reading(chart)["cards"]["Sun"]
+
+
+def test_apps_share_the_aspect_definitions():
+    from app import astro_api_unified, chart, main
+    assert main.ASPECT_TYPES is chart.ASPECT_TYPES
+    assert astro_api_unified.ASPECT_TYPES is chart.ASPECT_TYPES
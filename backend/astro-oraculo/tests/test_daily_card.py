@@ -0,0 +1,82 @@
+import datetime
+
+import pytest
+import swisseph as swe
+
+from app import daily_card
+from app.bodies import BODY_GROUPS, body_longitudes
+from app.chart import ASPECT_TYPES, ChartSnapshot, aspects_within
+from app.correspondences import correspondences
+from app.daily_card import DailyCardTable, _local_noon_jd
+
+START = datetime.date(2024, 3, 1)
+
+
+@pytest.fixture(scope="module")
+def table():
+    return DailyCardTable(START, 3, ("UTC", "Europe/Madrid"))
+
+
+def test_local_noon():
+    assert _local_noon_jd(START, "Europe/Madrid") == pytest.approx(swe.julday(2024, 3, 1, 11.0))
+    assert _local_noon_jd(datetime.date(2024, 7, 1), "Europe/Madrid") == pytest.approx(
+        swe.julday(2024, 7, 1, 10.0)
+    )
+
+
+def test_lookup_matches_the_sky_at_local_noon(table):
+    tables = correspondences()
+    for offset in range(3):
+        day = START + datetime.timedelta(days=offset)
+        for zone in table.zones:
+            jd = _local_noon_jd(day, zone)
+            chart = ChartSnapshot(table.bodies, list(body_longitudes(
+                jd, BODY_GROUPS["planets"]).values()))
+            decan = int(chart.longitude("Moon") // 10)
+            tight = min(aspects_within(chart, ASPECT_TYPES), key=lambda a: a["orb"])
+            card = table.lookup(zone, day)
+            assert card["card"] == tables.decan_cards[decan]
+            assert card["moon_sign"] == chart.sign("Moon")
+            assert card["aspect"] == tight
+            assert card["bucket"] == zone
+
+
+def test_weekday_ruler(table):
+    card = table.lookup("UTC", START)
+    # 2024-03-01 was a Friday
+    assert card["ruler"] == "Venus"
+    assert card["ruler_arcana"] == correspondences().body_arcana["Venus"]
+
+
+def test_other_zones_use_a_bucket_with_their_offset(table):
+    card = table.lookup("Europe/Paris", START)
+    assert card["bucket"] == "Europe/Madrid" and card["zone"] == "Europe/Paris"
+    assert card["card"] == table.lookup("Europe/Madrid", START)["card"]
+    assert table.bucket("Europe/London", START) == "UTC"
+    with pytest.raises(ValueError, match="UTC offset of Asia/Kolkata"):
+        table.lookup("Asia/Kolkata", START)
+
+
+def test_lookup_outside_the_window(table):
+    assert table.end == datetime.date(2024, 3, 4)
+    with pytest.raises(ValueError, match="outside the daily card window"):
+        table.lookup("UTC", table.end)
+
+
+def test_daily_cards_rebuild_when_the_window_moves(monkeypatch):
+    built = []
+
+    class Table:
+        def __init__(self, start, days):
+            self.start = start
+            built.append((start, days))
+
+    monkeypatch.setattr(daily_card, "DailyCardTable", Table)
+    monkeypatch.setattr(daily_card, "_table", None)
+    monkeypatch.setattr(daily_card, "_window_start", lambda: START)
+    first = daily_card.daily_cards()
+    assert daily_card.daily_cards() is first
+    monkeypatch.setattr(daily_card, "_window_start", lambda: START + datetime.timedelta(days=1))
+    assert daily_card.daily_cards() is not first
+    days = daily_card.DAILY_CARD_PAST + 1 + daily_card.DAILY_CARD_AHEAD
+    assert built == [(START, days), (START + datetime.timedelta(days=1), days)]
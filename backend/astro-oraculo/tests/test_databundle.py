@@ -0,0 +1,98 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import databundle
+from app.astro_api_unified import app
+from app.databundle import (
+    Bundle,
+    _Loaded,
+    compile_bundle,
+    compile_csv,
+    compile_json,
+    read_bundle,
+    write_bundle,
+)
+
+BUNDLE = Bundle(
+    "0123456789abcdef", "2024-01-01T00:00:00+00:00",
+    {"a.csv": [{"Signo": "Géminis", "Carta": "8 de Espadas"}], "core/rules.json": {"x": [1, 2.5]}},
+)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "astro.bundle")
+    write_bundle(BUNDLE, path)
+    assert read_bundle(path) == BUNDLE
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_compiled_sources_round_trip(tmp_path):
+    bundle = compile_bundle()
+    assert {"zodiac_wheel.csv", "decanatos_menores.csv", "core/rules.json"} <= set(bundle.tables)
+    path = str(tmp_path / "astro.bundle")
+    write_bundle(bundle, path)
+    assert read_bundle(path) == bundle
+    # the version only depends on the sources
+    assert compile_bundle().version == bundle.version
+
+
+@pytest.mark.parametrize("damage, message", [
+    (lambda data: b"PICKLE" + data, "not a data bundle"),
+    (lambda data: data.replace(b'"sha256"', b'"sha"'), "malformed bundle header"),
+    (lambda data: data.replace(b"0123456789abcdef", b"../../etc/passwd"), "bad bundle version"),
+    (lambda data: data.replace("8 de Espadas".encode(), "9 de Espadas".encode()), "checksum"),
+])
+def test_damaged_bundles_are_rejected(tmp_path, damage, message):
+    path = tmp_path / "astro.bundle"
+    write_bundle(BUNDLE, str(path))
+    path.write_bytes(damage(path.read_bytes()))
+    with pytest.raises(ValueError, match=message):
+        read_bundle(str(path))
+
+
+def test_bundle_structure_is_checked(tmp_path):
+    path = str(tmp_path / "astro.bundle")
+    write_bundle(BUNDLE._replace(tables={"a.csv": "rows"}), path)
+    with pytest.raises(ValueError, match="mapping of documents"):
+        read_bundle(path)
+
+
+def test_compile_csv_normalizes_and_rejects_ragged_rows():
+    raw = "\ufeffSigno , Carta\n Géminis ,8 de Espadas\n,\n".encode()
+    assert compile_csv(raw, "a.csv") == [{"Signo": "Géminis", "Carta": "8 de Espadas"}]
+    with pytest.raises(ValueError, match="a.csv:3: 3 fields for 2 headers"):
+        compile_csv(b"a,b\n1,2\n1,2,3\n", "a.csv")
+
+
+def test_compile_json_is_strict():
+    assert compile_json(b'{" k ": [" v "]}', "x.json") == {"k": ["v"]}
+    with pytest.raises(ValueError, match="x.json"):
+        compile_json(b'{"a": 1\n "b": 2}', "x.json")
+
+
+def test_dropped_in_bundles_are_swapped(tmp_path, monkeypatch):
+    path = str(tmp_path / "astro.bundle")
+    monkeypatch.setattr(databundle, "DATA_BUNDLE", path)
+    monkeypatch.setattr(databundle, "BUNDLE_CHECK_INTERVAL", 0.0)
+    monkeypatch.setattr(databundle, "_loaded", _Loaded())
+    write_bundle(BUNDLE, path)
+    assert databundle.data_bundle() == BUNDLE
+
+    # a broken file leaves the loaded bundle in place
+    with open(f"{path}.new", "wb") as fh:
+        fh.write(b"garbage")
+    os.replace(f"{path}.new", path)
+    assert databundle.data_bundle() == BUNDLE
+
+    newer = BUNDLE._replace(version="fedcba9876543210", tables={"a.csv": []})
+    write_bundle(newer, path)
+    assert databundle.data_bundle() == newer
+    assert databundle.table("a.csv") == []
+
+
+def test_data_version_endpoint():
+    found = TestClient(app).get("/data/version").json()
+    assert set(found) == {"version", "built", "tables"}
+    assert "core/rules.json" in found["tables"]
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from app.geocoder import Place, PlaceIndex, fold, load_places, place_index
+
+
+def _place(name, country="AR", population=0):
+    return Place(name, country, 0.0, 0.0, population, "UTC")
+
+
+@pytest.fixture
+def index():
+    return PlaceIndex([
+        (_place("San Juan", "AR", 112778), ("San Juan",)),
+        (_place("San Juan", "PR", 342259), ("San Juan",)),
+        (_place("San Juan de los Morros", "VE", 900000), ("San Juan de los Morros",)),
+        (_place("Santiago", "CL", 5614000), ("Santiago",)),
+        (_place("Córdoba", "AR", 1391000), ("Córdoba",)),
+        (_place("Köln", "DE", 1086000), ("Köln", "Koln", "Cologne")),
+    ])
+
+
+def test_fold_strips_case_accents_and_spaces():
+    assert fold("  Córdoba ") == "cordoba"
+    assert fold("SÃO   Paulo") == "sao paulo"
+
+
+def test_complete_orders_by_population(index):
+    names = [(p.name, p.country) for p in index.complete("san")]
+    assert names == [
+        ("Santiago", "CL"),
+        ("San Juan de los Morros", "VE"),
+        ("San Juan", "PR"),
+        ("San Juan", "AR"),
+    ]
+    assert [p.country for p in index.complete("SAN J", limit=2)] == ["VE", "PR"]
+    assert [p.country for p in index.complete("san", country="AR")] == ["AR"]
+    assert index.complete("xyz") == []
+
+
+def test_alternate_names_match_once(index):
+    assert [p.name for p in index.complete("co")] == ["Córdoba", "Köln"]
+    assert [p.name for p in index.complete("kol")] == ["Köln"]
+
+
+def test_resolve_prefers_exact_then_population(index):
+    # the exact name wins over the more populated prefix match
+    assert index.resolve("San Juan").country == "PR"
+    assert index.resolve("san juan, ar").country == "AR"
+    assert index.resolve("cordob").name == "Córdoba"
+    assert index.resolve("San Juan, CL") is None
+
+
+def test_prefix_search_matches_brute_force():
+    rng = random.Random(3)
+    letters = "abcáé "
+    entries = [
+        (_place("".join(rng.choice(letters) for _ in range(rng.randint(1, 6))),
+                population=rng.randint(0, 10**6)), None)
+        for _ in range(500)
+    ]
+    index = PlaceIndex((place, (place.name,)) for place, _ in entries)
+    for prefix in ["a", "ab", "á", "e ", "ca", "bb", "abc"]:
+        expected = sorted(
+            (p.population for p, _ in entries if fold(p.name).startswith(fold(prefix))),
+            reverse=True,
+        )[:10]
+        assert [p.population for p in index.complete(prefix)] == expected
+
+
+def test_geonames_dump_indexes_ascii_names(tmp_path):
+    cols = [""] * 19
+    cols[1], cols[2], cols[4], cols[5] = "Zürich", "Zurich", "47.37", "8.54"
+    cols[8], cols[14], cols[17] = "CH", "341730", "Europe/Zurich"
+    no_zone = list(cols)
+    no_zone[17] = ""
+    path = tmp_path / "cities.txt"
+    path.write_text("\t".join(cols) + "\n" + "\t".join(no_zone) + "\n", encoding="utf-8")
+    entries = load_places(str(path))
+    assert len(entries) == 1
+    place = PlaceIndex(entries).resolve("Zurich, CH")
+    assert (place.name, place.lat, place.timezone) == ("Zürich", 47.37, "Europe/Zurich")
+
+
+def test_bundled_places_resolve():
+    place = place_index().resolve("Buenos Aires")
+    assert place.country == "AR"
+    assert place.timezone == "America/Argentina/Buenos_Aires"
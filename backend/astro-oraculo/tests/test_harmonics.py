@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from app.harmonics import (
+    harmonic_conjunctions,
+    harmonic_matrix,
+    harmonic_resonance,
+    longitude_table,
+)
+
+
+def test_harmonic_matrix():
+    matrix = harmonic_matrix([10.0, 200.0], [1, 2, 12])
+    assert matrix.shape == (3, 2)
+    assert np.allclose(matrix, [[10, 200], [20, 40], [120, 240]])
+
+
+def test_stacked_charts_match_single_charts():
+    charts = np.random.default_rng(0).uniform(0, 360, (5, 7))
+    stacked = harmonic_matrix(charts, [3, 6, 8])
+    for k, chart in enumerate(charts):
+        assert np.array_equal(stacked[k], harmonic_matrix(chart, [3, 6, 8]))
+
+
+def test_sextile_is_a_sixth_harmonic_conjunction():
+    # 60.2° apart: 1.2° in the 6th harmonic, 2.4° in the 12th
+    matrix = harmonic_matrix([15.0, 75.2], [6, 8, 12])
+    assert harmonic_resonance(matrix).tolist() == [1, 0, 0]
+    assert harmonic_resonance(matrix, orb=3).tolist() == [1, 0, 1]
+    found = harmonic_conjunctions(["Sun", "Moon"], [6, 8, 12], matrix)
+    assert [(c["harmonic"], c["planet1"], c["planet2"]) for c in found] == [(6, "Sun", "Moon")]
+    assert found[0]["orb"] == pytest.approx(1.2)
+
+
+def test_resonance_matches_pairwise_loop():
+    charts = np.random.default_rng(1).uniform(0, 360, (20, 8))
+    harmonics = [6, 8, 12]
+    counts = harmonic_resonance(harmonic_matrix(charts, harmonics))
+    for k, chart in enumerate(charts):
+        for h, n in enumerate(harmonics):
+            expected = 0
+            for i in range(8):
+                for j in range(i + 1, 8):
+                    diff = abs(n * chart[i] - n * chart[j]) % 360
+                    expected += min(diff, 360 - diff) <= 2.0
+            assert counts[k, h] == expected
+
+
+def test_missing_bodies_never_match():
+    table = longitude_table(
+        [{"Sun": {"longitude": 10.0}, "Moon": 10.5}, {"Sun": 10.0}], ["Sun", "Moon"]
+    )
+    assert np.isnan(table[1, 1])
+    assert harmonic_resonance(harmonic_matrix(table, [1])).tolist() == [[1], [0]]
@@ -0,0 +1,74 @@
+import pytest
+import swisseph as swe
+from fastapi.testclient import TestClient
+
+from app import identity
+from app.chart import SIGNS
+from app.identity import AVATARS, HEPTAGRAM_EFFECTS, IDENTITY_CARDS, app
+
+BIRTH = {"date": "1990-05-17", "time": "08:30", "zone": "Europe/Madrid", "lat": 40.4, "lon": -3.7}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_templates_cover_every_planet_and_sign():
+    assert len(IDENTITY_CARDS) == 7 and all(len(row) == 12 for row in IDENTITY_CARDS)
+    card = IDENTITY_CARDS[0][4]
+    assert card["name"] == "Tu Sun en Leo" and card["power_base"] == 10
+    assert IDENTITY_CARDS[4][0]["efecto_heptagrama"] == "MARTE"
+    assert [a["signo"] for a in AVATARS] == SIGNS
+
+
+def test_deck_follows_the_natal_signs(client):
+    deck = client.get("/player/identity-deck", params=BIRTH).json()
+    jd = swe.julday(1990, 5, 17, 6.5)
+    assert deck["total_cards"] == 7
+    for card, planet in zip(deck["identity_deck"], HEPTAGRAM_EFFECTS):
+        lon = swe.calc_ut(jd, identity.IDENTITY_BODIES[planet])[0][0]
+        assert card["card_id"] == f"NATAL_{planet.upper()}"
+        assert card["signo_natal"] == SIGNS[int(lon // 30)]
+        assert card["casa_natal"] == pytest.approx(lon % 30)
+    asc = swe.houses(jd, BIRTH["lat"], BIRTH["lon"])[1][0]
+    assert deck["player_avatar"]["signo"] == SIGNS[int(asc // 30)]
+    # the shared templates are never modified
+    assert all(card["casa_natal"] is None for row in IDENTITY_CARDS for card in row)
+
+
+def test_invalid_birth_data(client):
+    response = client.get("/player/identity-deck", params={**BIRTH, "zone": "Nowhere/City"})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Error generando mazo de identidad")
+
+
+def test_batch_keeps_order_and_reuses_charts(client, monkeypatch):
+    computed = []
+    chart = identity._chart
+
+    def counting(jd, lat, lon):
+        computed.append(jd)
+        return chart(jd, lat, lon)
+
+    monkeypatch.setattr(identity, "_chart", counting)
+    players = [
+        {"player": "a", **BIRTH},
+        {"player": "b", **BIRTH, "time": "25:00"},
+        {"player": "c", **BIRTH},
+        {"player": "d", **{k: v for k, v in BIRTH.items() if k != "lat"}},
+    ]
+    decks = client.post("/player/identity-deck/batch", json={"players": players}).json()["decks"]
+    single = client.get("/player/identity-deck", params=BIRTH).json()
+
+    assert [d["player"] for d in decks] == ["a", "b", "c", "d"]
+    assert decks[0] == {"player": "a", **single}
+    assert decks[2] == decks[0] | {"player": "c"}
+    assert "error" in decks[1] and "error" in decks[3]
+    assert len(computed) == 2  # the batch computed its chart once, then the single request
+
+
+def test_batch_limit(client, monkeypatch):
+    monkeypatch.setattr(identity, "BATCH_MAX", 1)
+    response = client.post("/player/identity-deck/batch", json={"players": [BIRTH, BIRTH]})
+    assert response.status_code == 400
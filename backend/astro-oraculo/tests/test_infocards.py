@@ -0,0 +1,90 @@
+import collections
+import random
+
+import pytest
+
+from app import infocards
+from app.infocards import (
+    FIELD_WEIGHTS,
+    INFOCARD_FILES,
+    PREFIX_FACTOR,
+    _snippet,
+    _words,
+    build_index,
+    infocard_index,
+    search,
+)
+
+
+def _scan(index, query):
+    """Card scores by scanning every field of every card."""
+    words = [term for term, _, _ in _words(query)]
+    scores = {}
+    for card, info in enumerate(index.cards):
+        total = 0.0
+        for word in words:
+            score = 0.0
+            for field, text in info.fields.items():
+                counts = collections.Counter(term for term, _, _ in _words(text))
+                score += max(
+                    [(1.0 if term == word else PREFIX_FACTOR) * n * FIELD_WEIGHTS[field]
+                     for term, n in counts.items() if term.startswith(word)],
+                    default=0.0,
+                )
+            if not score:
+                break
+            total += score
+        else:
+            scores[card] = total
+    return scores
+
+
+def test_bundled_library():
+    index = infocard_index()
+    assert len(index.cards) == 78
+    assert collections.Counter(card.suit for card in index.cards) == {
+        "Arcanos Mayores": 22, "Bastos": 14, "Copas": 14, "Espadas": 14, "Oros": 14,
+    }
+    assert infocard_index() is index
+
+
+def test_search_matches_a_full_scan():
+    index = infocard_index()
+    rng = random.Random(9)
+    queries = [" ".join(rng.sample(index.terms, rng.randint(1, 2))) for _ in range(40)]
+    queries += [term[:3] for term in rng.sample(index.terms, 40)]
+    for query in queries:
+        expected = sorted(_scan(index, query).items(), key=lambda item: (-item[1], item[0]))
+        found = search(query, limit=78)
+        assert [r["id"] for r in found] == [index.cards[c].id for c, _ in expected]
+        assert [r["score"] for r in found] == pytest.approx(
+            [round(s, 2) for _, s in expected]
+        )
+
+
+def test_search_folds_accents_and_ranks_by_field(monkeypatch):
+    tables = {name: {"cartas": {}} for name in INFOCARD_FILES}
+    tables["AMAinfocard_final.json"]["cartas"] = {
+        "0": {"nombre": "El Loco", "efecto": "Pasión por lo nuevo"},
+        "1": {"nombre": "El Mago", "personalidad": "Pasional y creativo"},
+        "2": {"nombre": "La Sacerdotisa", "arquetipo": "Intuición"},
+    }
+    index = build_index(tables)
+    monkeypatch.setattr(infocards, "infocard_index", lambda: index)
+
+    # whole word in `efecto` (1.5) beats a prefix in `personalidad` (2 * 0.5)
+    assert [(r["nombre"], r["score"]) for r in search("PASION")] == [
+        ("El Loco", 1.5), ("El Mago", 1.0),
+    ]
+    assert [r["nombre"] for r in search("pasi crea")] == ["El Mago"]
+    assert search("intuicion")[0]["field"] == "arquetipo"
+    assert search("mago zzz") == [] and search("  ") == []
+    assert len(search("el", limit=1)) == 1
+
+
+def test_snippet_highlights_matches():
+    text = "Energía de inicio. " * 3 + "El fuego del inicio trae pasión y fuego nuevo. " + "x " * 80
+    snippet = _snippet(text, ["fuego"])
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert snippet.count("**fuego**") == 2
+    assert _snippet("Corto", ["zzz"]) == "Corto"
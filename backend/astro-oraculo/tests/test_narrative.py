@@ -0,0 +1,76 @@
+import numpy as np
+
+from app.chart import ASPECT_TYPES, ChartSnapshot, aspects_within
+from app.correspondences import correspondences
+from app.narrative import _title, compose, narrative_tables
+
+CUSPS = [(95.0 + 30 * k) % 360 for k in range(12)]
+
+
+def _aspect(first, second, aspect, orb):
+    return {"planet1": first, "planet2": second, "aspect": aspect, "orb": orb}
+
+
+def test_tables_from_the_manual():
+    tables = narrative_tables()
+    assert len(tables.pillars) == 12
+    assert tables.pillars[0] == "Sun" and "Ascendant" in tables.pillars
+    assert sorted(tables.levels) == [1, 2, 3]
+    assert None not in tables.phrases and None not in tables.exercises
+    assert tables.offsets["conjuncion"] == 0 and tables.offsets["sextil"] == 6
+    assert narrative_tables() is tables
+
+
+def test_card_titles():
+    assert _title("XIX El Sol") == "El Sol"
+    assert _title("0 El Loco") == "El Loco"
+    assert _title("Reina de Copas") == "Reina de Copas"
+
+
+def test_pillar_levels():
+    cards = correspondences()
+    tables = narrative_tables()
+    chart = ChartSnapshot(("Sun", "Moon"), [15.0, 75.0])
+    sun = compose(chart, CUSPS, [_aspect("Sun", "Moon", "sextile", 0.0)])["pillars"][0]
+    assert sun["body"] == "Sun" and sun["sign"] == "Aries"
+    first, second, third = sun["levels"]
+    assert first["cards"] == [cards.body_arcana["Sun"], cards.sign_arcana[0], cards.sign_courts[0]]
+    assert first["text"].startswith("El Sol en Aries aparece como")
+    assert second["cards"] == [cards.house_aces[9], cards.decan_cards[1]]
+    assert "casa 10" in second["text"] and tables.phrases[1] in second["text"]
+    # the sextile reaches six decans from the Sun's, towards the Moon
+    assert third["cards"] == [cards.decan_cards[7], cards.body_arcana["Moon"]]
+    assert "dialoga con la Luna" in third["text"]
+    assert tables.exercises[1] in third["text"]
+    assert third["tone"] == tables.levels[3]["tone"]
+
+
+def test_offset_counts_towards_the_other_body():
+    cards = correspondences()
+    chart = ChartSnapshot(("Sun", "Moon"), [75.0, 15.0])
+    sun = compose(chart, (), [_aspect("Sun", "Moon", "sextile", 0.0)])["pillars"][0]
+    assert sun["levels"][2]["cards"][0] == cards.decan_cards[7 - 6]
+    assert "casa" not in sun["levels"][1]["text"]
+
+
+def test_without_aspects_the_third_level_is_an_exercise():
+    chart = ChartSnapshot(("Sun",), [15.0])
+    third = compose(chart)["pillars"][0]["levels"][2]
+    assert third["cards"] == []
+    assert third["text"].startswith("En lo interno, el Sol trabaja en silencio.")
+
+
+def test_no_card_repeats_between_the_levels_of_a_pillar():
+    rng = np.random.default_rng(31)
+    names = narrative_tables().pillars
+    for _ in range(100):
+        chart = ChartSnapshot(names, rng.uniform(0, 360, len(names)))
+        reading = compose(chart, CUSPS, aspects_within(chart, ASPECT_TYPES))
+        assert [p["body"] for p in reading["pillars"]] == [
+            name for name in names if name in correspondences().body_arcana
+        ]
+        for pillar in reading["pillars"]:
+            # a body in the sign it rules repeats its arcana within level 1 only
+            told = [set(level["cards"]) for level in pillar["levels"]]
+            assert not told[0] & told[1] and not told[0] & told[2] and not told[1] & told[2]
+        assert reading["text"].count("\n\n") == len(reading["pillars"]) - 1
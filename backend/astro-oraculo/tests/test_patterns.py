@@ -0,0 +1,87 @@
+import itertools
+
+import numpy as np
+
+from app.patterns import PATTERN_ASPECTS, find_patterns, find_patterns_bulk
+
+
+def _aspected(lons, aspect):
+    angle, orb = PATTERN_ASPECTS[aspect]
+
+    def check(a, b):
+        diff = abs(lons[a] - lons[b]) % 360
+        return abs(min(diff, 360 - diff) - angle) <= orb
+    return check
+
+
+def _brute_force(lons):
+    """Pattern body sets found by trying every combination of bodies."""
+    trine, square = _aspected(lons, "trine"), _aspected(lons, "square")
+    opp, sextile, qx = (_aspected(lons, a) for a in ("opposition", "sextile", "quincunx"))
+    n = len(lons)
+    found = set()
+    for i, j, k in itertools.combinations(range(n), 3):
+        if trine(i, j) and trine(j, k) and trine(i, k):
+            found.add(("Grand Trine", (i, j, k), None))
+    crosses = set()
+    for quad in itertools.combinations(range(n), 4):
+        for a, b, c, d in [(0, 1, 2, 3), (0, 2, 1, 3), (0, 3, 1, 2)]:
+            w, x, y, z = (quad[a], quad[b], quad[c], quad[d])
+            if (opp(w, x) and opp(y, z)
+                    and all(square(p, q) for p in (w, x) for q in (y, z))):
+                crosses.add(quad)
+    found |= {("Grand Cross", quad, None) for quad in crosses}
+    for a, b in itertools.combinations(range(n), 2):
+        for c in range(n):
+            if c in (a, b):
+                continue
+            if opp(a, b) and square(a, c) and square(b, c):
+                if not any({a, b, c} <= set(quad) for quad in crosses):
+                    found.add(("T-Square", (a, b, c), c))
+            if sextile(a, b) and qx(a, c) and qx(b, c):
+                found.add(("Yod", (a, b, c), c))
+    return found
+
+
+def _as_sets(patterns, names):
+    index = {name: k for k, name in enumerate(names)}
+    return {
+        (p["pattern"], tuple(index[b] for b in p["bodies"]),
+         index[p["apex"]] if "apex" in p else None)
+        for p in patterns if p["pattern"] != "Stellium"
+    }
+
+
+def test_patterns_match_brute_force():
+    rng = np.random.default_rng(11)
+    names = [f"P{k}" for k in range(10)]
+    total = 0
+    for _ in range(300):
+        # longitudes near multiples of 30° so configurations are common
+        lons = rng.integers(0, 12, 10) * 30.0 + rng.uniform(-4, 4, 10)
+        lons = np.mod(lons, 360.0)
+        expected = _brute_force(lons)
+        assert _as_sets(find_patterns(lons, names), names) == expected
+        total += len(expected)
+    assert total > 100
+
+
+def test_grand_cross_hides_its_t_squares():
+    names = ["Sun", "Moon", "Mars", "Venus"]
+    found = find_patterns([0.0, 180.0, 90.0, 271.0], names)
+    assert found == [{"pattern": "Grand Cross", "bodies": names, "orb": 1.0}]
+
+
+def test_nodes_and_missing_bodies():
+    names = ["North Node", "South Node", "Sun", "Moon", "Mars"]
+    # the nodes always oppose each other: with the Sun squaring both this is no T-Square
+    assert find_patterns([10.0, 190.0, 100.0, np.nan, 250.0], names) == []
+    stellium = find_patterns([np.nan, np.nan, 31.0, 45.0, 59.0], names)
+    assert stellium == [{"pattern": "Stellium", "bodies": ["Sun", "Moon", "Mars"], "sign": "Taurus"}]
+
+
+def test_bulk_matches_single_charts():
+    rng = np.random.default_rng(12)
+    names = [f"P{k}" for k in range(8)]
+    table = np.mod(rng.integers(0, 12, (50, 8)) * 30.0 + rng.uniform(-3, 3, (50, 8)), 360)
+    assert find_patterns_bulk(table, names) == [find_patterns(row, names) for row in table]
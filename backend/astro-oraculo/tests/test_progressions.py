@@ -0,0 +1,54 @@
+import pytest
+import swisseph as swe
+
+from app.progressions import (
+    TROPICAL_YEAR,
+    jd_to_utc,
+    lunar_returns,
+    natal_longitude,
+    next_lunar_return,
+    progressed_jd,
+    solar_return,
+)
+
+NATAL_JD = swe.julday(1990, 5, 17, 14.5)
+
+
+def separation(a, b):
+    diff = abs(a - b) % 360
+    return min(diff, 360 - diff)
+
+
+def test_day_for_a_year():
+    assert progressed_jd(NATAL_JD, NATAL_JD) == NATAL_JD
+    assert progressed_jd(NATAL_JD, NATAL_JD + 30 * TROPICAL_YEAR) == pytest.approx(NATAL_JD + 30)
+
+
+def test_solar_return_finds_the_natal_sun():
+    jd = solar_return(NATAL_JD, 2024)
+    assert swe.revjul(jd)[:2] == (2024, 5)
+    sun = swe.calc_ut(jd, swe.SUN)[0][0]
+    assert separation(sun, natal_longitude(NATAL_JD, swe.SUN)) < 1e-5
+
+
+def test_lunar_returns_cover_the_year():
+    returns = lunar_returns(NATAL_JD, 2024)
+    assert len(returns) in (13, 14)
+    assert swe.julday(2024, 1, 1, 0.0) <= returns[0]
+    assert returns[-1] < swe.julday(2025, 1, 1, 0.0)
+    target = natal_longitude(NATAL_JD, swe.MOON)
+    for jd in returns:
+        assert separation(swe.calc_ut(jd, swe.MOON)[0][0], target) < 1e-5
+    gaps = [b - a for a, b in zip(returns, returns[1:])]
+    assert all(27.0 < gap < 28.0 for gap in gaps)
+
+
+def test_next_lunar_return_crosses_the_year():
+    after = swe.julday(2024, 12, 31, 0.0)
+    jd = next_lunar_return(NATAL_JD, after)
+    assert after <= jd < after + 28
+    assert jd in lunar_returns(NATAL_JD, 2024) + lunar_returns(NATAL_JD, 2025)
+
+
+def test_jd_to_utc():
+    assert jd_to_utc(swe.julday(2000, 1, 1, 12.0)) == "2000-01-01T12:00:00+00:00"
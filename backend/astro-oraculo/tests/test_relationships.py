@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from app.chart import ChartSnapshot
+from app.relationships import (
+    circular_midpoints,
+    composite_chart,
+    davison_moment,
+    geographic_midpoint,
+)
+
+
+def test_midpoints_take_the_shorter_arc():
+    mids = circular_midpoints([10, 350, 100, 0], [50, 30, 280, 180])
+    # 350 and 30 meet across 0° Aries; exact oppositions take the arc back
+    # from the first longitude
+    assert mids.tolist() == pytest.approx([30, 10, 10, 270])
+
+
+def test_midpoints_are_symmetric_except_for_oppositions():
+    rng = np.random.default_rng(2)
+    a, b = rng.uniform(0, 360, (2, 1000))
+    ab, ba = circular_midpoints(a, b), circular_midpoints(b, a)
+    diff = np.abs(ab - ba) % 360
+    assert np.minimum(diff, 360 - diff).max() < 1e-9
+
+
+def test_composite_uses_bodies_in_both_charts():
+    a = ChartSnapshot(("Sun", "Moon", "Mars"), np.array([10.0, 200.0, 300.0]))
+    b = ChartSnapshot(("Sun", "Moon"), np.array([30.0, 220.0]))
+    composite = composite_chart(a, b)
+    assert composite.names == ("Sun", "Moon")
+    assert composite.longitudes.tolist() == pytest.approx([20, 210])
+
+
+def test_geographic_midpoint():
+    assert geographic_midpoint(0, 10, 0, 30) == pytest.approx((0, 20))
+    # across the antimeridian
+    lat, lon = geographic_midpoint(0, 170, 0, -170)
+    assert lat == pytest.approx(0)
+    assert abs(lon) == pytest.approx(180)
+    lat, _ = geographic_midpoint(60, 0, 60, 180)
+    assert lat == pytest.approx(90)
+
+
+def test_davison_moment():
+    jd, lat, lon = davison_moment(2451545.0, 0, 10, 2451555.0, 0, 30)
+    assert (jd, lat, lon) == pytest.approx((2451550.0, 0, 20))
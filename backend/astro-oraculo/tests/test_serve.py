@@ -0,0 +1,86 @@
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from app import serve
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_preload_entries_exist():
+    for module_name, function, args in serve.PRELOAD:
+        assert callable(getattr(importlib.import_module(module_name), function))
+
+
+def test_preload_imports_its_modules():
+    # a fresh interpreter, so nothing is imported beforehand
+    code = (
+        "import sys\n"
+        "from app import serve\n"
+        "serve.preload()\n"
+        "print(sorted({m for m, _, _ in serve.PRELOAD} - set(sys.modules)))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True,
+                         text=True, timeout=120, check=True)
+    assert out.stdout.strip() == "[]"
+    assert "failed" not in out.stderr
+
+
+def test_preload_logs_failures(monkeypatch, caplog):
+    monkeypatch.setattr(serve, "PRELOAD", (
+        ("app.no_such_module", "load", ()),
+        ("json", "loads", ("not json",)),
+        ("json", "dumps", ({},)),
+    ))
+    monkeypatch.setattr(serve, "warm_chart", lambda: None)
+    monkeypatch.setattr(serve.swe, "close", lambda: None)
+    with caplog.at_level(logging.ERROR, logger="app.serve"):
+        serve.preload()
+    assert [r.getMessage() for r in caplog.records] == [
+        "Preloading app.no_such_module.load failed",
+        "Preloading json.loads failed",
+    ]
+
+
+def test_load_app():
+    assert serve.load_app("app.astro_api_unified:app") is serve.load_app("app.astro_api_unified")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_master_serves_and_stops():
+    port = _free_port()
+    master = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--log-level", "warning"],
+        cwd=BACKEND, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as resp:
+                    body = json.load(resp)
+                break
+            except OSError:
+                if master.poll() is not None or time.monotonic() > deadline:
+                    pytest.fail(master.stderr.read().decode())
+                time.sleep(0.2)
+        assert body == {"message": "Astro Oraculo API is running"}
+    finally:
+        master.send_signal(signal.SIGTERM)
+        code = master.wait(timeout=60)
+    assert code == 0
@@ -0,0 +1,164 @@
+import json
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from app import similarity
+from app.similarity import (
+    KDTree,
+    SimilarityIndex,
+    SimilarityLog,
+    add_similar_charts,
+    embed,
+    parse_weights,
+    similarity_index,
+)
+
+NAMES = ("Sun", "Moon", "Mercury", "Venus", "Mars")
+
+
+def _brute_force(points, point, k):
+    dist = ((points - point) ** 2).sum(axis=1)
+    return sorted(dist.tolist())[:k]
+
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(21)
+    points = rng.normal(size=(3000, 6))
+    for leaf_size in (1, 16, 256, 5000):
+        tree = KDTree(points, leaf_size)
+        for point in rng.normal(size=(30, 6)):
+            for k in (1, 7, 50):
+                best = []
+                tree.query(point, k, best)
+                found = sorted(-d for d, _ in best)
+                assert found == pytest.approx(_brute_force(points, point, k))
+                assert all(((points[row] - point) ** 2).sum() == pytest.approx(-d)
+                           for d, row in best)
+
+
+def test_kdtree_empty_and_duplicates():
+    best = []
+    KDTree(np.empty((0, 4))).query(np.zeros(4), 3, best)
+    assert best == []
+    tree = KDTree(np.zeros((600, 4)), leaf_size=8)
+    tree.query(np.ones(4), 5, best)
+    assert sorted(-d for d, _ in best) == [4.0] * 5
+
+
+def test_embedding_is_circular():
+    near = embed([[0.5], [359.5], [180.0]], [1.0])
+    assert np.linalg.norm(near[0] - near[1]) < np.linalg.norm(near[0] - near[2])
+    assert embed([np.nan, 90.0], [2.0, 1.0]).tolist() == pytest.approx([0, 0, 0, 1])
+
+
+def test_parse_weights():
+    assert parse_weights(" Sun=2, Moon = 1.5 ,,") == {"Sun": 2.0, "Moon": 1.5}
+
+
+def test_index_matches_brute_force_through_inserts_and_replacements():
+    rng = np.random.default_rng(22)
+    index = SimilarityIndex(NAMES, {"Sun": 2.0})
+    charts = {}
+    for step in range(12):
+        ids = rng.integers(0, 1500, 200).tolist()
+        table = rng.uniform(0, 360, (200, len(NAMES)))
+        index.add(ids, table)
+        charts.update(zip(ids, table))
+        assert len(index) == len(charts)
+        ids_all = list(charts)
+        points = embed(np.array([charts[i] for i in ids_all]), index.weights)
+        query = rng.uniform(0, 360, len(NAMES))
+        found = index.nearest(query, k=10)
+        expected = np.sqrt(_brute_force(points, embed(query, index.weights), 10))
+        assert [d for _, d in found] == pytest.approx(expected.tolist(), abs=1e-4)
+        for chart_id, distance in found:
+            exact = np.linalg.norm(embed(charts[chart_id], index.weights)
+                                   - embed(query, index.weights))
+            assert distance == pytest.approx(exact, abs=1e-4)
+
+
+def test_nearest_excludes_the_chart_itself():
+    index = SimilarityIndex(NAMES)
+    index.add(["a", "b", "c"], [[0] * 5, [10] * 5, [200] * 5])
+    assert [i for i, _ in index.nearest([0] * 5, k=2, exclude="a")] == ["b", "c"]
+    assert [i for i, _ in index.nearest([0] * 5, k=2, exclude="zzz")] == ["a", "b"]
+
+
+def test_log_is_shared_between_readers(tmp_path):
+    path = str(tmp_path / "similar.jsonl")
+    writer = SimilarityLog(path, SimilarityIndex(NAMES))
+    reader = SimilarityLog(path, SimilarityIndex(NAMES))
+    assert len(reader.sync()) == 0
+    writer.append(["a", "b"], [[1.0, 2, 3, 4, np.nan], [5.0, 6, 7, 8, 9]])
+    writer.append(["a"], [[100.0, 2, 3, 4, 5]])
+    index = reader.sync()
+    assert sorted(index.ids) == ["a", "b"]
+    assert index.nearest([100.0, 2, 3, 4, 5], k=1) == [("a", 0.0)]
+    with open(path) as fh:
+        lines = [json.loads(line) for line in fh]
+    assert lines[0] == {"names": list(NAMES)}
+    assert lines[1] == {"id": "a", "lon": [1.0, 2.0, 3.0, 4.0, None]}
+    assert len(lines) == 4
+
+
+def test_log_ignores_a_partial_record(tmp_path):
+    path = tmp_path / "similar.jsonl"
+    SimilarityLog(str(path), SimilarityIndex(NAMES)).append(["a"], [[1.0] * 5])
+    with open(path, "a") as fh:
+        fh.write('{"id": "b", "lon": [1')
+    assert SimilarityLog(str(path), SimilarityIndex(NAMES)).sync().ids == ["a"]
+
+
+def test_log_compaction_keeps_the_latest_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity, "_COMPACT_MIN", 10)
+    path = str(tmp_path / "similar.jsonl")
+    writer = SimilarityLog(path, SimilarityIndex(NAMES))
+    reader = SimilarityLog(path, SimilarityIndex(NAMES))
+    reader.sync()
+    for k in range(30):
+        writer.append([k % 4], [[float(k)] * 5])
+    with open(path) as fh:
+        assert sum(1 for _ in fh) < 30
+    index = reader.sync()
+    assert sorted(index.ids) == [0, 1, 2, 3]
+    assert index.nearest([29.0] * 5, k=1) == [(1, 0.0)]
+
+
+def test_log_for_other_bodies_is_rejected(tmp_path):
+    path = str(tmp_path / "similar.jsonl")
+    SimilarityLog(path, SimilarityIndex(NAMES)).append(["a"], [[1.0] * 5])
+    with pytest.raises(ValueError, match="indexes Sun"):
+        SimilarityLog(path, SimilarityIndex(NAMES[:3])).sync()
+
+
+def _write_charts(path, worker):
+    log = SimilarityLog(path, SimilarityIndex(NAMES))
+    for k in range(50):
+        log.append([f"{worker}-{k % 20}"], [[float(worker * 50 + k)] * 5])
+
+
+def test_concurrent_writers(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity, "_COMPACT_MIN", 20)
+    path = str(tmp_path / "similar.jsonl")
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_write_charts, args=(path, w)) for w in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+    index = SimilarityLog(path, SimilarityIndex(NAMES)).sync()
+    assert len(index) == 80
+    # the last record of every id wins
+    assert index.nearest([float(2 * 50 + 49)] * 5, k=1) == [("2-9", 0.0)]
+
+
+def test_shared_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("SIMILARITY_PATH", str(tmp_path / "similar.jsonl"))
+    monkeypatch.setitem(similarity._shared, "log", None)
+    add_similar_charts(NAMES, ["a"], [[1.0] * 5])
+    assert similarity_index(NAMES).ids == ["a"]
+    with pytest.raises(ValueError, match="holds Sun"):
+        similarity_index(NAMES[:2])
@@ -0,0 +1,75 @@
+import asyncio
+
+from app.chart import ChartSnapshot
+from app.sky_stream import SkyBroadcaster
+
+NAMES = ("Sun", "Moon", "Mars")
+TRINE = {"planet1": "Sun", "planet2": "Moon", "aspect": "trine", "orb": 1.0}
+
+
+class Sky:
+    """Scripted `compute`: returns the next `(longitudes, aspects)` each call."""
+
+    def __init__(self, steps):
+        self.steps = iter(steps)
+
+    def __call__(self):
+        longitudes, aspects = next(self.steps)
+        return ChartSnapshot(NAMES, longitudes), aspects
+
+
+def test_first_subscriber_gets_a_snapshot():
+    async def scenario():
+        sky = SkyBroadcaster(Sky([([10.0, 130.0, 200.0], [TRINE])]), interval=60)
+        queue = await sky.subscribe()
+        message = queue.get_nowait()
+        sky.unsubscribe(queue)
+        return message, sky
+
+    message, sky = asyncio.run(scenario())
+    assert message["type"] == "snapshot"
+    assert list(message["positions"]) == list(NAMES)
+    assert message["aspects"] == [TRINE]
+    assert sky._task is None
+
+
+def test_deltas_only_carry_what_moved():
+    sky = SkyBroadcaster(Sky([
+        ([10.0, 130.0, 200.0], [TRINE]),
+        ([10.01, 131.0, 200.0], [TRINE]),
+        ([10.03, 133.0, 359.99], []),
+        ([10.06, 134.0, 0.02], []),
+    ]), threshold=0.05)
+
+    async def scenario():
+        return [await sky._update() for _ in range(4)]
+
+    first, second, third, fourth = asyncio.run(scenario())
+    assert list(first["positions"]) == list(NAMES)
+    assert first["aspects_started"] == [TRINE]
+    assert list(second["positions"]) == ["Moon"]
+    assert second["aspects_started"] == second["aspects_ended"] == []
+    assert list(third["positions"]) == ["Moon", "Mars"]
+    assert third["aspects_ended"] == [TRINE]
+    # movement is measured from the last published value, across 0° Aries
+    assert list(fourth["positions"]) == ["Sun", "Moon"]
+    assert sky.positions["Sun"]["longitude"] == 10.06
+    assert sky.positions["Mars"]["longitude"] == 359.99
+
+
+def test_slow_clients_are_resynchronized():
+    async def scenario():
+        sky = SkyBroadcaster(Sky([([10.0, 130.0, 200.0], [])]), interval=60)
+        queue = await sky.subscribe()
+        for k in range(queue.maxsize * 2 - 1):
+            sky._publish({"type": "delta", "n": k})
+        messages = []
+        while not queue.empty():
+            messages.append(queue.get_nowait())
+        sky.unsubscribe(queue)
+        return messages, queue.maxsize
+
+    messages, size = asyncio.run(scenario())
+    # the queue overflowed and was replaced by a snapshot, then refilled
+    assert messages[0]["type"] == "snapshot"
+    assert [m["n"] for m in messages[1:]] == list(range(size, 2 * size - 1))
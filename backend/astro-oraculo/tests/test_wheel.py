@@ -0,0 +1,89 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.astro_api_unified import app
+from app.chart import ChartSnapshot
+from app.wheel import _GLYPH_GAP, R_HOUSE, _spread, render_wheel, static_wheel, wheel_key
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+CHART = ChartSnapshot(("Sun", "Moon", "Ascendant"), [15.0, 195.004, 100.0])
+CUSPS = [(100.0 + 30 * k) % 360 for k in range(12)]
+ASPECTS = [{"planet1": "Sun", "planet2": "Moon", "aspect": "opposition", "orb": 0.0}]
+
+
+def _group(svg, name):
+    return ET.fromstring(svg).find(f".//{SVG}g[@class='{name}']")
+
+
+def test_static_rings():
+    rings = ET.fromstring(f'<svg xmlns="http://www.w3.org/2000/svg">{static_wheel()}</svg>')
+    sectors = rings.findall(f".//{SVG}path")
+    assert len(sectors) == 12 + 36
+    assert sectors[0].find(f"{SVG}title").text == "Aries"
+
+
+def test_render_wheel_puts_the_ascendant_on_the_left():
+    svg = render_wheel(*wheel_key(CHART, CUSPS, ASPECTS))
+    root = ET.fromstring(svg)
+    assert root.get("viewBox") == "-300 -300 600 600"
+    bodies = _group(svg, "bodies")
+    ticks = bodies.findall(f"{SVG}line")
+    assert len(ticks) == 3
+    # Ascendant tick at the left of the house ring
+    asc = ticks[2]
+    assert float(asc.get("x1")) == pytest.approx(-R_HOUSE)
+    assert float(asc.get("y1")) == pytest.approx(0, abs=0.01)
+    labels = [t.find(f"{SVG}title").text for t in bodies.findall(f"{SVG}text")]
+    assert labels == ["Sun 15°00' Aries", "Moon 15°00' Libra", "Ascendant 10°00' Cancer"]
+    assert len(_group(svg, "houses").findall(f"{SVG}line")) == 12
+    lines = _group(svg, "aspects").findall(f"{SVG}line")
+    assert [line.find(f"{SVG}title").text for line in lines] == ["Sun opposition Moon"]
+
+
+def test_transit_wheel_without_houses():
+    svg = render_wheel(*wheel_key(CHART.select(["Sun", "Moon"]), (), ASPECTS))
+    assert _group(svg, "houses") is None
+    assert len(_group(svg, "bodies").findall(f"{SVG}text")) == 2
+
+
+def test_wheel_key_rounds_equal_charts_together():
+    nearby = ChartSnapshot(CHART.names, [15.001, 195.0, 100.0])
+    assert wheel_key(CHART, CUSPS, ASPECTS) == wheel_key(nearby, CUSPS, ASPECTS)
+    render_wheel.cache_clear()
+    first = render_wheel(*wheel_key(CHART, CUSPS, ASPECTS))
+    assert render_wheel(*wheel_key(nearby, CUSPS, ASPECTS)) is first
+    assert render_wheel.cache_info().hits == 1
+
+
+def test_spread_keeps_glyphs_apart():
+    angles = [10.0, 11.0, 12.0, 200.0, 13.5]
+    placed = _spread(angles)
+    ordered = sorted(placed)
+    assert min(b - a for a, b in zip(ordered, ordered[1:])) >= _GLYPH_GAP - 1e-9
+    assert placed[3] == 200.0
+    # order and centre of a cluster are kept
+    assert placed[0] < placed[1] < placed[2] < placed[4]
+    assert sum(placed[k] for k in (0, 1, 2, 4)) / 4 == pytest.approx(11.625)
+
+
+def test_spread_random_clusters():
+    rng = np.random.default_rng(13)
+    for _ in range(500):
+        angles = rng.uniform(0, 360, rng.integers(1, 25)).tolist()
+        placed = _spread(angles)
+        assert np.diff(np.sort(placed)).min(initial=_GLYPH_GAP) >= _GLYPH_GAP - 1e-9
+        assert np.argsort(placed).tolist() == np.argsort(angles).tolist()
+
+
+def test_wheel_endpoint():
+    client = TestClient(app)
+    response = client.get("/wheel", params={"date": "1990-05-17", "time": "08:30",
+                                            "zone": "Europe/Madrid", "lat": 40.4, "lon": -3.7})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/svg+xml"
+    assert len(_group(response.text, "houses").findall(f"{SVG}line")) == 12
+    assert client.get("/wheel", params={"date": "bad"}).status_code == 400
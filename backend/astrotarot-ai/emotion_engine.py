@@ -18,32 +18,55 @@ class EmotionEngine:
         "Trine": "Fluid flow, harmonic waves, seamless gradient"
     }
 
+    PATTERN_FEATURES = {
+        "Grand Trine": ("Closed circuit of talent", "Three luminous nodes joined by a seamless ring of flowing light"),
+        "T-Square": ("Pressure seeking an outlet", "Two colliding forces bending toward a single focal point"),
+        "Grand Cross": ("Tension locked in every direction", "A rigid cross of clashing beams, fixed in place"),
+        "Yod": ("Finger of fate", "A narrow beam converging from two stars onto one point"),
+        "Stellium": ("Concentrated will", "A dense cluster of stars burning in one region of the sky"),
+    }
+
+    # Aspectos sueltos que pasan al prompt, tras los patrones: con más la imagen se satura
+    MAX_ASPECT_FEATURES = 4
+
     @staticmethod
     def analyze_aspects(natal_data):
         """
-        Detecta tensiones y armonías ocultas.
-        Retorna una lista de 'Cicatrices' y 'Regalos'.
+        Detecta tensiones y armonías a partir de la carta calculada.
+        Usa los patrones de aspectos (`patterns`, de `/patterns` en la API
+        astral) y los aspectos simples (`aspects`, de `/natal`).
+        Retorna una lista de 'Cicatrices' y 'Regalos': los patrones y, después,
+        los `MAX_ASPECT_FEATURES` aspectos de orbe más cerrado.
         """
         features = []
-        
-        # Ejemplo: Sol vs Saturno (Típico en la carta de Tomás: Oposición/Tensión)
-        # Aquí iría la lógica matemática real comparando grados.
-        # Simulamos detección para el prototipo:
-        
-        # Si Sol (Aries) y Saturno (Libra) están opuestos:
-        features.append({
-            "type": "Opposition",
-            "meaning": "Identity under pressure",
-            "visual_effect": "A burning core trying to break through a crystalline cage"
-        })
-        
-        # Si Luna (Sagitario) conjunción Urano:
-        features.append({
-            "type": "Conjunction",
-            "meaning": "Emotional Lightning",
-            "visual_effect": "Sudden electric strikes in a dark void"
-        })
-        
+
+        for pattern in natal_data.get("patterns", []):
+            kind = pattern["pattern"]
+            if kind not in EmotionEngine.PATTERN_FEATURES:
+                continue
+            meaning, visual = EmotionEngine.PATTERN_FEATURES[kind]
+            features.append({
+                "type": kind,
+                "bodies": pattern["bodies"],
+                "meaning": meaning,
+                "visual_effect": visual,
+            })
+
+        # Aspectos más exactos primero: son los que más pesan en la imagen
+        aspects = [a for a in natal_data.get("aspects", [])
+                   if a["aspect"].capitalize() in EmotionEngine.TENSION_TEXTURES]
+        aspects.sort(key=lambda a: a["orb"])
+        for aspect in aspects[:EmotionEngine.MAX_ASPECT_FEATURES]:
+            kind = aspect["aspect"].capitalize()
+            features.append({
+                "type": kind,
+                "bodies": [aspect.get("planet1", aspect.get("from")),
+                           aspect.get("planet2", aspect.get("to"))],
+                "meaning": f"{aspect.get('planet1', aspect.get('from'))} {aspect['aspect']} "
+                           f"{aspect.get('planet2', aspect.get('to'))}",
+                "visual_effect": EmotionEngine.TENSION_TEXTURES[kind],
+            })
+
         return features
 
     @staticmethod
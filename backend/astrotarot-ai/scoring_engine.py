@@ -0,0 +1,242 @@
+import json
+import os
+
+import numpy as np
+
+# Reglas del juego (core/rules.json en la raíz del repositorio)
+RULES_PATH = os.getenv(
+    "RULES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "core", "rules.json"),
+)
+
+HOUSES = 12
+SLOTS = 6  # "las cartas podran ocupar hasta 6 espacios en cada casa"
+
+ELEMENTS = ("Fuego", "Tierra", "Aire", "Agua")
+
+# Pares de elementos opuestos (índices de ELEMENTS)
+OPPOSITE_ELEMENTS = ((0, 3), (1, 2))  # Fuego-Agua, Tierra-Aire
+
+# Elemento opuesto de cada elemento
+_OPPOSITE = np.empty(len(ELEMENTS), dtype=np.int64)
+for _a, _b in OPPOSITE_ELEMENTS:
+    _OPPOSITE[_a], _OPPOSITE[_b] = _b, _a
+
+# Valores de las reglas si rules.json no los define
+DEFAULT_MULTIPLIERS = {
+    "armonicos_coincidentes": 2,
+    "tres_o_mas_cartas": 1.2,
+    "transito_planetario": 3,
+    "bonificacion_maxima_transito": 6,
+    "penalizacion_opuestos": 0.2,
+    "penalizacion_reversion": 0.1,
+}
+
+def load_rules(path=RULES_PATH):
+    """Reglas del juego leídas de rules.json."""
+    with open(path, encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+class Boards:
+    """
+    Varios estados de tablero como arrays de forma (tableros, 12 casas, 6 espacios):
+
+    - values: valor base en puntos de cada carta (0 en espacios vacíos)
+    - harmonics: armónico dominante de la carta (0 = sin armónico)
+    - elements: índice en ELEMENTS (-1 = espacio vacío)
+    - reversed: la carta está en reversión
+    """
+
+    def __init__(self, values, harmonics, elements, reversed):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.harmonics = np.asarray(harmonics, dtype=np.int64)
+        self.elements = np.asarray(elements, dtype=np.int64)
+        self.reversed = np.asarray(reversed, dtype=bool)
+
+    @classmethod
+    def empty(cls, count=1):
+        shape = (count, HOUSES, SLOTS)
+        return cls(np.zeros(shape), np.zeros(shape), np.full(shape, -1), np.zeros(shape))
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def occupied(self):
+        return self.elements >= 0
+
+    def with_placements(self, board, houses, slots, card):
+        """
+        Un tablero nuevo por cada colocación candidata: el tablero `board`
+        con la carta `card` (value, harmonic, element, reversed) en la casa
+        `houses[k]` (0-11), espacio `slots[k]`.
+        """
+        houses = np.asarray(houses)
+        slots = np.asarray(slots)
+        rows = np.arange(len(houses))
+        arrays = []
+        for array, value in zip(
+            (self.values, self.harmonics, self.elements, self.reversed), card
+        ):
+            stacked = np.repeat(array[board][None], len(houses), axis=0)
+            stacked[rows, houses, slots] = value
+            arrays.append(stacked)
+        return Boards(*arrays)
+
+
+class HouseScoring:
+    """
+    Puntuación por casa según "puntuacion_y_armonicos" de rules.json,
+    evaluada para muchos tableros a la vez:
+
+    1. Se suman los valores de las cartas de la casa.
+    2. +2 por carta cuyo armónico coincide con el de la casa.
+    3. +3 por carta que coincide con el tránsito planetario, hasta +6 por casa.
+    4. x1.2 si 3 o más cartas de la casa comparten armónico.
+    5. -20% si en la casa hay cartas de elementos opuestos.
+    6. -10% progresivo por cada carta en reversión.
+    """
+
+    def __init__(self, rules=None):
+        if rules is None:
+            rules = load_rules()
+        multipliers = rules.get("puntuacion_y_armonicos", {}).get("multiplicadores", {})
+        self.multipliers = {**DEFAULT_MULTIPLIERS, **multipliers}
+
+    def _components(self, boards, house_harmonics, transits, top=0):
+        """
+        Cantidades por casa de las que dependen bonos y penalizaciones, más
+        las cartas por armónico (0 a `top` como mínimo) y los elementos
+        presentes en cada casa.
+        """
+        occupied = boards.occupied
+        if house_harmonics is None:
+            house_harmonics = np.arange(1, boards.values.shape[-2] + 1)
+        house_harmonics = np.asarray(house_harmonics)[..., None]
+        harmonic_match = occupied & (boards.harmonics > 0) & (boards.harmonics == house_harmonics)
+
+        if transits is None:
+            transit_matches = np.zeros(occupied.shape[:-1], dtype=np.int64)
+        else:
+            transits = np.asarray(transits)[..., None]
+            transit_match = occupied & (transits >= 0) & (boards.elements == transits)
+            transit_matches = transit_match.sum(axis=-1)
+
+        # cartas por armónico en cada casa: (..., 12, armónicos); el 0 no cuenta
+        top = max(int(boards.harmonics.max(initial=0)), top, 1)
+        harmonic_counts = (
+            (boards.harmonics[..., None] == np.arange(top + 1)) & occupied[..., None]
+        ).sum(axis=-2)
+        harmonic_counts[..., 0] = 0
+
+        present = (boards.elements[..., None] == np.arange(len(ELEMENTS))).any(axis=-2)
+        opposed = np.zeros(occupied.shape[:-1], dtype=bool)
+        for a, b in OPPOSITE_ELEMENTS:
+            opposed |= present[..., a] & present[..., b]
+
+        return {
+            "base": np.where(occupied, boards.values, 0.0).sum(axis=-1),
+            "harmonic_matches": harmonic_match.sum(axis=-1),
+            "transit_matches": transit_matches,
+            "shared_harmonic": harmonic_counts.max(axis=-1) >= 3,
+            "opposed": opposed,
+            "reversals": (occupied & boards.reversed).sum(axis=-1),
+            "harmonic_counts": harmonic_counts,
+            "present": present,
+        }
+
+    def _score(self, c):
+        m = self.multipliers
+        score = c["base"] + m["armonicos_coincidentes"] * c["harmonic_matches"]
+        score = score + np.minimum(m["transito_planetario"] * c["transit_matches"],
+                                   m["bonificacion_maxima_transito"])
+        score = np.where(c["shared_harmonic"], score * m["tres_o_mas_cartas"], score)
+        score = np.where(c["opposed"], score * (1 - m["penalizacion_opuestos"]), score)
+        return score * np.maximum(0.0, 1 - m["penalizacion_reversion"] * c["reversals"])
+
+    def score_houses(self, boards, house_harmonics=None, transits=None):
+        """
+        Puntaje (tableros, 12) de cada casa.
+
+        `house_harmonics` (12,) o (tableros, 12) es el armónico de cada casa
+        (por defecto el número de la casa); `transits` (12,) o (tableros, 12)
+        el índice del elemento que el tránsito activa en cada casa (-1 ninguno).
+        """
+        return self._score(self._components(boards, house_harmonics, transits))
+
+    def triggers(self, boards, house_harmonics=None, transits=None):
+        """
+        Qué reglas se activaron en cada casa: arrays booleanos (tableros, 12)
+        por efecto, para medir con qué frecuencia actúa cada multiplicador.
+        """
+        c = self._components(boards, house_harmonics, transits)
+        m = self.multipliers
+        return {
+            "armonicos_coincidentes": c["harmonic_matches"] > 0,
+            "transito_planetario": c["transit_matches"] > 0,
+            "bonificacion_maxima_transito":
+                m["transito_planetario"] * c["transit_matches"] > m["bonificacion_maxima_transito"],
+            "tres_o_mas_cartas": c["shared_harmonic"],
+            "penalizacion_opuestos": c["opposed"],
+            "penalizacion_reversion": c["reversals"] > 0,
+        }
+
+    def placement_scores(self, boards, card, house_harmonics=None, transits=None):
+        """
+        Puntaje de cada casa de `boards` (..., casas, 6) si se le agrega una
+        carta de `card` (values, harmonics, elements, reversed), cada uno de
+        forma (..., cartas): devuelve (..., cartas, casas).
+
+        Se calcula a partir de los componentes de cada casa sin puntuar los
+        tableros candidatos uno por uno; la casa debe tener un espacio libre.
+        """
+        values, harmonics, elements, reversed_ = (np.asarray(a)[..., None] for a in card)
+        houses = boards.values.shape[-2]
+        if house_harmonics is None:
+            house_harmonics = np.arange(1, houses + 1)
+        house_harmonics = np.asarray(house_harmonics)[..., None, :]
+        c = self._components(boards, house_harmonics[..., 0, :],
+                             transits, int(np.max(harmonics, initial=0)))
+        c = {name: np.expand_dims(value, -2 if value.ndim == c["base"].ndim else -3)
+             for name, value in c.items()}
+        shape = np.broadcast_shapes(values.shape, c["base"].shape)
+
+        def at(table, index):
+            # table[..., casa, index[..., carta, casa]]
+            index = np.broadcast_to(index, shape)[..., None]
+            table = np.broadcast_to(table, shape + table.shape[-1:])
+            return np.take_along_axis(table, index, axis=-1)[..., 0]
+
+        transit_match = np.zeros(shape, dtype=bool)
+        if transits is not None:
+            transits = np.asarray(transits)[..., None, :]
+            transit_match = (transits >= 0) & (elements == transits)
+        return self._score({
+            "base": c["base"] + values,
+            "harmonic_matches": c["harmonic_matches"]
+                + ((harmonics > 0) & (harmonics == house_harmonics)),
+            "transit_matches": c["transit_matches"] + transit_match,
+            "shared_harmonic": c["shared_harmonic"]
+                | ((harmonics > 0) & (at(c["harmonic_counts"], harmonics) >= 2)),
+            "opposed": c["opposed"] | at(c["present"], _OPPOSITE[elements]),
+            "reversals": c["reversals"] + reversed_,
+        })
+
+    def score_boards(self, boards, house_harmonics=None, transits=None):
+        """Puntaje total de cada tablero."""
+        return self.score_houses(boards, house_harmonics, transits).sum(axis=-1)
+
+    def best_placement(self, boards, board, houses, slots, card,
+                       house_harmonics=None, transits=None):
+        """
+        Evalúa todas las colocaciones candidatas de `card` en el tablero
+        `board` y devuelve (índice de la mejor, puntajes de todas).
+        """
+        candidates = boards.with_placements(board, houses, slots, card)
+        if house_harmonics is not None and np.ndim(house_harmonics) > 1:
+            house_harmonics = np.asarray(house_harmonics)[board]
+        if transits is not None and np.ndim(transits) > 1:
+            transits = np.asarray(transits)[board]
+        scores = self.score_boards(candidates, house_harmonics, transits)
+        return int(np.argmax(scores)), scores
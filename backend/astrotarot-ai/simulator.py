@@ -0,0 +1,402 @@
+"""
+Simulador Monte Carlo de partidas para balancear las reglas de puntuación.
+
+Juega muchas partidas sembradas de Modo Solitario o Modo Confrontativo con
+políticas aleatorias o guionadas, repartidas en un pool de procesos:
+
+    python simulator.py --mode confrontativo --matches 1000000 \\
+        --policy-a greedy --policy-b random --set penalizacion_opuestos=0.3 \\
+        --output resultados.npz
+
+Cada partida tiene su propio generador (semilla global + número de partida),
+así que sus resultados no dependen de cómo se reparten las partidas entre
+procesos. Dentro de cada proceso un bloque de partidas avanza a la vez: los
+tableros de todo el bloque son arrays y cada jugada se evalúa con
+`HouseScoring` sobre todas las partidas juntas.
+
+El archivo de resultados es columnar (.npz, o .parquet con pyarrow) con una
+fila por partida; el resumen por modo y políticas (tasas de victoria,
+distribución de puntajes y de la dispersión entre casas, y frecuencia de
+activación de cada regla) se escribe al lado como `<nombre>.summary.<ext>`.
+"""
+
+import argparse
+import concurrent.futures
+import functools
+import glob
+import json
+import os
+
+import numpy as np
+
+from scoring_engine import DEFAULT_MULTIPLIERS, ELEMENTS, HOUSES, SLOTS, Boards, HouseScoring
+
+# Infocards de las que sale el mazo (valor, armónico dominante, elemento)
+INFOCARDS_DIR = os.getenv(
+    "INFOCARDS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "astro-oraculo", "data"),
+)
+
+HAND_SIZE = 12  # "se reparten 12 cartas al azar a la mano de cada oponente"
+PLACEMENTS_PER_TURN = 3  # "se colocan cartas en cada turno hasta tres"
+
+MODES = {
+    # jugadores, turnos, casas activas alrededor de la casa del tránsito
+    "solitario": {"players": 1, "turns": HOUSES * SLOTS // PLACEMENTS_PER_TURN, "active": None},
+    "confrontativo": {"players": 2, "turns": 7, "active": (-1, 0, 1)},
+}
+
+# random: cualquier colocación válida; greedy: la que más puntos suma;
+# balance: la que deja las casas activas más parejas (objetivo del Solitario)
+POLICIES = ("random", "greedy", "balance")
+
+# Un tablero de Solitario está equilibrado (se gana) si su dispersión, la
+# mayor distancia de una casa al puntaje medio por casa en fracción de esa
+# media, no pasa de este valor
+BALANCE_TOLERANCE = 0.25
+
+TRIGGERS = (
+    "armonicos_coincidentes",
+    "transito_planetario",
+    "bonificacion_maxima_transito",
+    "tres_o_mas_cartas",
+    "penalizacion_opuestos",
+    "penalizacion_reversion",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def load_deck(directory=INFOCARDS_DIR):
+    """Mazo como arrays (valores, armónicos, elementos) de las 78 infocards."""
+    values, harmonics, elements = [], [], []
+    for path in sorted(glob.glob(os.path.join(directory, "A*infocard*.json"))):
+        with open(path, encoding="utf-8-sig") as f:
+            cards = json.load(f)["cartas"]
+        for card in cards.values():
+            values.append(card["puntos"])
+            harmonics.append((card.get("armonico") or [0])[0])
+            elements.append(ELEMENTS.index(card["elemento"]))
+    if not values:
+        raise FileNotFoundError(f"No hay infocards en {directory}")
+    return np.array(values, dtype=np.float64), np.array(harmonics), np.array(elements)
+
+
+def spread(house_scores):
+    """
+    Mayor desvío de una casa respecto de la media, en fracción de la media
+    (infinito si la media no es positiva).
+    """
+    mean = house_scores.mean(axis=-1)
+    deviation = np.abs(house_scores - mean[..., None]).max(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(mean > 0, deviation / mean, np.inf)
+
+
+def _excluding(values, best):
+    """Para cada casa, el mejor valor (`best` = np.max o np.min) de las demás."""
+    order = np.argsort(values, axis=-1)
+    if best is np.max:
+        order = order[..., ::-1]
+    first = np.take_along_axis(values, order[..., :1], axis=-1)
+    second = np.take_along_axis(values, order[..., 1:2], axis=-1)
+    houses = np.arange(values.shape[-1])
+    return np.where(houses == order[..., :1], second, first)
+
+
+def balance_spreads(before, after, fill):
+    """
+    Dispersión del puntaje por carta de las casas ocupadas tras cada
+    colocación candidata (partidas, mano, casas), a partir de los puntajes
+    actuales `before` (partidas, casas) y con la carta `after`
+    (partidas, mano, casas). Con las casas llenas, puntaje por carta parejo
+    es puntaje parejo: es lo que persigue la política "balance".
+    """
+    counted = fill > 0
+    current = np.where(counted, before / np.maximum(fill, 1), 0.0)
+    placed = after / (fill + 1)[:, None, :]
+    n = counted.sum(axis=-1)[:, None, None] + ~counted[:, None, :]
+    mean = (current.sum(axis=-1)[:, None, None] - current[:, None, :] + placed) / n
+    highest = _excluding(np.where(counted, current, -np.inf), np.max)[:, None, :]
+    lowest = _excluding(np.where(counted, current, np.inf), np.min)[:, None, :]
+    deviation = np.maximum(np.maximum(highest - mean, mean - lowest), np.abs(placed - mean))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(mean > 0, deviation / mean, np.inf)
+
+
+def match_rng(seed, match):
+    """Generador propio de una partida, independiente del resto."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(match,)))
+
+
+class MatchBlock:
+    """Un bloque de partidas del mismo modo jugadas en paralelo con arrays."""
+
+    def __init__(self, mode, policies, seed, start, count, scoring, reversal_rate):
+        config = MODES[mode]
+        self.mode = mode
+        self.policies = policies
+        self.scoring = scoring
+        self.turns = config["turns"]
+        self.deck = load_deck()
+        players, cards = config["players"], len(self.deck[0])
+        m = count
+
+        # azar de cada partida, sacado de su propio generador
+        self.transit_house = np.empty(m, dtype=np.int64)
+        self.reversed_cards = np.empty((m, players, cards), dtype=bool)
+        self.hand_keys = np.empty((m, self.turns, players, cards))
+        self.choices = np.empty((m, self.turns, players, PLACEMENTS_PER_TURN))
+        self.tie_breaks = np.empty(m, dtype=np.int64)
+        for k in range(m):
+            rng = match_rng(seed, start + k)
+            self.transit_house[k] = rng.integers(HOUSES)
+            self.reversed_cards[k] = rng.random((players, cards)) < reversal_rate
+            self.hand_keys[k] = rng.random((self.turns, players, cards))
+            self.choices[k] = rng.random((self.turns, players, PLACEMENTS_PER_TURN))
+            self.tie_breaks[k] = rng.integers(players)
+
+        # el tránsito activa su casa y las vecinas con el elemento de su signo
+        around = (self.transit_house[:, None] + np.array([-1, 0, 1])) % HOUSES
+        self.transits = np.full((m, HOUSES), -1)
+        np.put_along_axis(self.transits, around, around % len(ELEMENTS), axis=1)
+        if config["active"] is None:
+            self.active = np.broadcast_to(np.arange(HOUSES), (m, HOUSES))
+        else:
+            self.active = (self.transit_house[:, None] + np.array(config["active"])) % HOUSES
+
+        shape = (m, players, HOUSES, SLOTS)
+        self.boards = Boards(np.zeros(shape), np.zeros(shape), np.full(shape, -1), np.zeros(shape))
+        self.placed = np.zeros((m, players, cards), dtype=bool)
+        self.fill = np.zeros((m, players, HOUSES), dtype=np.int64)
+
+    def _house_harmonics(self):
+        return (self.active + 1)[:, None, :]
+
+    def _active_transits(self):
+        return np.take_along_axis(self.transits, self.active, axis=1)[:, None, :]
+
+    def _candidates(self, hand):
+        """
+        Puntaje actual de cada casa activa (partidas, jugadores, casas) y el
+        que tendría con cada carta de la mano (partidas, jugadores, mano, casas).
+        """
+        b = self.boards
+        idx = self.active[:, None, :, None]
+        current = Boards(*(np.take_along_axis(a, idx, axis=2)
+                           for a in (b.values, b.harmonics, b.elements, b.reversed)))
+        hh, tr = self._house_harmonics(), self._active_transits()
+        card = (*(a[hand] for a in self.deck), np.take_along_axis(self.reversed_cards, hand, axis=2))
+        before = self.scoring.score_houses(current, hh, tr)
+        return before, self.scoring.placement_scores(current, card, hh, tr)
+
+    def _place(self, turn, k, hand):
+        m, players, _ = self.placed.shape
+        fill = np.take_along_axis(self.fill, self.active[:, None, :], axis=2)
+        in_hand = ~np.take_along_axis(self.placed, hand, axis=2)
+        valid = in_hand[..., None] & (fill < SLOTS)[:, :, None, :]
+        flat = valid.reshape(m, players, -1)
+        moves = flat.any(axis=-1)
+
+        choice = np.zeros((m, players), dtype=np.int64)
+        if set(self.policies) - {"random"}:
+            before, after = self._candidates(hand)
+        for p, policy in enumerate(self.policies):
+            if policy == "random":
+                # la opción número floor(u * n) entre las válidas
+                n = flat[:, p].sum(axis=-1)
+                target = np.floor(self.choices[:, turn, p, k] * n)
+                choice[:, p] = np.argmax(np.cumsum(flat[:, p], axis=-1) > target[:, None], axis=-1)
+                continue
+            if policy == "greedy":
+                # la colocación que más puntos suma
+                value = (after[:, p] - before[:, p, None, :]).reshape(m, -1)
+            else:
+                value = -balance_spreads(before[:, p], after[:, p], fill[:, p]).reshape(m, -1)
+            choice[:, p] = np.argmax(np.where(flat[:, p], value, -np.inf), axis=-1)
+
+        rows, ps = np.nonzero(moves)
+        chosen = choice[rows, ps]
+        hand_slot, active_slot = np.divmod(chosen, self.active.shape[1])
+        cards = hand[rows, ps, hand_slot]
+        houses = self.active[rows, active_slot]
+        slots = self.fill[rows, ps, houses]
+        self.boards.values[rows, ps, houses, slots] = self.deck[0][cards]
+        self.boards.harmonics[rows, ps, houses, slots] = self.deck[1][cards]
+        self.boards.elements[rows, ps, houses, slots] = self.deck[2][cards]
+        self.boards.reversed[rows, ps, houses, slots] = self.reversed_cards[rows, ps, cards]
+        self.placed[rows, ps, cards] = True
+        self.fill[rows, ps, houses] += 1
+
+    def play(self):
+        for turn in range(self.turns):
+            # mano: las HAND_SIZE cartas aún no jugadas con menor clave al azar
+            keys = np.where(self.placed, np.inf, self.hand_keys[:, turn])
+            hand = np.argsort(keys, axis=-1)[..., :HAND_SIZE]
+            for k in range(PLACEMENTS_PER_TURN):
+                self._place(turn, k, hand)
+        return self.results()
+
+    def results(self):
+        m, players, _ = self.placed.shape
+        house_scores = self.scoring.score_houses(self.boards, None, self.transits[:, None, :])
+        triggers = self.scoring.triggers(self.boards, None, self.transits[:, None, :])
+        active = np.zeros((m, HOUSES), dtype=bool)
+        np.put_along_axis(active, self.active, True, axis=1)
+        scores = np.where(active[:, None], house_scores, 0.0).sum(axis=-1)
+
+        per_house = np.take_along_axis(house_scores, self.active[:, None], axis=2)
+        spreads = spread(per_house)
+        winner = np.full(m, -1, dtype=np.int8)
+        tie_break = np.zeros(m, dtype=bool)
+        houses_won = np.zeros((m, 2), dtype=np.int8)
+        if players == 1:
+            winner[spreads[:, 0] <= BALANCE_TOLERANCE] = 0
+        else:
+            houses_won[:, 0] = (per_house[:, 0] > per_house[:, 1]).sum(axis=-1)
+            houses_won[:, 1] = (per_house[:, 1] > per_house[:, 0]).sum(axis=-1)
+            winner[:] = np.where(houses_won[:, 0] > houses_won[:, 1], 0, 1)
+            tie_break = houses_won[:, 0] == houses_won[:, 1]
+            winner[tie_break] = self.tie_breaks[tie_break]
+
+        columns = {
+            "winner": winner,
+            "tie_break": tie_break,
+            "score_a": scores[:, 0],
+            "score_b": scores[:, 1] if players > 1 else np.full(m, np.nan),
+            "houses_a": houses_won[:, 0],
+            "houses_b": houses_won[:, 1],
+            "spread_a": spreads[:, 0],
+            "spread_b": spreads[:, 1] if players > 1 else np.full(m, np.nan),
+        }
+        for name in TRIGGERS:
+            fired = triggers[name] & active[:, None]
+            columns[f"trigger_{name}"] = fired.sum(axis=(1, 2)).astype(np.int16)
+        return columns
+
+
+def simulate_block(mode, policies, seed, start, count, multipliers, reversal_rate):
+    """Entrada de los procesos: columnas de resultados de un bloque de partidas."""
+    scoring = HouseScoring()
+    scoring.multipliers.update(multipliers)
+    columns = MatchBlock(mode, policies, seed, start, count, scoring, reversal_rate).play()
+    columns["match"] = np.arange(start, start + count, dtype=np.int64)
+    return columns
+
+
+def simulate(mode, policies, matches, seed=0, workers=None, chunk_size=500,
+             multipliers=None, reversal_rate=0.25):
+    """Columnas (una fila por partida) de `matches` partidas sembradas."""
+    blocks = [(start, min(chunk_size, matches - start)) for start in range(0, matches, chunk_size)]
+    args = (mode, tuple(policies), seed)
+    extra = (dict(multipliers or {}), reversal_rate)
+    if workers == 1 or len(blocks) == 1:
+        parts = [simulate_block(*args, start, count, *extra) for start, count in blocks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(simulate_block, *args, start, count, *extra)
+                       for start, count in blocks]
+            parts = [future.result() for future in futures]
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    columns["mode"] = np.full(matches, mode)
+    columns["policy_a"] = np.full(matches, policies[0])
+    columns["policy_b"] = np.full(matches, policies[1] if len(policies) > 1 else "")
+    return columns
+
+
+def summarize(columns):
+    """Resumen columnar por (modo, política A, política B)."""
+    groups = {}
+    keys = list(zip(columns["mode"].tolist(), columns["policy_a"].tolist(),
+                    columns["policy_b"].tolist()))
+    for row, key in enumerate(keys):
+        groups.setdefault(key, []).append(row)
+    summary = {name: [] for name in ("mode", "policy_a", "policy_b", "matches",
+                                     "win_rate_a", "win_rate_b", "tie_break_rate")}
+    for (mode, policy_a, policy_b), rows in groups.items():
+        rows = np.array(rows)
+        winner = columns["winner"][rows]
+        summary["mode"].append(mode)
+        summary["policy_a"].append(policy_a)
+        summary["policy_b"].append(policy_b)
+        summary["matches"].append(len(rows))
+        summary["win_rate_a"].append(float((winner == 0).mean()))
+        summary["win_rate_b"].append(float((winner == 1).mean()))
+        summary["tie_break_rate"].append(float(columns["tie_break"][rows].mean()))
+        for column in ("score_a", "score_b", "spread_a", "spread_b"):
+            values = columns[column][rows]
+            if np.isnan(values).all():
+                stats = [np.nan] * 5
+            else:
+                stats = [values.mean(), values.std(), *np.percentile(values, [5, 50, 95])]
+            for name, value in zip(("mean", "std", "p05", "p50", "p95"), stats):
+                summary.setdefault(f"{column}_{name}", []).append(float(value))
+        for name in TRIGGERS:
+            fired = columns[f"trigger_{name}"][rows]
+            # casas por partida en que actuó la regla, y partidas en que actuó alguna vez
+            summary.setdefault(f"{name}_per_match", []).append(float(fired.mean()))
+            summary.setdefault(f"{name}_match_rate", []).append(float((fired > 0).mean()))
+    return {name: np.array(values) for name, values in summary.items()}
+
+
+def write_columns(columns, path):
+    """Guarda columnas en .npz, o en .parquet si pyarrow está instalado."""
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.table({name: pa.array(values) for name, values in columns.items()}), path)
+    else:
+        np.savez_compressed(path, **columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador Monte Carlo de partidas de AstroTarot.")
+    parser.add_argument("--mode", choices=sorted(MODES), default="confrontativo")
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--policy-a", choices=POLICIES, default="greedy")
+    parser.add_argument("--policy-b", choices=POLICIES, default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--reversal-rate", type=float, default=0.25,
+                        help="probabilidad de que una carta salga en reversión")
+    parser.add_argument("--set", action="append", default=[], metavar="REGLA=VALOR",
+                        help="sobrescribe un multiplicador de rules.json, p. ej. penalizacion_opuestos=0.3")
+    parser.add_argument("--output", default="simulacion.npz",
+                        help="archivo de resultados (.npz o .parquet)")
+    args = parser.parse_args(argv)
+
+    if args.matches < 1 or args.workers < 1 or args.chunk_size < 1:
+        parser.error("--matches, --workers y --chunk-size deben ser positivos")
+    if args.output.endswith(".parquet"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("La salida Parquet necesita pyarrow (pip install pyarrow)")
+    multipliers = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if not value:
+            parser.error(f"--set espera REGLA=VALOR, no {item!r}")
+        if name not in DEFAULT_MULTIPLIERS:
+            parser.error(f"--set: regla desconocida {name!r} "
+                         f"(reglas: {', '.join(sorted(DEFAULT_MULTIPLIERS))})")
+        try:
+            multipliers[name] = float(value)
+        except ValueError:
+            parser.error(f"--set: {name} espera un número, no {value!r}")
+
+    policies = (args.policy_a, args.policy_b)[:MODES[args.mode]["players"]]
+    columns = simulate(args.mode, policies, args.matches, args.seed, args.workers,
+                       args.chunk_size, multipliers, args.reversal_rate)
+    write_columns(columns, args.output)
+    summary = summarize(columns)
+    stem, ext = os.path.splitext(args.output)
+    write_columns(summary, f"{stem}.summary{ext}")
+    for k in range(len(summary["mode"])):
+        print(json.dumps({name: values[k].item() for name, values in summary.items()},
+                         ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
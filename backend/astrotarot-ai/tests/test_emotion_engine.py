@@ -0,0 +1,29 @@
+from emotion_engine import EmotionEngine
+
+
+def aspect(first, second, kind, orb):
+    return {"planet1": first, "planet2": second, "aspect": kind, "orb": orb}
+
+
+def test_patterns_first_then_the_tightest_aspects():
+    natal = {
+        "patterns": [{"pattern": "Grand Trine", "bodies": ["Sun", "Mars", "Jupiter"]},
+                     {"pattern": "Kite", "bodies": ["Sun", "Moon"]}],
+        "aspects": [
+            aspect("Sun", "Moon", "trine", 5.1),
+            aspect("Sun", "Mars", "square", 0.4),
+            aspect("Venus", "Mars", "sextile", 0.1),  # sin textura: no cuenta
+            aspect("Moon", "Venus", "opposition", 2.0),
+            aspect("Mars", "Saturn", "conjunction", 1.2),
+            {"from": "Jupiter", "to": "Pluto", "aspect": "square", "orb": 0.9},
+            aspect("Sun", "Saturn", "opposition", 3.3),
+        ],
+    }
+    features = EmotionEngine.analyze_aspects(natal)
+    assert [f["type"] for f in features] == [
+        "Grand Trine", "Square", "Square", "Conjunction", "Opposition",
+    ]
+    assert [f["bodies"] for f in features[1:]] == [
+        ["Sun", "Mars"], ["Jupiter", "Pluto"], ["Mars", "Saturn"], ["Moon", "Venus"],
+    ]
+    assert len(features) - 1 == EmotionEngine.MAX_ASPECT_FEATURES
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from scoring_engine import DEFAULT_MULTIPLIERS, ELEMENTS, Boards, HouseScoring, load_rules
+
+FUEGO, TIERRA, AIRE, AGUA = range(len(ELEMENTS))
+
+
+def board(*cards, house=0):
+    """Un tablero con `cards` (valor, armónico, elemento, reversión) en `house`."""
+    boards = Boards.empty()
+    for slot, (value, harmonic, element, reversed_) in enumerate(cards):
+        boards.values[0, house, slot] = value
+        boards.harmonics[0, house, slot] = harmonic
+        boards.elements[0, house, slot] = element
+        boards.reversed[0, house, slot] = reversed_
+    return boards
+
+
+@pytest.fixture
+def scoring():
+    return HouseScoring({})
+
+
+def test_rules_json_multipliers():
+    rules = load_rules()
+    assert rules["puntuacion_y_armonicos"]["multiplicadores"] == DEFAULT_MULTIPLIERS
+
+
+def test_card_values_add_up(scoring):
+    houses = scoring.score_houses(board((3, 0, FUEGO, False), (4, 0, FUEGO, False)))
+    assert houses[0, 0] == pytest.approx(7)
+    assert houses[0, 1:].sum() == 0
+
+
+def test_matching_harmonic_adds_two_per_card(scoring):
+    # la casa 1 tiene armónico 1 por defecto
+    houses = scoring.score_houses(board((5, 1, FUEGO, False), (5, 2, FUEGO, False)))
+    assert houses[0, 0] == pytest.approx(12)
+
+
+def test_transit_bonus_is_capped(scoring):
+    transits = np.full(12, -1)
+    transits[0] = FUEGO
+    one = board((1, 0, FUEGO, False), (1, 0, TIERRA, False))
+    three = board(*[(1, 0, FUEGO, False)] * 3)
+    assert scoring.score_houses(one, transits=transits)[0, 0] == pytest.approx(2 + 3)
+    assert scoring.score_houses(three, transits=transits)[0, 0] == pytest.approx(3 + 6)
+
+
+def test_three_cards_sharing_a_harmonic(scoring):
+    shared = board(*[(2, 5, TIERRA, False)] * 3)
+    two = board((2, 5, TIERRA, False), (2, 5, TIERRA, False), (2, 6, TIERRA, False))
+    assert scoring.score_houses(shared)[0, 0] == pytest.approx(6 * 1.2)
+    assert scoring.score_houses(two)[0, 0] == pytest.approx(6)
+
+
+@pytest.mark.parametrize("a, b", [(FUEGO, AGUA), (TIERRA, AIRE)])
+def test_opposite_elements_penalty(scoring, a, b):
+    houses = scoring.score_houses(board((5, 0, a, False), (5, 0, b, False)))
+    assert houses[0, 0] == pytest.approx(10 * 0.8)
+
+
+def test_adjacent_elements_are_not_opposed(scoring):
+    houses = scoring.score_houses(board((5, 0, FUEGO, False), (5, 0, TIERRA, False)))
+    assert houses[0, 0] == pytest.approx(10)
+
+
+def test_reversal_penalty_is_progressive(scoring):
+    one = board((5, 0, AIRE, True), (5, 0, AIRE, False))
+    two = board((5, 0, AIRE, True), (5, 0, AIRE, True))
+    assert scoring.score_houses(one)[0, 0] == pytest.approx(10 * 0.9)
+    assert scoring.score_houses(two)[0, 0] == pytest.approx(10 * 0.8)
+
+
+def test_reversal_penalty_never_goes_negative():
+    scoring = HouseScoring({"puntuacion_y_armonicos": {"multiplicadores": {"penalizacion_reversion": 0.3}}})
+    houses = scoring.score_houses(board(*[(5, 0, AIRE, True)] * 4))
+    assert houses[0, 0] == 0
+
+
+def test_rules_apply_in_order(scoring):
+    # (3 * 4 + 2 * 3 armónicos + tránsito tope 6) x1.2 x0.8 (opuestos) x0.9 (una reversión)
+    transits = np.full(12, -1)
+    transits[0] = FUEGO
+    cards = [(4, 1, FUEGO, False), (4, 1, FUEGO, True), (4, 1, FUEGO, False), (0, 0, AGUA, False)]
+    houses = scoring.score_houses(board(*cards), transits=transits)
+    assert houses[0, 0] == pytest.approx((12 + 6 + 6) * 1.2 * 0.8 * 0.9)
+
+
+def test_triggers(scoring):
+    transits = np.full(12, -1)
+    transits[0] = FUEGO
+    cards = [(4, 1, FUEGO, False), (4, 1, FUEGO, True), (4, 1, FUEGO, False), (0, 0, AGUA, False)]
+    fired = {name: bool(v[0, 0]) for name, v in scoring.triggers(board(*cards), transits=transits).items()}
+    assert fired == {name: True for name in DEFAULT_MULTIPLIERS}
+    quiet = scoring.triggers(board((1, 0, TIERRA, False)), transits=transits)
+    assert not any(v[0, 0] for v in quiet.values())
+
+
+def test_best_placement(scoring):
+    boards = board((5, 0, FUEGO, False))
+    best, scores = scoring.best_placement(boards, 0, [0, 1], [1, 0], (5, 0, AGUA, False))
+    # junto a la carta de Fuego la de Agua penaliza; sola en la casa 2 no
+    assert best == 1
+    assert scores.tolist() == pytest.approx([8, 10])
+
+
+def test_placement_scores_match_rescoring(scoring):
+    rng = np.random.default_rng(1)
+    fill = rng.integers(0, 6, (30, 12))
+    used = np.arange(6) < fill[..., None]
+    boards = Boards(
+        np.where(used, rng.integers(1, 10, used.shape), 0),
+        np.where(used, rng.integers(0, 22, used.shape), 0),
+        np.where(used, rng.integers(0, 4, used.shape), -1),
+        used & (rng.random(used.shape) < 0.3),
+    )
+    cards = (rng.integers(1, 10, (30, 4)), rng.integers(0, 22, (30, 4)),
+             rng.integers(0, 4, (30, 4)), rng.random((30, 4)) < 0.3)
+    transits = np.where(rng.random((30, 12)) < 0.3, rng.integers(0, 4, (30, 12)), -1)
+    fast = scoring.placement_scores(boards, cards, None, transits)
+    for b, c, h in [(0, 0, 0), (7, 2, 5), (29, 3, 11)]:
+        card = tuple(a[b, c] for a in cards)
+        placed = boards.with_placements(b, [h], [fill[b, h]], card)
+        assert fast[b, c, h] == pytest.approx(scoring.score_houses(placed, None, transits[b])[0, h])
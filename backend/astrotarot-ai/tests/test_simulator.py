@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from simulator import (
+    BALANCE_TOLERANCE,
+    TRIGGERS,
+    balance_spreads,
+    main,
+    simulate,
+    spread,
+    summarize,
+)
+
+
+def test_spread():
+    assert spread(np.array([10.0, 10.0, 10.0])) == 0
+    assert spread(np.array([5.0, 10.0, 15.0])) == pytest.approx(0.5)
+    assert spread(np.zeros(3)) == np.inf
+
+
+def test_balance_spreads_match_rescoring():
+    rng = np.random.default_rng(0)
+    fill = rng.integers(0, 6, (20, 12))
+    before = rng.uniform(0, 30, (20, 12)) * (fill > 0)
+    after = before[:, None, :] + rng.uniform(1, 10, (20, 12, 12))
+    fast = balance_spreads(before, after, fill)
+    for m, h, a in [(0, 0, 0), (3, 5, 7), (19, 11, 2)]:
+        scores = before[m].copy()
+        scores[a] = after[m, h, a]
+        cards = fill[m] + (np.arange(12) == a)
+        per_card = scores[cards > 0] / cards[cards > 0]
+        assert fast[m, h, a] == pytest.approx(spread(per_card))
+
+
+@pytest.mark.parametrize("mode, policies", [
+    ("confrontativo", ("greedy", "random")),
+    ("solitario", ("balance",)),
+])
+def test_results_do_not_depend_on_chunking(mode, policies):
+    one = simulate(mode, policies, 24, seed=3, workers=1, chunk_size=24)
+    many = simulate(mode, policies, 24, seed=3, workers=1, chunk_size=5)
+    for name in one:
+        assert np.array_equal(one[name], many[name], equal_nan=one[name].dtype.kind == "f"), name
+
+
+def test_confrontativo_columns():
+    columns = simulate("confrontativo", ("greedy", "random"), 20, seed=1, workers=1)
+    assert set(columns["winner"].tolist()) <= {0, 1}
+    decided = ~columns["tie_break"]
+    a_won = columns["houses_a"] > columns["houses_b"]
+    assert np.array_equal(columns["winner"][decided] == 0, a_won[decided])
+    for name in TRIGGERS:
+        assert (columns[f"trigger_{name}"] >= 0).all()
+
+
+def test_solitario_win_is_balance():
+    columns = simulate("solitario", ("balance",), 20, seed=2, workers=1)
+    assert np.isnan(columns["score_b"]).all()
+    assert np.array_equal(columns["winner"] == 0, columns["spread_a"] <= BALANCE_TOLERANCE)
+
+
+def test_balance_policy_balances_better_than_random():
+    random = simulate("solitario", ("random",), 40, seed=4, workers=1)
+    balance = simulate("solitario", ("balance",), 40, seed=4, workers=1)
+    assert (balance["winner"] == 0).sum() > (random["winner"] == 0).sum()
+
+
+def test_multiplier_overrides():
+    base = simulate("confrontativo", ("random", "random"), 10, seed=5, workers=1)
+    harsher = simulate("confrontativo", ("random", "random"), 10, seed=5, workers=1,
+                       multipliers={"penalizacion_opuestos": 0.5})
+    assert (harsher["score_a"] <= base["score_a"]).all()
+    assert (harsher["score_a"] < base["score_a"]).any()
+
+
+@pytest.mark.parametrize("item, message", [
+    ("penalizacion_opuesto=0.3", "regla desconocida"),
+    ("penalizacion_opuestos=mucho", "espera un número"),
+    ("penalizacion_opuestos", "REGLA=VALOR"),
+])
+def test_set_rejects_unknown_rules_and_values(item, message, tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(["--matches", "1", "--workers", "1", "--set", item,
+              "--output", str(tmp_path / "out.npz")])
+    assert message in capsys.readouterr().err
+    assert not (tmp_path / "out.npz").exists()
+
+
+def test_summary():
+    columns = simulate("confrontativo", ("greedy", "random"), 10, seed=6, workers=1)
+    summary = summarize(columns)
+    assert summary["matches"].tolist() == [10]
+    assert summary["win_rate_a"][0] + summary["win_rate_b"][0] == pytest.approx(1)
+    assert "spread_a_p50" in summary